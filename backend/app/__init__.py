@@ -1,39 +1,65 @@
 import os
-import cloudinary
-import cloudinary.uploader
-import cloudinary.api
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
+from .db_profile import engine_options
 
 # Initialize the database, migration, and JWT manager
 db = SQLAlchemy()
 migrate = Migrate()
 jwt = JWTManager()
 
-# Load environment variables for Cloudinary
-cloudinary.config(
-    cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
-    api_key=os.getenv("CLOUDINARY_API_KEY"),
-    api_secret=os.getenv("CLOUDINARY_API_SECRET"),
-)
-
-
 class Config:
     SECRET_KEY = os.getenv("SECRET_KEY", "default-secret-key")  # Default for local dev
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "default-jwt-secret-key")  # Default for local dev
     CORS_HEADERS = "Content-Type"
+    AUTHZ_CACHE_TTL = int(os.getenv("AUTHZ_CACHE_TTL", 30))  # Seconds a cached role/membership entry stays valid
+    AUTHZ_CLAIM_MAX_PROJECTS = int(os.getenv("AUTHZ_CLAIM_MAX_PROJECTS", 100))  # Larger assignment sets stay out of the token
+    RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "database")  # "database", "memory" (one worker only) or "module:factory"
+    RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", 60))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 1024))
+    RESPONSE_CACHE_MAX_BODY = int(os.getenv("RESPONSE_CACHE_MAX_BODY", 1024 * 1024))  # Bytes; larger streamed bodies are not cached
+    EVENT_BROKER = os.getenv("EVENT_BROKER", "database")  # "database", "memory" (one worker only) or "module:factory"
+    EVENT_HISTORY = int(os.getenv("EVENT_HISTORY", 256))  # Versions of events kept per project for Last-Event-ID resume
+    EVENT_POLL_INTERVAL = float(os.getenv("EVENT_POLL_INTERVAL", 1))  # "database" broker: seconds between polls
+    EVENT_MAX_STREAMS = int(os.getenv("EVENT_MAX_STREAMS", 0))  # Open streams per worker; 0 = GUNICORN_THREADS - 1
+    EVENT_HEARTBEAT = int(os.getenv("EVENT_HEARTBEAT", 15))  # Seconds between SSE keep-alive comments
+    EVENT_MAX_STREAM = int(os.getenv("EVENT_MAX_STREAM", 300))  # Seconds before a stream is closed for reconnect
+    AVATAR_STORAGE = os.getenv("AVATAR_STORAGE", "cloudinary")  # "cloudinary", "local" or "module:factory"
+    CLOUDINARY_CLOUD_NAME = os.getenv("CLOUDINARY_CLOUD_NAME")  # ✅ Read by CloudinaryStorage on its first upload
+    CLOUDINARY_API_KEY = os.getenv("CLOUDINARY_API_KEY")
+    CLOUDINARY_API_SECRET = os.getenv("CLOUDINARY_API_SECRET")
+    AVATAR_LOCAL_DIR = os.getenv("AVATAR_LOCAL_DIR")  # "local" storage: defaults to <instance>/avatars
+    AVATAR_LOCAL_URL = os.getenv("AVATAR_LOCAL_URL")  # "local" storage: URL prefix for stored files
+    AVATAR_SPOOL_DIR = os.getenv("AVATAR_SPOOL_DIR")  # Defaults to <instance>/avatar_spool
+    AVATAR_WORKERS = int(os.getenv("AVATAR_WORKERS", 2))  # Upload threads per process
+    AVATAR_MAX_ATTEMPTS = int(os.getenv("AVATAR_MAX_ATTEMPTS", 3))
+    AVATAR_RETRY_BACKOFF = float(os.getenv("AVATAR_RETRY_BACKOFF", 2))  # Seconds; doubles after each failed attempt
+    AVATAR_CACHE_DIR = os.getenv("AVATAR_CACHE_DIR")  # Local thumbnails; defaults to <instance>/avatar_cache
+    AVATAR_CACHE_MAX_BYTES = int(os.getenv("AVATAR_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+    AVATAR_CACHE_URL = os.getenv("AVATAR_CACHE_URL")  # Public URL of /api/users/avatars when behind a proxy/CDN
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")  # werkzeug method string
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))  # Hashing processes per worker; 0 = inline
+    PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", 8))  # Pending hashes before 503
+    PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", 10))
+    SLOW_QUERY_THRESHOLD = float(os.getenv("SLOW_QUERY_THRESHOLD", 0.25))  # Seconds; slower statements are logged
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")  # Bearer token for Prometheus scrapes of /api/_metrics
+    HISTORY_HOT_DAYS = int(os.getenv("HISTORY_HOT_DAYS", 90))  # Older ticket history moves to the archive table
+    HISTORY_ARCHIVE_BATCH_SIZE = int(os.getenv("HISTORY_ARCHIVE_BATCH_SIZE", 1000))
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "fast")  # "fast" (orjson if installed), "stdlib" or "module:Class"
 
 
 class DevelopmentConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///site.db")  # Default to SQLite
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
 
 
 class ProductionConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")  # Cloud database URI (e.g., PostgreSQL on Render)
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI, production=True)  # ✅ See app/db_profile.py
 
 
 def create_app():
@@ -51,9 +77,31 @@ def create_app():
 
     # ✅ Initialize extensions
     db.init_app(app)
-    migrate.init_app(app, db)
+    from .search import include_name
+    migrate.init_app(app, db, include_name=include_name)  # ✅ Autogenerate ignores the FTS5 tables
     jwt.init_app(app)
 
+    from .authz import token_is_stale
+    jwt.token_in_blocklist_loader(token_is_stale)  # ✅ Rejects tokens older than the user's authz_version
+
+    from .json_provider import json_provider
+    app.json = json_provider(app)
+
+    from .metrics import request_metrics
+    request_metrics.init_app(app)
+
+    from .cache import response_cache
+    response_cache.init_app(app)
+
+    from .events import project_events
+    project_events.init_app(app)
+
+    from .avatars import avatar_queue
+    avatar_queue.init_app(app)
+
+    from .passwords import password_hasher
+    password_hasher.init_app(app)
+
     # ✅ Import and register blueprints
     from .routes import routes_bp  
     from .auth import auth_bp
@@ -63,5 +111,19 @@ def create_app():
     app.register_blueprint(auth_bp, url_prefix="/api/auth")
     app.register_blueprint(users_bp, url_prefix="/api/users")
 
+    # ✅ Maintenance / CI commands (flask <command>)
+    from .query_plans import check_query_plans_command
+    from .stats import rebuild_stats_command
+    from .avatars import requeue_avatar_jobs_command
+    from .seed import seed_command
+    from .history import archive_history_command
+    from .search import rebuild_search_index_command
+    app.cli.add_command(check_query_plans_command)
+    app.cli.add_command(rebuild_stats_command)
+    app.cli.add_command(requeue_avatar_jobs_command)
+    app.cli.add_command(seed_command)
+    app.cli.add_command(archive_history_command)
+    app.cli.add_command(rebuild_search_index_command)
+
     return app
 
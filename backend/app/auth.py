@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token
-from werkzeug.security import generate_password_hash, check_password_hash
 from .models import db, User
+from .passwords import password_hasher
+from .authz import access_token as issue_access_token, membership_index
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -20,7 +20,7 @@ def register():
         return jsonify({'error': 'Email is already in use'}), 400
 
     # Hash password
-    hashed_password = generate_password_hash(data['password'])
+    hashed_password = password_hasher.hash(data['password'])
 
     # Create new user
     user = User(
@@ -48,8 +48,14 @@ def login():
     user = User.query.filter_by(email=data['email']).first()
 
     # Check if user exists and password is correct
-    if user and check_password_hash(user.password, data['password']):
-        access_token = create_access_token(identity=str(user.id))
+    if user and password_hasher.verify(user.password, data['password']):
+        # ✅ Upgrade hashes made with outdated PASSWORD_HASH_METHOD parameters
+        if password_hasher.needs_rehash(user.password):
+            user.password = password_hasher.hash(data['password'])
+            db.session.commit()
+        # ✅ This worker may have cached an older authz_version/membership for the user
+        membership_index.invalidate(user.id)
+        access_token = issue_access_token(user)  # ✅ Carries role/membership claims
         return jsonify({'token': access_token}), 200
 
     return jsonify({'error': 'Invalid credentials'}), 401
@@ -0,0 +1,169 @@
+import threading
+import time
+from collections import namedtuple
+from flask import current_app, has_request_context
+from flask_jwt_extended import create_access_token, get_jwt
+from .models import db, User, project_assignments
+
+# ✅ Cached authorization facts for one user
+#
+# Admins authorized from their token get an empty project_ids: their access
+# never depends on assignments (see can_access_project). `claimed` marks a
+# Membership read from token claims, which may predate newer assignments.
+Membership = namedtuple("Membership", ["id", "role", "project_ids", "claimed"], defaults=[False])
+
+
+class MembershipIndex:
+    """ Per-process cache of user_id → (role, assigned project ids)
+
+    Lets routes authorize without loading User rows or assignment lists.
+    Entries expire after AUTHZ_CACHE_TTL seconds so changes made by other
+    worker processes are eventually picked up; routes that change roles or
+    assignments call invalidate() so this process sees them immediately.
+
+    When the request's access token carries role/project claims (see
+    access_token()), get() answers from the token instead and this cache is
+    not consulted; only the user's authz_version is, to reject stale tokens.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """ Return the user's Membership, or None if the user does not exist """
+        user_id = int(user_id)
+        membership = _from_token(user_id)
+        if membership is not None:
+            return membership
+
+        return self.lookup(user_id)
+
+    def lookup(self, user_id):
+        """ The user's Membership from this cache (or the database), ignoring token claims """
+        return self._cached(self._entries, int(user_id), self._load)
+
+    def version(self, user_id):
+        """ The user's current authz_version, or None if the user does not exist """
+        return self._cached(self._versions, int(user_id), self._load_version)
+
+    def invalidate(self, user_id=None):
+        """ Drop one user's entry, or every entry when no user is given """
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+                self._versions.clear()
+            else:
+                self._entries.pop(int(user_id), None)
+                self._versions.pop(int(user_id), None)
+
+    def _cached(self, entries, user_id, load):
+        now = time.monotonic()
+
+        with self._lock:
+            cached = entries.get(user_id)
+        if cached and cached[0] > now:
+            return cached[1]
+
+        value = load(user_id)
+        if value is not None:
+            expires_at = now + current_app.config.get("AUTHZ_CACHE_TTL", 30)
+            with self._lock:
+                entries[user_id] = (expires_at, value)
+        return value
+
+    def _load(self, user_id):
+        row = db.session.query(User.id, User.role).filter(User.id == user_id).first()
+        if row is None:
+            return None
+
+        project_ids = frozenset(
+            project_id
+            for (project_id,) in db.session.query(project_assignments.c.project_id)
+            .filter(project_assignments.c.user_id == user_id)
+        )
+        return Membership(id=row.id, role=row.role, project_ids=project_ids)
+
+    def _load_version(self, user_id):
+        return db.session.query(User.authz_version).filter(User.id == user_id).scalar()
+
+
+membership_index = MembershipIndex()
+
+
+def can_access_project(membership, project_id):
+    """ Admins see every project; everyone else only their assigned ones """
+    if membership.role == "admin" or project_id in membership.project_ids:
+        return True
+    if membership.claimed:
+        # The token lists the projects assigned at login; later additions (or a
+        # promotion) are only in the membership cache
+        current = membership_index.lookup(membership.id)
+        return current is not None and (current.role == "admin" or project_id in current.project_ids)
+    return False
+
+
+# ==============================================================
+# ✅ Authorization claims in access tokens
+# ==============================================================
+#
+# Tokens carry the user's role, authz_version and (for non-admins with at
+# most AUTHZ_CLAIM_MAX_PROJECTS assignments) the sorted assigned project ids.
+# Only changes that take access away (an admin demoted) bump
+# User.authz_version; token_is_stale() then rejects older tokens (401), so
+# claims are never trusted past a loss of access. Access that was added (a new
+# assignment, a promotion) keeps the token valid: a project missing from the
+# claims falls back to the membership cache (can_access_project). Other worker
+# processes notice either within AUTHZ_CACHE_TTL seconds, like every other
+# cached membership fact.
+
+def authz_claims(user):
+    """ Additional JWT claims for `user` """
+    claims = {"role": user.role, "authz_version": user.authz_version}
+    if user.role != "admin":
+        project_ids = sorted(
+            project_id
+            for (project_id,) in db.session.query(project_assignments.c.project_id)
+            .filter(project_assignments.c.user_id == user.id)
+        )
+        # Too many to carry: routes fall back to the membership cache
+        if len(project_ids) <= current_app.config.get("AUTHZ_CLAIM_MAX_PROJECTS", 100):
+            claims["projects"] = project_ids
+    return claims
+
+
+def access_token(user):
+    """ An access token for `user` carrying its authorization claims """
+    return create_access_token(identity=str(user.id), additional_claims=authz_claims(user))
+
+
+def token_is_stale(jwt_header, jwt_payload):
+    """ JWT blocklist check: reject tokens minted before the user last lost access """
+    version = jwt_payload.get("authz_version")
+    if version is None:
+        return False  # issued without claims: authorized from the membership cache instead
+    current = membership_index.version(jwt_payload["sub"])
+    if current is not None and version > current:
+        # Minted after this process cached the version (e.g. by another worker
+        # after a role/assignment change): re-read it rather than reject a fresh token
+        membership_index.invalidate(jwt_payload["sub"])
+        current = membership_index.version(jwt_payload["sub"])
+    return current != version
+
+
+def _from_token(user_id):
+    if not has_request_context():
+        return None
+    try:
+        claims = get_jwt()
+    except RuntimeError:  # no token verified in this request
+        return None
+    if claims.get("sub") != str(user_id) or "authz_version" not in claims:
+        return None
+
+    if claims["role"] == "admin":
+        return Membership(id=user_id, role="admin", project_ids=frozenset(), claimed=True)
+    if "projects" in claims:
+        return Membership(id=user_id, role=claims["role"], project_ids=frozenset(claims["projects"]), claimed=True)
+    return None
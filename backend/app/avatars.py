@@ -0,0 +1,330 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import click
+from flask import current_app, url_for
+from PIL import Image, ImageOps
+from sqlalchemy.exc import IntegrityError
+from werkzeug.utils import import_string
+from .models import db, AvatarBlob, AvatarJob, Project, User
+from .cache import response_cache
+
+# ==============================================================
+# ✅ Background avatar uploads
+# ==============================================================
+#
+# The upload route only spools the file to AVATAR_SPOOL_DIR, records an
+# AvatarJob row and answers 202. A small thread pool then pushes the file to
+# the storage backend, retrying with exponential backoff, and sets the user's
+# avatar once it succeeds. Job state lives in the database, so any worker can
+# answer the status endpoint.
+#
+# Uploads are hashed while they are spooled. A hash already in avatar_blob is
+# applied on the spot without touching the storage backend. Every avatar is
+# served as a locally generated thumbnail from a size-bounded on-disk LRU
+# (ThumbnailCache); a cache miss redirects to the stored image.
+
+ALLOWED_EXTENSIONS = {"jpg", "jpeg", "png", "gif"}
+THUMBNAIL_SIZE = (300, 300)
+SPOOL_CHUNK_SIZE = 64 * 1024
+
+
+class AvatarStorage:
+    """ Where processed avatars end up; store() returns the public URL """
+
+    def store(self, path, name):
+        raise NotImplementedError
+
+
+class CloudinaryStorage(AvatarStorage):
+    """ Cloudinary upload with the 300x300 face-cropped transform (the default)
+
+    The SDK (and the HTTP stack under it) is imported and configured on the
+    first upload rather than at app import, which keeps it off the boot path
+    of every web worker and CLI command.
+    """
+
+    def __init__(self, config):
+        self.credentials = {
+            "cloud_name": config.get("CLOUDINARY_CLOUD_NAME"),
+            "api_key": config.get("CLOUDINARY_API_KEY"),
+            "api_secret": config.get("CLOUDINARY_API_SECRET"),
+        }
+        self._uploader = None
+        self._lock = threading.Lock()
+
+    def uploader(self):
+        with self._lock:
+            if self._uploader is None:
+                import cloudinary
+                import cloudinary.uploader
+
+                cloudinary.config(**self.credentials)
+                self._uploader = cloudinary.uploader
+            return self._uploader
+
+    def store(self, path, name):
+        upload_result = self.uploader().upload(
+            path,
+            folder="user_avatars",
+            transformation=[
+                {"width": 300, "height": 300, "crop": "thumb", "gravity": "face"},
+                {"quality": "auto"}
+            ],
+            format="jpg"
+        )
+        return upload_result["secure_url"]
+
+
+class LocalStorage(AvatarStorage):
+    """ Copies files into a directory; a stand-in for Cloudinary in tests and local dev """
+
+    def __init__(self, directory, base_url):
+        self.directory = directory
+        self.base_url = base_url.rstrip("/")
+        os.makedirs(directory, exist_ok=True)
+
+    def store(self, path, name):
+        shutil.copyfile(path, os.path.join(self.directory, name))
+        return f"{self.base_url}/{name}"
+
+
+class ThumbnailCache:
+    """ 300x300 JPEG thumbnails keyed by content hash, evicting least recently used files
+
+    Recency is the file's mtime (touched on every hit), so the bound holds
+    across worker processes sharing the directory without extra bookkeeping.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, content_hash):
+        return os.path.join(self.directory, f"{content_hash}.jpg")
+
+    def get(self, content_hash):
+        """ Path of a cached thumbnail (marking it recently used), or None """
+        path = self.path(content_hash)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, content_hash, source_path):
+        """ Generate a thumbnail from an image file, then evict down to max_bytes """
+        with Image.open(source_path) as image:
+            thumbnail = ImageOps.fit(ImageOps.exif_transpose(image).convert("RGB"), THUMBNAIL_SIZE)
+        # Write to a temporary name first so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as out:
+            thumbnail.save(out, "JPEG", quality=85)
+        os.replace(tmp_path, self.path(content_hash))
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".jpg"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+class AvatarQueue:
+    def __init__(self):
+        self.storage = None
+        self.thumbnails = None
+        self._executor = None
+        self._lock = threading.Lock()
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def init_app(self, app):
+        """ AVATAR_STORAGE is "cloudinary", "local" or an import path "module:factory"; factory(app) → AvatarStorage """
+        storage = app.config.get("AVATAR_STORAGE", "cloudinary")
+        if storage == "cloudinary":
+            self.storage = CloudinaryStorage(app.config)
+        elif storage == "local":
+            directory = app.config.get("AVATAR_LOCAL_DIR") or os.path.join(app.instance_path, "avatars")
+            self.storage = LocalStorage(directory, app.config.get("AVATAR_LOCAL_URL") or "file://" + directory)
+        else:
+            self.storage = import_string(storage)(app)
+        self.thumbnails = ThumbnailCache(
+            app.config.get("AVATAR_CACHE_DIR") or os.path.join(app.instance_path, "avatar_cache"),
+            app.config.get("AVATAR_CACHE_MAX_BYTES", 64 * 1024 * 1024),
+        )
+        app.extensions["avatar_queue"] = self
+
+    def spool_dir(self):
+        directory = current_app.config.get("AVATAR_SPOOL_DIR") or os.path.join(current_app.instance_path, "avatar_spool")
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    def thumbnail_url(self, content_hash):
+        base_url = current_app.config.get("AVATAR_CACHE_URL")
+        if base_url:
+            return f"{base_url.rstrip('/')}/{content_hash}.jpg"
+        return url_for("users.get_avatar_thumbnail", content_hash=content_hash, _external=True)
+
+    def enqueue(self, user_id, requested_by_id, file):
+        """ Spool an uploaded file and create its job (committed); returns the AvatarJob
+
+        Bytes already stored under the same hash finish the job right away.
+        """
+        job_id = uuid.uuid4().hex
+        extension = file.filename.rsplit(".", 1)[-1].lower()
+        spool_path = os.path.join(self.spool_dir(), f"{job_id}.{extension}")
+
+        digest = hashlib.sha256()
+        with open(spool_path, "wb") as out:
+            for chunk in iter(lambda: file.stream.read(SPOOL_CHUNK_SIZE), b""):
+                digest.update(chunk)
+                out.write(chunk)
+        content_hash = digest.hexdigest()
+
+        job = AvatarJob(
+            id=job_id, user_id=user_id, requested_by_id=requested_by_id, spool_path=spool_path,
+            content_hash=content_hash, thumbnail_url=self.thumbnail_url(content_hash),
+        )
+        db.session.add(job)
+
+        blob = db.session.get(AvatarBlob, content_hash)
+        if blob is None:
+            db.session.commit()
+            self.submit(job_id)
+            return job
+
+        # ✅ Seen before: no remote upload, just (re)build the local thumbnail if it was evicted
+        if self.thumbnails.get(content_hash) is None:
+            self._make_thumbnail(job)
+        self._apply(job)
+        return job
+
+    def _after_fork(self):
+        # A pool inherited from the parent has no live threads in this process
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def submit(self, job_id):
+        """ Hand a committed job to the worker pool """
+        # Created on first use, i.e. after gunicorn has forked this worker
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=current_app.config.get("AVATAR_WORKERS", 2), thread_name_prefix="avatar"
+                )
+        self._executor.submit(self.process, current_app._get_current_object(), job_id)
+
+    def process(self, app, job_id):
+        """ Run one job to completion: upload with retry/backoff, then point the user at it """
+        with app.app_context():
+            try:
+                self._run(app.config, job_id)
+            finally:
+                db.session.remove()
+
+    def _run(self, config, job_id):
+        job = db.session.get(AvatarJob, job_id)
+        if job is None or job.status in ("done", "failed"):
+            return
+
+        try:
+            self._upload(config, job)
+        except Exception as e:
+            # ✅ Never leave a job "running": whatever went wrong, record it as failed
+            current_app.logger.exception("Avatar job %s failed", job_id)
+            db.session.rollback()
+            job = db.session.get(AvatarJob, job_id)
+            job.status, job.error = "failed", str(e)
+            self._finish(job)
+
+    def _upload(self, config, job):
+        """ Store the spooled file (retrying with backoff), then record the blob and apply it """
+        max_attempts = config.get("AVATAR_MAX_ATTEMPTS", 3)
+        backoff = config.get("AVATAR_RETRY_BACKOFF", 2)
+
+        while True:
+            job.status = "running"
+            job.attempts += 1
+            db.session.commit()
+            try:
+                url = self.storage.store(job.spool_path, os.path.basename(job.spool_path))
+            except Exception as e:
+                job.error = str(e)
+                if job.attempts >= max_attempts:
+                    job.status = "failed"
+                    self._finish(job)
+                    return
+                job.status = "queued"
+                db.session.commit()
+                time.sleep(backoff * 2 ** (job.attempts - 1))
+                continue
+            break
+
+        if job.content_hash:
+            try:
+                with db.session.begin_nested():
+                    db.session.merge(AvatarBlob(content_hash=job.content_hash, url=url))
+            except IntegrityError:
+                # Another worker stored the same bytes meanwhile: a dedupe hit, use its copy
+                url = db.session.get(AvatarBlob, job.content_hash).url
+            self._make_thumbnail(job)
+        self._apply(job, url)
+
+    def _make_thumbnail(self, job):
+        try:
+            self.thumbnails.put(job.content_hash, job.spool_path)
+        except Exception as e:
+            # Not fatal: the thumbnail URL falls back to a redirect to the stored image
+            current_app.logger.warning("Avatar thumbnail for job %s failed: %s", job.id, e)
+
+    def _apply(self, job, url=None):
+        """ Point the user at the new avatar and complete the job """
+        user = db.session.get(User, job.user_id)
+        if user is None:
+            job.status, job.error = "failed", "User not found"
+            self._finish(job)
+            return
+
+        user.avatar = job.thumbnail_url or url
+        Project.bump_versions_for_user(user.id)
+        job.status, job.avatar_url, job.error = "done", user.avatar, None
+        self._finish(job)
+        response_cache.invalidate("users")
+
+    def _finish(self, job):
+        spool_path, job.spool_path = job.spool_path, None
+        db.session.commit()
+        if spool_path and os.path.exists(spool_path):
+            os.remove(spool_path)
+
+
+avatar_queue = AvatarQueue()
+
+
+@click.command("requeue-avatar-jobs")
+def requeue_avatar_jobs_command():
+    """ Process jobs left queued/running by a worker that exited mid-upload """
+    jobs = AvatarJob.query.filter(AvatarJob.status.in_(["queued", "running"])).all()
+    for job in jobs:
+        if not job.spool_path or not os.path.exists(job.spool_path):
+            job.status, job.error = "failed", "Spooled file is missing"
+            db.session.commit()
+            continue
+        avatar_queue._run(current_app.config, job.id)
+    click.echo(f"Processed {len(jobs)} avatar job(s)")
@@ -0,0 +1,219 @@
+from collections import Counter, defaultdict
+from datetime import datetime
+from sqlalchemy import insert, update
+from .models import db, Project, Ticket, TicketHistory, User, format_timestamp, in_batches
+from .authz import can_access_project
+from .stats import apply_stats_delta, ticket_deltas
+from .events import project_events, ticket_change
+
+# ✅ Upper bound on items accepted by one bulk request
+BULK_MAX_ITEMS = 1000
+
+EDITABLE_FIELDS = ("title", "description", "status", "priority", "assigned_user_id")
+
+
+class BulkValidationError(Exception):
+    """ Raised when any item of a bulk request is invalid; nothing is written """
+
+    def __init__(self, results):
+        super().__init__("Validation failed")
+        self.results = results
+
+
+def _existing(column, values):
+    """ Subset of `values` present in `column`, checked with IN-batched queries """
+    found = set()
+    values = sorted(value for value in values if isinstance(value, int))
+    for batch in in_batches(values):
+        found.update(value for (value,) in db.session.query(column).filter(column.in_(batch)))
+    return found
+
+
+def _known(value, found):
+    return isinstance(value, int) and not isinstance(value, bool) and value in found
+
+
+def _field_error(item, assignees):
+    """ First problem with an item's editable values (type, null, allowed value, length), or None """
+    if "title" in item:
+        title = item["title"]
+        if not isinstance(title, str) or not title.strip():
+            return "Title must be a non-empty string"
+        if len(title) > Ticket.title.type.length:
+            return f"Title is longer than {Ticket.title.type.length} characters"
+    if "description" in item and item["description"] is not None and not isinstance(item["description"], str):
+        return "Description must be a string"
+    if "status" in item and item["status"] not in Ticket.STATUS_CHOICES:
+        return f"Status must be one of {', '.join(Ticket.STATUS_CHOICES)}"
+    if "priority" in item and item["priority"] not in Ticket.PRIORITY_CHOICES:
+        return f"Priority must be one of {', '.join(Ticket.PRIORITY_CHOICES)}"
+    if item.get("assigned_user_id") is not None and not _known(item["assigned_user_id"], assignees):
+        return "Assigned user not found"
+    return None
+
+
+def _check_items(items):
+    if not isinstance(items, list) or not items:
+        raise ValueError("Expected a non-empty 'tickets' list")
+    if len(items) > BULK_MAX_ITEMS:
+        raise ValueError(f"At most {BULK_MAX_ITEMS} tickets per request")
+
+
+def _raise_if_invalid(errors, count):
+    if errors:
+        raise BulkValidationError([
+            {"index": index, "ok": False, "error": errors[index]} if index in errors else {"index": index, "ok": True}
+            for index in range(count)
+        ])
+
+
+def _history_row(ticket_id, user_id, change_type, old_value, new_value, now):
+    return {
+        "ticket_id": ticket_id,
+        "changed_by_id": user_id,
+        "change_type": change_type,
+        "old_value": old_value,
+        "new_value": new_value,
+        "changed_at": now,
+    }
+
+
+def _event_fields(row):
+    """ Row values as they appear in Ticket.to_dict() """
+    return {
+        field: format_timestamp(value) if isinstance(value, datetime) else value
+        for field, value in row.items()
+    }
+
+
+def bulk_create_tickets(items, user):
+    """ Validate and insert tickets in one executemany; returns (results, touched project ids) """
+    _check_items(items)
+
+    projects = _existing(Project.id, {item.get("project_id") for item in items if isinstance(item, dict)})
+    assignees = _existing(User.id, {item.get("assigned_user_id") for item in items if isinstance(item, dict)})
+
+    errors = {}
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors[index] = "Expected an object"
+        elif not all(field in item for field in ["title", "description", "project_id"]):
+            errors[index] = "Missing required fields"
+        elif not _known(item["project_id"], projects):
+            errors[index] = "Project not found"
+        elif not can_access_project(user, item["project_id"]):
+            errors[index] = "You are not assigned to this project"
+        elif error := _field_error(item, assignees):
+            errors[index] = error
+    _raise_if_invalid(errors, len(items))
+
+    now = datetime.utcnow()
+    # Bump (and so lock) projects in id order so concurrent bulk writes cannot deadlock
+    project_ids = {item["project_id"] for item in items}
+    versions = {project_id: Project.bump_version(project_id) for project_id in sorted(project_ids)}
+    rows = [
+        {
+            "title": item["title"],
+            "description": item["description"],
+            "project_id": item["project_id"],
+            "assigned_user_id": item.get("assigned_user_id"),
+            "created_by_id": user.id,
+            "status": item.get("status", "To Do"),
+            "priority": item.get("priority", "Medium"),
+            "created_at": now,
+            "updated_at": now,
+            "version": versions[item["project_id"]],
+        }
+        for item in items
+    ]
+    # Batched INSERT ... RETURNING. Guaranteed ordering would make SQLite fall back
+    # to one statement per row; there, multi-row VALUES already return in order.
+    ordered = db.session.get_bind().dialect.name != "sqlite"
+    ticket_ids = db.session.scalars(
+        insert(Ticket).returning(Ticket.id, sort_by_parameter_order=ordered), rows
+    ).all()
+
+    deltas, changes = defaultdict(Counter), defaultdict(list)
+    for ticket_id, row in zip(ticket_ids, rows):
+        deltas[row["project_id"]].update(ticket_deltas(new=(row["status"], row["priority"])))
+        changes[row["project_id"]].append(
+            ticket_change("created", ticket_id, _event_fields({k: v for k, v in row.items() if k != "version"}))
+        )
+
+    for project_id in project_ids:
+        apply_stats_delta(project_id, deltas[project_id], at=now)
+        project_events.queue(project_id, versions[project_id], changes[project_id])
+
+    results = [{"index": index, "ok": True, "id": ticket_id} for index, ticket_id in enumerate(ticket_ids)]
+    return results, project_ids
+
+
+def bulk_update_tickets(items, user):
+    """ Validate and apply partial ticket updates plus history rows in one transaction """
+    _check_items(items)
+
+    ticket_ids = [item.get("id") for item in items if isinstance(item, dict)]
+    current = {}
+    for batch in in_batches(sorted({ticket_id for ticket_id in ticket_ids if isinstance(ticket_id, int)})):
+        rows = db.session.query(Ticket.id, Ticket.project_id, Ticket.status, Ticket.priority).filter(Ticket.id.in_(batch))
+        current.update((row.id, row) for row in rows)
+    assignees = _existing(User.id, {item.get("assigned_user_id") for item in items if isinstance(item, dict)})
+
+    errors = {}
+    seen = set()
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors[index] = "Expected an object"
+        elif not _known(item.get("id"), current):
+            errors[index] = "Ticket not found"
+        elif item["id"] in seen:
+            errors[index] = "Duplicate ticket id"
+        elif not can_access_project(user, current[item["id"]].project_id):
+            errors[index] = "You are not assigned to this project"
+        elif user.role == "guest" and set(item) - {"id", "status"}:
+            errors[index] = "Guests cannot modify tickets except status updates"
+        elif error := _field_error(item, assignees):
+            errors[index] = error
+        if isinstance(item, dict) and isinstance(item.get("id"), int):
+            seen.add(item["id"])
+    _raise_if_invalid(errors, len(items))
+
+    now = datetime.utcnow()
+    project_ids = {current[item["id"]].project_id for item in items if any(field in item for field in EDITABLE_FIELDS)}
+    versions = {project_id: Project.bump_version(project_id) for project_id in sorted(project_ids)}
+    updates, history = [], []
+    for item in items:
+        before = current[item["id"]]
+        changes = {field: item[field] for field in EDITABLE_FIELDS if field in item}
+        if not changes:
+            continue
+        updates.append({"id": item["id"], "updated_at": now, "version": versions[before.project_id], **changes})
+
+        if "status" in changes and changes["status"] != before.status:
+            history.append(_history_row(item["id"], user.id, "Status Change", before.status, changes["status"], now))
+        if "priority" in changes and changes["priority"] != before.priority:
+            history.append(_history_row(item["id"], user.id, "Priority Change", before.priority, changes["priority"], now))
+
+    # ORM bulk UPDATE by primary key → one executemany per run of identical column sets,
+    # so group rows that change the same columns together
+    updates.sort(key=lambda row: sorted(row))
+    if updates:
+        db.session.execute(update(Ticket), updates)
+    if history:
+        db.session.execute(insert(TicketHistory), history)
+
+    deltas, changes = defaultdict(Counter), defaultdict(list)
+    for row in updates:
+        before = current[row["id"]]
+        after = (row.get("status", before.status), row.get("priority", before.priority))
+        deltas[before.project_id].update(ticket_deltas(old=(before.status, before.priority), new=after))
+        changes[before.project_id].append(
+            ticket_change("updated", row["id"], _event_fields({k: v for k, v in row.items() if k not in ("id", "version")}))
+        )
+
+    for project_id in project_ids:
+        apply_stats_delta(project_id, deltas[project_id], at=now)
+        project_events.queue(project_id, versions[project_id], changes[project_id])
+
+    results = [{"index": index, "ok": True, "id": item["id"]} for index, item in enumerate(items)]
+    return results, project_ids
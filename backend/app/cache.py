@@ -0,0 +1,244 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, request
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from werkzeug.utils import import_string
+from .models import db, CacheGeneration
+
+# ==============================================================
+# ✅ Server-side response cache with tag-based invalidation
+# ==============================================================
+#
+# Entries are keyed by (user, endpoint, query string) and remember the
+# generation of every tag they depend on (e.g. "project:7"). Invalidating a
+# tag just increments its generation, so any entry recorded under an older
+# generation is treated as a miss. Generations live in the backend, which
+# makes invalidation work across processes when the backend is shared; the
+# default "database" backend keeps them in the cache_generation table, so an
+# invalidation in one gunicorn worker reaches the entries cached by every other.
+
+
+class CacheBackend:
+    """ Storage interface for ResponseCache
+
+    A shared backend (anything reachable from every gunicorn worker) only has
+    to provide these operations; RedisLikeBackend adapts a redis-py style
+    client. MemoryBackend keeps everything in-process, so it only suits a
+    single worker; DatabaseBackend shares its generations through the database.
+    """
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def incr(self, key):
+        raise NotImplementedError
+
+    def incr_many(self, keys):
+        for key in keys:
+            self.incr(key)
+
+    def get_counters(self, keys):
+        raise NotImplementedError
+
+    def __len__(self):
+        return 0
+
+
+class MemoryBackend(CacheBackend):
+    """ In-process LRU with per-entry TTL (single-process deployments)
+
+    Tag generations are kept outside the LRU so an evicted counter can never
+    reset and make stale entries look current again.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def get_counters(self, keys):
+        with self._lock:
+            return [self._counters.get(key, 0) for key in keys]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DatabaseBackend(MemoryBackend):
+    """ Entries in a per-process LRU, tag generations in the cache_generation table (the default backend)
+
+    Each worker caches its own entries, but every lookup checks them against
+    the shared generations, so a write in any worker invalidates them all.
+    Generations are read on the request's session (no extra connection) and
+    bumped in a short transaction of their own once the write has committed.
+    """
+
+    def incr(self, key):
+        self.incr_many([key])
+
+    def incr_many(self, keys):
+        for key in sorted(keys):  # same order in every worker, so concurrent bumps cannot deadlock
+            bumped = db.session.execute(
+                update(CacheGeneration).where(CacheGeneration.tag == key)
+                .values(generation=CacheGeneration.generation + 1)
+            ).rowcount
+            if not bumped:
+                try:
+                    with db.session.begin_nested():
+                        db.session.execute(insert(CacheGeneration).values(tag=key, generation=1))
+                except IntegrityError:  # another worker created the row first
+                    db.session.execute(
+                        update(CacheGeneration).where(CacheGeneration.tag == key)
+                        .values(generation=CacheGeneration.generation + 1)
+                    )
+        db.session.commit()
+
+    def get_counters(self, keys):
+        generations = dict(db.session.execute(
+            select(CacheGeneration.tag, CacheGeneration.generation).where(CacheGeneration.tag.in_(keys))
+        ).all())
+        return [generations.get(key, 0) for key in keys]
+
+
+class RedisLikeBackend(CacheBackend):
+    """ Adapter for clients exposing get/set(ex=)/incr/mget (e.g. redis.Redis) """
+
+    def __init__(self, client, prefix="pmd:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, json.dumps(value), ex=ttl)
+
+    def incr(self, key):
+        return self.client.incr(self.prefix + key)
+
+    def get_counters(self, keys):
+        return [int(value or 0) for value in self.client.mget([self.prefix + key for key in keys])]
+
+
+class ResponseCache:
+    def __init__(self):
+        self.backend = None
+        self.ttl = 60
+        self.max_body = 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def init_app(self, app):
+        """ RESPONSE_CACHE_BACKEND is "database", "memory" or an import path "module:factory"; factory(app) → CacheBackend """
+        backend = app.config.get("RESPONSE_CACHE_BACKEND", "database")
+        max_entries = app.config.get("RESPONSE_CACHE_MAX_ENTRIES", 1024)
+        if backend == "memory" or (backend == "database" and not max_entries):
+            self.backend = MemoryBackend(max_entries)  # with no entries to keep there is nothing to share
+        elif backend == "database":
+            self.backend = DatabaseBackend(max_entries)
+        else:
+            self.backend = import_string(backend)(app)
+        self.ttl = app.config.get("RESPONSE_CACHE_TTL", 60)
+        self.max_body = app.config.get("RESPONSE_CACHE_MAX_BODY", 1024 * 1024)
+        app.extensions["response_cache"] = self
+
+    def key(self, user_id, endpoint):
+        """ Cache key for the current request (query string included) """
+        return f"resp:{user_id}:{endpoint}:{request.query_string.decode()}"
+
+    def get(self, key):
+        """ Return the cached JSON body, or None on a miss or stale entry """
+        entry = self.backend.get(key)
+        if entry is not None:
+            tags = list(entry["tags"])
+            current = self.backend.get_counters([f"tag:{tag}" for tag in tags])
+            if all(entry["tags"][tag] == generation for tag, generation in zip(tags, current)):
+                self.hits += 1
+                return entry["body"]
+        self.misses += 1
+        return None
+
+    def set(self, key, body, tags):
+        """ Store a body under the tags' current generations
+
+        A write that commits between the caller's query and this call can be
+        recorded as current; RESPONSE_CACHE_TTL bounds how long that lasts.
+        """
+        tags = sorted(set(tags))
+        generations = self.backend.get_counters([f"tag:{tag}" for tag in tags])
+        self.backend.set(key, {"body": body, "tags": dict(zip(tags, generations))}, self.ttl)
+
+    def collect(self, key, parts, tags):
+        """ Pass a streamed body through, caching it once complete if it stays under RESPONSE_CACHE_MAX_BODY
+
+        Generations are read before the first part is produced (i.e. before
+        the stream's query runs), so a write committing mid-stream leaves the
+        entry stale rather than recorded as current.
+        """
+        tags = sorted(set(tags))
+        generations = self.backend.get_counters([f"tag:{tag}" for tag in tags])
+        body, size = [], 0
+        for part in parts:
+            if body is not None:
+                size += len(part)
+                if size <= self.max_body:
+                    body.append(part)
+                else:
+                    body = None  # too big to keep; stop buffering
+            yield part
+
+        if body is not None:
+            self.backend.set(key, {"body": "".join(body), "tags": dict(zip(tags, generations))}, self.ttl)
+
+    def invalidate(self, *tags):
+        self.backend.incr_many([f"tag:{tag}" for tag in tags])
+        self.invalidations += len(tags)
+
+    def respond(self, body):
+        return current_app.response_class(body, mimetype="application/json")
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "invalidations": self.invalidations,
+            "entries": len(self.backend),
+        }
+
+
+response_cache = ResponseCache()
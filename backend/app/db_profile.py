@@ -0,0 +1,57 @@
+import multiprocessing
+import os
+
+# ==============================================================
+# ✅ SQLAlchemy engine options per environment
+# ==============================================================
+#
+# Each gunicorn worker process gets its own pool. A worker runs up to
+# GUNICORN_THREADS requests at once plus AVATAR_WORKERS background upload
+# threads, so that is the number of connections it can use concurrently; the
+# pool is sized to it (never more than its share of DB_MAX_CONNECTIONS,
+# when set) instead of SQLAlchemy's fixed 5 + 10.
+
+
+# gunicorn.conf.py reads its worker/thread counts from here, so the pool is
+# always sized for the number of workers that actually start.
+
+def worker_count():
+    """ gunicorn worker processes: WEB_CONCURRENCY, else 2 × CPUs + 1 (at most 8) """
+    return int(os.getenv("WEB_CONCURRENCY", min(multiprocessing.cpu_count() * 2 + 1, 8)))
+
+
+def threads_per_worker():
+    return int(os.getenv("GUNICORN_THREADS", 4))
+
+
+def connections_per_worker():
+    background = int(os.getenv("AVATAR_WORKERS", 2))
+    wanted = threads_per_worker() + background
+
+    budget = os.getenv("DB_MAX_CONNECTIONS")
+    if budget:
+        wanted = min(wanted, max(int(budget) // worker_count(), 1))
+    return wanted
+
+
+def engine_options(database_uri, production=False):
+    """ SQLALCHEMY_ENGINE_OPTIONS for a database URI and environment """
+    if not database_uri or database_uri.startswith("sqlite"):
+        # Local stand-in: wait for the file lock instead of failing under concurrent writers
+        return {"connect_args": {"timeout": 15}}
+
+    if not production:
+        return {"pool_pre_ping": True}
+
+    size = connections_per_worker()
+    options = {
+        "pool_size": size,
+        "max_overflow": 0,  # the size already covers every thread; overflow would only exceed the budget
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", 10)),  # fail a request rather than hang it
+        "pool_pre_ping": True,  # survive connections dropped by the server or a proxy
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),
+    }
+    if database_uri.startswith("postgres"):
+        statement_timeout = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 15000))
+        options["connect_args"] = {"options": f"-c statement_timeout={statement_timeout}"}
+    return options
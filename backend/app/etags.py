@@ -0,0 +1,30 @@
+import hashlib
+from flask import request, make_response
+
+# ✅ Strong ETags for project-scoped GETs, derived from Project.version
+#
+# The URL (path + query string) is folded into the tag because the same
+# project version is rendered differently by each endpoint and by
+# ?fields= / ?include= / pagination parameters.
+
+
+def project_etag(project_id, version):
+    digest = hashlib.sha1(request.full_path.encode()).hexdigest()[:16]
+    return f"p{project_id}-v{version}-{digest}"
+
+
+def not_modified(etag):
+    """ Return a 304 response if the client's If-None-Match already has this ETag, else None """
+    if not request.if_none_match.contains(etag):
+        return None
+    response = make_response("", 304)
+    response.set_etag(etag)
+    return response
+
+
+def tag_response(result, etag):
+    """ Attach an ETag to a (response, status) tuple returned by a route """
+    response, status = result
+    if status == 200:
+        response.set_etag(etag)
+    return response, status
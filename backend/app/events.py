@@ -0,0 +1,244 @@
+import json
+import threading
+import time
+from collections import deque
+from sqlalchemy import delete, event, insert, select
+from werkzeug.utils import import_string
+from .db_profile import threads_per_worker
+from .models import db, ProjectEvent
+
+# ==============================================================
+# ✅ Per-project change events (Server-Sent Events fan-out)
+# ==============================================================
+#
+# Write routes queue compact change records while their transaction is open;
+# they reach the broker only once the session commits and are dropped on
+# rollback, so subscribers never see a change that did not happen. An event's
+# id is the project version its write produced, so resuming from
+# Last-Event-ID means "everything after version N".
+
+
+class Broker:
+    """ Fan-out interface for project events
+
+    A shared broker (anything reachable from every gunicorn worker, e.g. Redis
+    streams) only has to provide publish and wait. DatabaseBroker (the
+    default) shares events through the database; InProcessBroker only sees
+    events written by its own process, so it suits a single worker.
+    """
+
+    def record(self, session, project_id, item):
+        """ Called while the writing transaction is still open, before publish """
+
+    def publish(self, project_id, item):
+        """ Deliver `item` (an event dict with an integer "id") to the project's subscribers """
+        raise NotImplementedError
+
+    def wait(self, project_id, after, timeout):
+        """ Events with id > `after`, blocking up to `timeout` seconds while there are none
+
+        Returns None when the retained history no longer reaches back to
+        `after`, i.e. the caller may have missed events and must resync.
+        """
+        raise NotImplementedError
+
+
+class DatabaseBroker(Broker):
+    """ Events stored in the project_event table and polled by subscribers (the default broker)
+
+    The row is written in the same transaction as the change, so every worker
+    sees it once (and only if) it commits; subscribers poll every
+    EVENT_POLL_INTERVAL seconds on a connection they hold only for the query.
+    Rows more than EVENT_HISTORY versions behind a project's newest event are
+    pruned as new ones are written.
+    """
+
+    PRUNE_EVERY = 64  # versions between prunes, so most writes only insert
+
+    def __init__(self, engine, history=256, poll_interval=1.0):
+        self.engine = engine
+        self.history = history
+        self.poll_interval = poll_interval
+
+    def record(self, session, project_id, item):
+        version = item["id"]
+        session.execute(insert(ProjectEvent).values(project_id=project_id, version=version, payload=json.dumps(item)))
+        if version % self.PRUNE_EVERY == 0:
+            session.execute(
+                delete(ProjectEvent)
+                .where(ProjectEvent.project_id == project_id, ProjectEvent.version <= version - self.history)
+            )
+
+    def publish(self, project_id, item):
+        pass  # already committed by record()
+
+    def wait(self, project_id, after, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            events = self._read(project_id, after)
+            remaining = deadline - time.monotonic()
+            if events is None or events or remaining <= 0:
+                return events
+            time.sleep(min(self.poll_interval, remaining))
+
+    def _read(self, project_id, after):
+        with self.engine.connect() as connection:
+            payloads = connection.scalars(
+                select(ProjectEvent.payload)
+                .where(ProjectEvent.project_id == project_id, ProjectEvent.version > after)
+                .order_by(ProjectEvent.version, ProjectEvent.id)
+            ).all()
+        events = [json.loads(payload) for payload in payloads]
+        # Every event within `history` versions of the newest one is retained
+        if events and after < events[-1]["id"] - self.history:
+            return None
+        return events
+
+
+def database_broker(app):
+    with app.app_context():
+        engine = db.engine
+    return DatabaseBroker(engine, app.config.get("EVENT_HISTORY", 256), app.config.get("EVENT_POLL_INTERVAL", 1.0))
+
+
+class _Channel:
+    def __init__(self, floor, history):
+        self.floor = floor  # every event with id > floor is still retained
+        self.events = deque(maxlen=history)
+
+
+class InProcessBroker(Broker):
+    """ Per-project ring buffers guarded by one condition variable (single-process deployments) """
+
+    def __init__(self, history=256):
+        self.history = history
+        self._channels = {}
+        self._condition = threading.Condition()
+
+    def publish(self, project_id, item):
+        with self._condition:
+            channel = self._channels.get(project_id)
+            if channel is None:
+                channel = self._channels[project_id] = _Channel(item["id"] - 1, self.history)
+            if len(channel.events) == channel.events.maxlen:
+                channel.floor = channel.events[0]["id"]
+            channel.events.append(item)
+            self._condition.notify_all()
+
+    def wait(self, project_id, after, timeout):
+        with self._condition:
+            channel = self._channels.get(project_id)
+            if channel is None:
+                # Nothing published since this process started: without history
+                # we can only vouch for `after` if it is the caller's current version
+                if timeout == 0:
+                    return None
+                channel = self._channels[project_id] = _Channel(after, self.history)
+
+            self._condition.wait_for(
+                lambda: channel.floor > after or (channel.events and channel.events[-1]["id"] > after),
+                timeout,
+            )
+            if channel.floor > after:
+                return None
+            return [item for item in channel.events if item["id"] > after]
+
+
+class ProjectEvents:
+    def __init__(self):
+        self.broker = None
+        self.heartbeat = 15
+        self.max_stream = 300
+        self.max_streams = 3
+        self._open_streams = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """ EVENT_BROKER is "database", "memory" or an import path "module:factory"; factory(app) → Broker """
+        broker = app.config.get("EVENT_BROKER", "database")
+        if broker == "database":
+            self.broker = database_broker(app)
+        elif broker == "memory":
+            self.broker = InProcessBroker(app.config.get("EVENT_HISTORY", 256))
+        else:
+            self.broker = import_string(broker)(app)
+        self.heartbeat = app.config.get("EVENT_HEARTBEAT", 15)
+        self.max_stream = app.config.get("EVENT_MAX_STREAM", 300)
+        # ✅ Each open stream holds a worker thread: leave at least one for ordinary requests
+        self.max_streams = app.config.get("EVENT_MAX_STREAMS") or max(threads_per_worker() - 1, 1)
+        app.extensions["project_events"] = self
+
+    def queue(self, project_id, version, changes):
+        """ Publish `changes` as event `version` once the current transaction commits """
+        if changes:
+            item = {"id": version, "version": version, "changes": changes}
+            self.broker.record(db.session, project_id, item)
+            db.session.info.setdefault("pending_events", []).append((project_id, item))
+
+    def open_stream(self):
+        """ Claim one of this worker's EVENT_MAX_STREAMS stream slots; False when all are taken """
+        with self._lock:
+            if self._open_streams >= self.max_streams:
+                return False
+            self._open_streams += 1
+            return True
+
+    def close_stream(self):
+        with self._lock:
+            self._open_streams -= 1
+
+    def stream(self, project_id, after, backlog=()):
+        """ SSE body: `backlog`, then live events after `after`, heartbeats in between
+
+        A backlog of None means the client's history is gone: it gets a "reset"
+        event (refetch, then carry on from version `after`). The stream also ends
+        with "reset" if events are missed mid-stream, and after EVENT_MAX_STREAM
+        seconds so a long-lived client does not pin a worker; EventSource
+        reconnects on its own and resumes from Last-Event-ID.
+        """
+        deadline = time.monotonic() + self.max_stream
+        yield f"retry: {self.heartbeat * 1000}\n\n"
+        if backlog is None:
+            yield format_event({"id": after, "version": after}, name="reset")
+            backlog = ()
+        for item in backlog:
+            yield format_event(item)
+
+        while time.monotonic() < deadline:
+            events = self.broker.wait(project_id, after, self.heartbeat)
+            if events is None:
+                yield format_event({"version": after}, name="reset")
+                return
+            if not events:
+                yield ": keep-alive\n\n"
+            for item in events:
+                yield format_event(item)
+                after = item["id"]
+
+
+def format_event(item, name="change"):
+    data = json.dumps(item, sort_keys=True, separators=(",", ":"))
+    event_id = f"id: {item['id']}\n" if "id" in item else ""
+    return f"{event_id}event: {name}\ndata: {data}\n\n"
+
+
+def ticket_change(op, ticket_id, fields=None):
+    """ Compact change record: {"type", "op", "id"} plus changed field values """
+    change = {"type": "ticket", "op": op, "id": ticket_id}
+    if fields:
+        change["fields"] = fields
+    return change
+
+
+project_events = ProjectEvents()
+
+
+@event.listens_for(db.session, "after_commit")
+def _publish_pending(session):
+    for project_id, item in session.info.pop("pending_events", []):
+        project_events.broker.publish(project_id, item)
+
+
+@event.listens_for(db.session, "after_soft_rollback")
+def _drop_pending(session, previous_transaction):
+    session.info.pop("pending_events", None)
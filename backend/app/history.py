@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from sqlalchemy import delete, func, insert, select, tuple_, union_all
+from .models import db, TicketHistory, TicketHistoryArchive, User, format_timestamp
+from .pagination import encode_cursor
+
+# ==============================================================
+# ✅ Tiered ticket history (hot table + archive)
+# ==============================================================
+#
+# ticket_history keeps the last HISTORY_HOT_DAYS of changes, so its size (and
+# index depth) follows the write rate rather than the age of the install.
+# `flask archive-history` moves older rows in batches to
+# ticket_history_archive, ids included. Reads merge both tiers with one
+# keyset-paginated UNION ALL; each branch seeks its own
+# (ticket_id, changed_at, id) index, so callers never see the split.
+
+COLUMNS = ("id", "ticket_id", "changed_by_id", "change_type", "old_value", "new_value", "changed_at")
+
+
+def _tier(model, ticket_id, before, limit):
+    query = (
+        select(
+            model.id, model.ticket_id, User.username.label("changed_by"),
+            model.change_type, model.old_value, model.new_value, model.changed_at,
+        )
+        .outerjoin(User, User.id == model.changed_by_id)  # ✅ author in the same query
+        .where(model.ticket_id == ticket_id)
+    )
+    if before is not None:
+        query = query.where(tuple_(model.changed_at, model.id) < tuple_(*before))
+    query = query.order_by(model.changed_at.desc(), model.id.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    # Wrapped so the per-branch ORDER BY/LIMIT is valid inside a compound SELECT
+    return select(query.subquery())
+
+
+def history_page(ticket_id, limit=None, before=None):
+    """ A ticket's history across both tiers, newest first
+
+    `before` is a decoded cursor (changed_at, id). Returns (entries,
+    next_cursor); without a limit every entry is returned and next_cursor is
+    None.
+    """
+    fetch = limit + 1 if limit is not None else None  # one extra row tells whether there is another page
+    tiers = union_all(
+        _tier(TicketHistory, ticket_id, before, fetch),
+        _tier(TicketHistoryArchive, ticket_id, before, fetch),
+    ).subquery()
+    query = select(tiers).order_by(tiers.c.changed_at.desc(), tiers.c.id.desc())
+    if fetch is not None:
+        query = query.limit(fetch)
+    rows = db.session.execute(query).all()
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].changed_at, rows[-1].id)
+
+    return [
+        {
+            "id": row.id,
+            "ticket_id": row.ticket_id,
+            "changed_by": row.changed_by,
+            "change_type": row.change_type,
+            "old_value": row.old_value,
+            "new_value": row.new_value,
+            "changed_at": format_timestamp(row.changed_at),
+        }
+        for row in rows
+    ], next_cursor
+
+
+def delete_history(ticket_id):
+    """ Remove a ticket's history from both tiers (inside the caller's transaction) """
+    for model in (TicketHistory, TicketHistoryArchive):
+        db.session.execute(delete(model).where(model.ticket_id == ticket_id))
+
+
+def archive_history(cutoff, batch_size=1000, max_batches=None):
+    """ Move ticket_history rows changed before `cutoff` to the archive, committing per batch
+
+    Hot ids are never reissued (AUTOINCREMENT on SQLite, a sequence
+    elsewhere), so an archived id cannot come back as a new hot row.
+    Returns the number of rows moved.
+    """
+    moved = batches = 0
+    while max_batches is None or batches < max_batches:
+        ids = db.session.scalars(
+            select(TicketHistory.id)
+            .where(TicketHistory.changed_at < cutoff)
+            .order_by(TicketHistory.changed_at, TicketHistory.id)
+            .limit(batch_size)
+        ).all()
+        if not ids:
+            break
+
+        hot_columns = [getattr(TicketHistory, column) for column in COLUMNS]
+        db.session.execute(
+            insert(TicketHistoryArchive).from_select(COLUMNS, select(*hot_columns).where(TicketHistory.id.in_(ids)))
+        )
+        db.session.execute(delete(TicketHistory).where(TicketHistory.id.in_(ids)))
+        db.session.commit()  # short transactions: writers are never blocked for long
+        moved += len(ids)
+        batches += 1
+    return moved
+
+
+@click.command("archive-history")
+@click.option("--older-than-days", type=int, default=None, help="Default: HISTORY_HOT_DAYS.")
+@click.option("--batch-size", type=int, default=None, help="Default: HISTORY_ARCHIVE_BATCH_SIZE.")
+@click.option("--max-batches", type=int, default=None, help="Stop after this many batches (e.g. per cron run).")
+def archive_history_command(older_than_days, batch_size, max_batches):
+    """ Move ticket history older than the hot window to ticket_history_archive """
+    days = older_than_days if older_than_days is not None else current_app.config.get("HISTORY_HOT_DAYS", 90)
+    batch_size = batch_size or current_app.config.get("HISTORY_ARCHIVE_BATCH_SIZE", 1000)
+    cutoff = datetime.utcnow() - timedelta(days=days)
+
+    moved = archive_history(cutoff, batch_size, max_batches)
+    hot = db.session.scalar(select(func.count()).select_from(TicketHistory))
+    click.echo(f"Archived {moved} history row(s) older than {cutoff:%Y-%m-%d %H:%M}; {hot} remain in ticket_history")
@@ -0,0 +1,78 @@
+import re
+from flask.json.provider import DefaultJSONProvider, JSONProvider, _default
+from werkzeug.utils import import_string
+
+try:
+    import orjson
+except ImportError:  # optional: without it "fast" falls back to the stdlib provider
+    orjson = None
+
+# ==============================================================
+# ✅ JSON provider (jsonify, request.json)
+# ==============================================================
+#
+# JSON_PROVIDER is "fast" (orjson when installed, otherwise Flask's stdlib
+# provider), "stdlib", or an import path "module:Class" to a Flask
+# JSONProvider subclass. The orjson provider produces the same bytes as the
+# stdlib one for the documents this API returns: keys sorted, dates/datetimes
+# left to Flask's default (HTTP dates), compact unless debugging, and
+# non-ASCII escaped as \uXXXX while ensure_ascii is set (orjson itself only
+# writes UTF-8). Floats may still differ in notation (1e16 vs 1e+16).
+
+_NON_ASCII = re.compile(r"[^\x00-\x7f]")
+
+
+def _escape(match):
+    code = ord(match.group())
+    if code > 0xFFFF:  # as json.dumps does: a UTF-16 surrogate pair
+        code -= 0x10000
+        return "\\u%04x\\u%04x" % (0xD800 | code >> 10, 0xDC00 | code & 0x3FF)
+    return "\\u%04x" % code
+
+
+def escape_non_ascii(data):
+    """ orjson output with non-ASCII characters escaped, as json.dumps(ensure_ascii=True) writes them """
+    if data.isascii():
+        return data
+    # Outside strings a JSON document is pure ASCII, so every match is inside one
+    return _NON_ASCII.sub(_escape, data.decode()).encode()
+
+
+class OrjsonProvider(JSONProvider):
+    """ orjson-backed drop-in for Flask's DefaultJSONProvider """
+
+    ensure_ascii = True
+    compact = None
+    mimetype = "application/json"
+
+    if orjson is not None:
+        option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(self, obj, **kwargs):
+        return self._encode(obj, indent=bool(kwargs.get("indent"))).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        # Bytes go straight into the response; no str round trip
+        return self._app.response_class(self._encode(obj, indent) + b"\n", mimetype=self.mimetype)
+
+    def _encode(self, obj, indent=False):
+        data = orjson.dumps(obj, default=_default, option=self.option | (orjson.OPT_INDENT_2 if indent else 0))
+        return escape_non_ascii(data) if self.ensure_ascii else data
+
+
+PROVIDERS = {
+    "stdlib": DefaultJSONProvider,
+    "fast": OrjsonProvider if orjson is not None else DefaultJSONProvider,
+}
+
+
+def json_provider(app):
+    """ Build the provider named by JSON_PROVIDER for `app` """
+    name = app.config.get("JSON_PROVIDER", "fast")
+    provider_class = PROVIDERS[name] if name in PROVIDERS else import_string(name)
+    return provider_class(app)
@@ -0,0 +1,208 @@
+import hmac
+import threading
+import time
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from .models import db
+
+# ==============================================================
+# ✅ Per-request SQL instrumentation and Prometheus metrics
+# ==============================================================
+#
+# Engine hooks count and time every statement issued while a request is
+# being handled; statements slower than SLOW_QUERY_THRESHOLD are logged with
+# the route that ran them. Each response carries a Server-Timing header
+# (db, serialize, total) and the totals feed per-route histograms served by
+# GET /api/_metrics in Prometheus text format. Counters are per process, so
+# scrape every gunicorn worker (or aggregate them) as with /_cache/stats.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+        self.total += value
+        self.count += 1
+
+    def snapshot(self):
+        return {"buckets": self.buckets, "counts": list(self.counts), "total": self.total, "count": self.count}
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.slow_query_threshold = 0.25
+        self.buckets = DEFAULT_BUCKETS
+        self.token = None
+        self._requests = {}  # (method, route) → {"duration": _Histogram, "db": _Histogram, "queries": int}
+        self._responses = {}  # (method, route, status) → count
+        self._slow_queries = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """ Register the engine hooks and request hooks; call after db.init_app """
+        self.slow_query_threshold = app.config.get("SLOW_QUERY_THRESHOLD", 0.25)
+        self.buckets = tuple(app.config.get("METRICS_BUCKETS") or DEFAULT_BUCKETS)
+        self.token = app.config.get("METRICS_TOKEN")
+
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+                event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+        self.instrument_json(app.json)  # set app.json before init_app
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.extensions["request_metrics"] = self
+
+    def token_matches(self, authorization):
+        """ True when an Authorization header carries METRICS_TOKEN (scrapers without a JWT) """
+        return bool(self.token) and hmac.compare_digest(authorization, f"Bearer {self.token}")
+
+    def instrument_json(self, provider):
+        """ Time jsonify() encoding as "serialize", whichever JSON provider is configured """
+        response = provider.response
+
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return response(*args, **kwargs)
+            finally:
+                if has_request_context() and "metrics" in g:
+                    g.metrics["serialize"] += time.perf_counter() - started
+
+        provider.response = timed
+
+    # ---- engine hooks --------------------------------------------------
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        # Only statements run on behalf of a request (not background workers)
+        started = getattr(context, "_metrics_started", None)
+        if started is None or not has_request_context() or "metrics" not in g:
+            return
+
+        elapsed = time.perf_counter() - started
+        g.metrics["queries"] += 1
+        g.metrics["db"] += elapsed
+        if elapsed >= self.slow_query_threshold:
+            with self._lock:
+                self._slow_queries += 1
+            current_app.logger.warning(
+                "Slow query (%.1f ms) in %s %s: %s",
+                elapsed * 1000, request.method, _route(), " ".join(statement.split())[:1000],
+            )
+
+    # ---- request hooks -------------------------------------------------
+
+    def _start_request(self):
+        g.metrics = {"started": time.perf_counter(), "queries": 0, "db": 0.0, "serialize": 0.0}
+
+    def _finish_request(self, response):
+        metrics = g.pop("metrics", None)
+        if metrics is None:
+            return response
+
+        total = time.perf_counter() - metrics["started"]
+        response.headers["Server-Timing"] = (
+            f'db;dur={metrics["db"] * 1000:.1f};desc="{metrics["queries"]} queries", '
+            f'serialize;dur={metrics["serialize"] * 1000:.1f}, '
+            f'total;dur={total * 1000:.1f}'
+        )
+        response.headers["Timing-Allow-Origin"] = "*"
+
+        key = (request.method, _route())
+        with self._lock:
+            route = self._requests.get(key)
+            if route is None:
+                route = self._requests[key] = {
+                    "duration": _Histogram(self.buckets), "db": _Histogram(self.buckets), "queries": 0,
+                }
+            route["duration"].observe(total)
+            route["db"].observe(metrics["db"])
+            route["queries"] += metrics["queries"]
+            status = key + (response.status_code,)
+            self._responses[status] = self._responses.get(status, 0) + 1
+        return response
+
+    # ---- exposition ----------------------------------------------------
+
+    def render(self):
+        """ All metrics in Prometheus text exposition format (version 0.0.4) """
+        with self._lock:
+            requests = {key: (route["duration"].snapshot(), route["db"].snapshot(), route["queries"])
+                        for key, route in self._requests.items()}
+            responses = dict(self._responses)
+            slow_queries = self._slow_queries
+
+        lines = []
+        for name, index, help_text in (
+            ("http_request_duration_seconds", 0, "Time spent handling requests, by route."),
+            ("http_request_db_seconds", 1, "Time spent in SQL statements per request, by route."),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for (method, route), values in sorted(requests.items()):
+                histogram = values[index]
+                labels = f'method="{method}",route="{_escape(route)}"'
+                for bound, count in zip(histogram["buckets"], histogram["counts"]):
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram["count"]}')
+                lines.append(f"{name}_sum{{{labels}}} {histogram['total']:.6f}")
+                lines.append(f"{name}_count{{{labels}}} {histogram['count']}")
+
+        lines += ["# HELP http_request_db_queries_total SQL statements issued by requests, by route.",
+                  "# TYPE http_request_db_queries_total counter"]
+        for (method, route), values in sorted(requests.items()):
+            lines.append(f'http_request_db_queries_total{{method="{method}",route="{_escape(route)}"}} {values[2]}')
+
+        lines += ["# HELP http_responses_total Responses sent, by route and status code.",
+                  "# TYPE http_responses_total counter"]
+        for (method, route, status), count in sorted(responses.items()):
+            lines.append(f'http_responses_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {count}')
+
+        lines += ["# HELP db_slow_queries_total Statements slower than SLOW_QUERY_THRESHOLD.",
+                  "# TYPE db_slow_queries_total counter",
+                  f"db_slow_queries_total {slow_queries}"]
+
+        lines += _pool_lines()
+        return "\n".join(lines) + "\n"
+
+
+def _route():
+    # The URL rule, not the path, so ids do not explode the label set
+    return request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _pool_lines():
+    gauges = {
+        "db_pool_size": ("Connections the pool keeps open.", "size"),
+        "db_pool_checked_out": ("Connections currently in use.", "checkedout"),
+        "db_pool_checked_in": ("Idle connections in the pool.", "checkedin"),
+        "db_pool_overflow": ("Connections open beyond the pool size.", "overflow"),
+    }
+    lines = []
+    for name, (help_text, method) in gauges.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+        for key, engine in db.engines.items():
+            # Only QueuePool reports these (SQLite in-memory uses SingletonThreadPool)
+            if hasattr(engine.pool, method):
+                lines.append(f'{name}{{bind="{key or "default"}"}} {getattr(engine.pool, method)()}')
+    return lines
+
+
+request_metrics = RequestMetrics()
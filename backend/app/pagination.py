@@ -0,0 +1,89 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import tuple_
+from .models import Ticket
+
+# ✅ Page sizes for cursor pagination (?limit=)
+MAX_PAGE_SIZE = 500
+
+
+class PaginationError(ValueError):
+    """ Raised for malformed ?limit= / ?cursor= / filter values (reported as HTTP 400) """
+
+
+def encode_cursor(updated_at, ticket_id):
+    raw = json.dumps([updated_at.isoformat(), ticket_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        updated_at, ticket_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(updated_at), int(ticket_id)
+    except (ValueError, TypeError):
+        raise PaginationError("Invalid cursor")
+
+
+def _split(value):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def filter_tickets(query, args):
+    """ Push ?status=, ?priority= and ?assignee= filters into the WHERE clause
+
+    Each filter accepts a comma-separated list; `assignee=none` matches unassigned tickets.
+    """
+    if args.get("status"):
+        query = query.filter(Ticket.status.in_(_split(args["status"])))
+    if args.get("priority"):
+        query = query.filter(Ticket.priority.in_(_split(args["priority"])))
+    if args.get("assignee"):
+        assignees = _split(args["assignee"])
+        unassigned = "none" in assignees
+        try:
+            user_ids = [int(value) for value in assignees if value != "none"]
+        except ValueError:
+            raise PaginationError("Invalid assignee")
+        condition = Ticket.assigned_user_id.in_(user_ids)
+        if unassigned:
+            condition = condition | Ticket.assigned_user_id.is_(None)
+        query = query.filter(condition)
+    return query
+
+
+def wants_page(args):
+    return "limit" in args or "cursor" in args
+
+
+def parse_limit(args):
+    try:
+        limit = int(args.get("limit", MAX_PAGE_SIZE))
+    except ValueError:
+        raise PaginationError("Invalid limit")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise PaginationError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return limit
+
+
+def paginate_tickets(query, args):
+    """ Keyset pagination on (updated_at, id), most recently updated first
+
+    Returns (tickets, next_cursor). Seeking past the cursor instead of using
+    OFFSET keeps the cost of any page independent of how deep it is.
+    """
+    limit = parse_limit(args)
+
+    if args.get("cursor"):
+        updated_at, ticket_id = decode_cursor(args["cursor"])
+        query = query.filter(tuple_(Ticket.updated_at, Ticket.id) < tuple_(updated_at, ticket_id))
+
+    # Fetch one extra row to learn whether another page exists
+    rows = query.order_by(Ticket.updated_at.desc(), Ticket.id.desc()).limit(limit + 1).all()
+    tickets = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = tickets[-1]
+        next_cursor = encode_cursor(last.updated_at, last.id)
+    return tickets, next_cursor
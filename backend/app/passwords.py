@@ -0,0 +1,168 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from flask import jsonify
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+# ==============================================================
+# ✅ Password hashing off the request thread
+# ==============================================================
+#
+# scrypt/pbkdf2 are deliberately CPU-heavy. Hashes are computed in a small
+# per-process pool of hashing processes; at most PASSWORD_HASH_QUEUE_LIMIT
+# hashes may be pending per web worker, beyond that callers get
+# HasherBusy straight away (reported as 503) instead of piling up behind a
+# login burst. A slot is held until the hash actually finishes, even when the
+# caller gave up after PASSWORD_HASH_TIMEOUT, so the limit bounds real work.
+# PASSWORD_HASH_WORKERS = 0 hashes inline, e.g. for local dev.
+
+DEFAULT_METHOD = "scrypt:32768:8:1"
+
+
+def full_method(method):
+    """ A werkzeug method string with its defaults spelled out, as it prefixes the hashes it makes
+
+    e.g. "pbkdf2" → "pbkdf2:sha256:1000000" (werkzeug's current default
+    iterations), "scrypt" → "scrypt:32768:8:1".
+    """
+    name, *args = method.split(":")
+    if name == "scrypt" and len(args) in (0, 3):
+        n, r, p = args if args else (2 ** 15, 8, 1)
+        return f"scrypt:{int(n)}:{int(r)}:{int(p)}"
+    if name == "pbkdf2" and len(args) <= 2:
+        hash_name = args[0] if args else "sha256"
+        iterations = int(args[1]) if len(args) == 2 else DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{hash_name}:{iterations}"
+    raise ValueError(f"Invalid PASSWORD_HASH_METHOD {method!r}")
+
+
+class HasherBusy(Exception):
+    """ Raised when the hashing queue is full; the caller should retry later """
+
+
+class PasswordHasher:
+    def __init__(self):
+        self.method = DEFAULT_METHOD
+        self.workers = 0
+        self.queue_limit = 0
+        self.timeout = None
+        self._slots = None
+        self._executor = None
+        self._lock = threading.Lock()
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def init_app(self, app):
+        """ PASSWORD_HASH_METHOD is any werkzeug method string, e.g. "scrypt:32768:8:1" or "pbkdf2:sha256:600000" """
+        self.method = full_method(app.config.get("PASSWORD_HASH_METHOD", DEFAULT_METHOD))
+        self.workers = app.config.get("PASSWORD_HASH_WORKERS", 0)
+        self.queue_limit = app.config.get("PASSWORD_HASH_QUEUE_LIMIT") or max(self.workers, 1) * 4
+        self.timeout = app.config.get("PASSWORD_HASH_TIMEOUT", 10)
+        self._slots = threading.BoundedSemaphore(self.queue_limit)
+        app.register_error_handler(HasherBusy, self._busy_response)
+        app.extensions["password_hasher"] = self
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, stored, password):
+        return self._run(check_password_hash, stored, password)
+
+    def hash_many(self, passwords):
+        """ Hash a batch (e.g. a user import) across the pool; takes one queue slot
+
+        Work is submitted a few hashes per process at a time, so logins that
+        arrive meanwhile are queued behind one window rather than the batch.
+        """
+        def run(submit):
+            if not self.workers:
+                return [generate_password_hash(password, self.method) for password in passwords]
+            hashes = []
+            window = self.workers * 2
+            for start in range(0, len(passwords), window):
+                futures = [submit(generate_password_hash, password, self.method)
+                           for password in passwords[start:start + window]]
+                hashes += [future.result(timeout=self.timeout) for future in futures]
+            return hashes
+
+        return self._guarded(run)
+
+    def needs_rehash(self, stored):
+        """ True when a stored hash was made with other parameters than PASSWORD_HASH_METHOD """
+        return stored.split("$", 1)[0] != self.method
+
+    def _run(self, function, *args):
+        if not self.workers:
+            return self._guarded(lambda submit: function(*args))
+        return self._guarded(lambda submit: submit(function, *args).result(timeout=self.timeout))
+
+    def _guarded(self, work):
+        """ Call work(submit) holding a queue slot; work submits to the pool through `submit` """
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise HasherBusy("Too many password operations in progress")
+        futures = []
+
+        def submit(function, *args):
+            future = self._pool().submit(function, *args)
+            futures.append(future)
+            return future
+
+        try:
+            return work(submit)
+        except TimeoutError:
+            for future in futures:
+                future.cancel()  # drop what has not started; running hashes finish and then free the slot
+            raise HasherBusy("Password hashing timed out")
+        except BrokenProcessPool:
+            # A hashing process died; start a fresh pool for the next caller
+            with self._lock:
+                self._executor = None
+            raise HasherBusy("Password hashing pool restarted")
+        finally:
+            _release_when_done(slots, futures)
+
+    def _after_fork(self):
+        # The parent's hashing processes belong to the parent; start over (lazily) in this one
+        self._executor = None
+        self._lock = threading.Lock()
+        if self._slots is not None:
+            self._slots = threading.BoundedSemaphore(self.queue_limit)
+
+    def _pool(self):
+        # Created on first use, i.e. after gunicorn has forked this worker; the
+        # children are spawned rather than forked from a threaded process
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _busy_response(self, error):
+        return jsonify({"error": "Server busy, please retry"}), 503, {"Retry-After": "1"}
+
+
+def _release_when_done(slots, futures):
+    """ Release `slots` once every future has finished (right away if they all have) """
+    running = [future for future in futures if not future.done()]
+    if not running:
+        slots.release()
+        return
+
+    remaining = [len(running)]
+    lock = threading.Lock()
+
+    def finished(future):
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            slots.release()
+
+    for future in running:
+        future.add_done_callback(finished)
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,441 @@
+import shutil
+import tempfile
+import zipfile
+from collections import Counter
+from datetime import date, datetime
+from sqlalchemy import func, insert, select, union
+from .models import db, Project, Ticket, TicketHistory, TicketHistoryArchive, User, in_batches, project_assignments
+from .stats import rebuild_project_stats
+from .streaming import STREAM_CHUNK_SIZE, UPLOAD_BUFFER_SIZE, RecordError, read_records, record_format
+from .user_import import IMPORT_CHUNK_SIZE, MAX_REPORTED_ERRORS
+
+# ==============================================================
+# ✅ Project export / import archives (admin)
+# ==============================================================
+#
+# An archive is NDJSON, one record per line, each tagged with its "type", in
+# this order:
+#
+#   archive     {"format": "project-archive", "version": 1, "exported_at": ...}
+#   project     the project row
+#   user        every user the project refers to (id, username, email)
+#   assignment  {"user_id": ...}
+#   ticket      every ticket
+#   history     every TicketHistory entry, from both tiers (see app/history.py)
+#
+# Ids are the exporting database's. An import matches users by email (they
+# must exist; POST /api/users/import moves them) and gives the project, its
+# tickets and their history new ids, inserting them a chunk at a time with
+# executemany. The zip variant holds the same NDJSON as one member.
+#
+# Exports read each table with a server-side cursor (yield_per) and send a
+# chunk before reading the next, so memory stays flat. On PostgreSQL all of
+# them read one REPEATABLE READ snapshot; on SQLite a write during the export
+# can leave a reference the import then rejects.
+
+ARCHIVE_FORMAT = "project-archive"
+ARCHIVE_VERSION = 1
+ARCHIVE_MEMBER = "project.ndjson"
+ZIP_MIMETYPES = ("application/zip", "application/x-zip-compressed")
+
+SECTIONS = ("archive", "project", "user", "assignment", "ticket", "history")
+
+PROJECT_COLUMNS = ("id", "title", "description", "created_at", "start_date", "end_date", "status", "owner_id")
+TICKET_COLUMNS = ("id", "title", "description", "status", "priority", "created_at", "updated_at",
+                  "assigned_user_id", "created_by_id")
+HISTORY_COLUMNS = ("ticket_id", "changed_by_id", "change_type", "old_value", "new_value", "changed_at")
+
+
+class ProjectImportError(Exception):
+    """ Raised when an archive cannot be imported; nothing is written """
+
+    def __init__(self, errors, count):
+        super().__init__(f"{count} invalid record(s)")
+        self.errors = errors  # the first MAX_REPORTED_ERRORS
+        self.count = count
+
+
+# --------------------------------------------------------------
+# Export
+# --------------------------------------------------------------
+
+def _encode(kind, row):
+    record = {"type": kind}
+    for key, value in row._asdict().items():
+        record[key] = value.isoformat() if isinstance(value, date) else value
+    return record
+
+
+def _records(kind, statement):
+    rows = db.session.execute(statement.execution_options(yield_per=STREAM_CHUNK_SIZE))
+    for partition in rows.partitions():
+        yield [_encode(kind, row) for row in partition]
+
+
+def _referenced_users(project_id):
+    tickets = select(Ticket.id).where(Ticket.project_id == project_id)
+    return union(
+        select(Project.owner_id).where(Project.id == project_id),
+        select(project_assignments.c.user_id).where(project_assignments.c.project_id == project_id),
+        select(Ticket.assigned_user_id).where(Ticket.project_id == project_id, Ticket.assigned_user_id.isnot(None)),
+        select(Ticket.created_by_id).where(Ticket.project_id == project_id),
+        *(select(model.changed_by_id).where(model.ticket_id.in_(tickets)) for model in (TicketHistory, TicketHistoryArchive)),
+    )
+
+
+def archive_chunks(project_id):
+    """ The archive records of a project in import order, a chunk at a time (see above) """
+    if db.session.get_bind().dialect.name == "postgresql":
+        # Every query below sees the same snapshot, so concurrent writes cannot
+        # leave history pointing at a ticket (or user) the archive lacks
+        db.session.rollback()
+        db.session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+    header = {"type": "archive", "format": ARCHIVE_FORMAT, "version": ARCHIVE_VERSION,
+              "exported_at": datetime.utcnow().isoformat()}
+    yield [header]
+    yield from _records("project", select(*(getattr(Project, c) for c in PROJECT_COLUMNS)).where(Project.id == project_id))
+    yield from _records(
+        "user", select(User.id, User.username, User.email).where(User.id.in_(_referenced_users(project_id))).order_by(User.id)
+    )
+    yield from _records(
+        "assignment",
+        select(project_assignments.c.user_id)
+        .where(project_assignments.c.project_id == project_id)
+        .order_by(project_assignments.c.user_id),
+    )
+    # Tickets and history in index order: an ORDER BY would sort the whole project before the first row
+    yield from _records("ticket", select(*(getattr(Ticket, c) for c in TICKET_COLUMNS)).where(Ticket.project_id == project_id))
+    for model in (TicketHistoryArchive, TicketHistory):  # oldest tier first
+        yield from _records(
+            "history",
+            select(*(getattr(model, c) for c in HISTORY_COLUMNS))
+            .join(Ticket, Ticket.id == model.ticket_id)
+            .where(Ticket.project_id == project_id),
+        )
+
+
+# --------------------------------------------------------------
+# Import
+# --------------------------------------------------------------
+
+def archive_format(requested, mimetype, filename=None):
+    """ "zip" or "ndjson" from ?format=, the upload's Content-Type or its file extension """
+    if requested == "zip" or (not requested and (mimetype in ZIP_MIMETYPES or (filename or "").lower().endswith(".zip"))):
+        return "zip"
+    if requested and requested != "ndjson":
+        raise RecordError("format must be one of: ndjson, zip")
+    if record_format(requested, mimetype, filename) != "ndjson":
+        raise RecordError("Send a project archive as NDJSON (application/x-ndjson) or zip (application/zip)")
+    return "ndjson"
+
+
+def archive_records(stream, fmt):
+    """ (row_number, record, error) for each record of an uploaded archive (see streaming.read_records) """
+    if fmt != "zip":
+        yield from read_records(stream, "ndjson")
+        return
+
+    spool = None
+    if not stream.seekable():
+        # Zip readers need the central directory at the end: spool the body to disk first
+        spool = tempfile.TemporaryFile()
+        shutil.copyfileobj(stream, spool, UPLOAD_BUFFER_SIZE)
+        spool.seek(0)
+        stream = spool
+    try:
+        with zipfile.ZipFile(stream) as archive:
+            if ARCHIVE_MEMBER not in archive.namelist():
+                raise RecordError(f"The zip archive has no {ARCHIVE_MEMBER}")
+            with archive.open(ARCHIVE_MEMBER) as member:
+                yield from read_records(member, "ndjson")
+    except zipfile.BadZipFile as e:
+        raise RecordError(f"Invalid zip archive: {e}")
+    finally:
+        if spool is not None:
+            spool.close()
+
+
+def _datetime(value):
+    return datetime.fromisoformat(value) if value is not None else None
+
+
+def _too_long(model, row):
+    """ The first column of `row` holding a string longer than the model allows, or None """
+    columns = model.__table__.c
+    for column, value in row.items():
+        length = getattr(columns[column].type, "length", None)
+        if length and isinstance(value, str) and len(value) > length:
+            return column
+    return None
+
+
+def _fields(record, required, optional=(), ids=()):
+    """ Type-check a record's fields: (values, error) """
+    values = {}
+    for field in required + optional:
+        value = record.get(field)
+        if value is None and field in required:
+            return None, f"{field} is required"
+        if value is not None and not isinstance(value, int if field in ids else str):
+            return None, f"{field} must be {'an integer' if field in ids else 'a string'}"
+        values[field] = value
+    return values, None
+
+
+# Inserts go through the tables, not the ORM: ORM bulk inserts split a batch
+# wherever the NULL columns of consecutive rows differ (e.g. unassigned tickets)
+
+def _insert_tickets(rows):
+    """ Insert ticket rows (all of one new project) with one executemany; returns their ids in order """
+    table = Ticket.__table__
+    if db.session.get_bind().dialect.name != "sqlite":
+        return db.session.scalars(insert(table).returning(table.c.id, sort_by_parameter_order=True), rows).all()
+
+    # SQLite cannot batch an ordered RETURNING (SQLAlchemy falls back to a
+    # statement per row), but it hands out rowids in insertion order and this
+    # transaction is the only writer: read the new ids back by range
+    after = db.session.scalar(select(func.max(Ticket.id))) or 0
+    db.session.execute(insert(table), rows)
+    return db.session.scalars(
+        select(Ticket.id).where(Ticket.id > after, Ticket.project_id == rows[0]["project_id"]).order_by(Ticket.id)
+    ).all()
+
+
+class _ProjectImport:
+    """ One archive being imported: the archive → local id maps and the rows awaiting insert """
+
+    def __init__(self):
+        self.section = -1
+        self.project = None  # validated project row, inserted once the users are known
+        self.project_id = None
+        self.user_records = []  # (row number, archive id, email)
+        self.users = {}  # archive user id → local id (None when missing)
+        self.assigned = set()
+        self.tickets = {}  # archive ticket id → local id (None until its chunk is inserted)
+        self.pending = []
+        self.counts = Counter()
+        self.errors = []
+        self.error_count = 0
+
+    @property
+    def failing(self):
+        return self.error_count > 0
+
+    def reject(self, number, error):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": number, "error": error})
+
+    def add(self, number, record, error):
+        if error is not None:
+            return self.reject(number, error)
+
+        kind = record.get("type")
+        if kind not in SECTIONS:
+            return self.reject(number, f"type must be one of: {', '.join(SECTIONS)}")
+        section = SECTIONS.index(kind)
+        if section < self.section or (kind in ("archive", "project") and section == self.section):
+            return self.reject(number, f"Unexpected {kind} record (records must keep the export's order)")
+        if section > SECTIONS.index("project") > self.section:
+            return self.reject(number, "The project record must come before the rest of the archive")
+
+        if section != self.section:
+            self.flush()
+            if self.section <= SECTIONS.index("user") < section:
+                self.resolve_users()
+            self.section = section
+
+        getattr(self, f"add_{kind}")(number, record)
+        if len(self.pending) >= IMPORT_CHUNK_SIZE:
+            self.flush()
+
+    def add_archive(self, number, record):
+        if record.get("format") != ARCHIVE_FORMAT or record.get("version") != ARCHIVE_VERSION:
+            self.reject(number, f"Not a {ARCHIVE_FORMAT} version {ARCHIVE_VERSION} file")
+
+    def add_project(self, number, record):
+        values, error = _fields(record, ("title", "start_date", "end_date", "owner_id"),
+                                ("description", "status", "created_at"), ids=("owner_id",))
+        if error:
+            return self.reject(number, error)
+        try:
+            row = {
+                "title": values["title"],
+                "description": values["description"],
+                "status": values["status"] or "active",
+                "start_date": date.fromisoformat(values["start_date"]),
+                "end_date": date.fromisoformat(values["end_date"]),
+                "created_at": _datetime(values["created_at"]) or datetime.utcnow(),
+            }
+        except ValueError:
+            return self.reject(number, "start_date/end_date must be YYYY-MM-DD and created_at ISO 8601")
+        column = _too_long(Project, row)
+        if column:
+            return self.reject(number, f"{column} is too long")
+        self.project = (number, row, values["owner_id"])
+
+    def add_user(self, number, record):
+        values, error = _fields(record, ("id", "email"), ids=("id",))
+        if error:
+            return self.reject(number, error)
+        if values["id"] in self.users:
+            return self.reject(number, f"Duplicate user {values['id']}")
+        self.users[values["id"]] = None
+        self.user_records.append((number, values["id"], values["email"]))
+
+    def resolve_users(self):
+        """ Map the archive's users to local ones by email, then insert the project """
+        emails = sorted({email for _, _, email in self.user_records})
+        local = {}
+        for batch in in_batches(emails):
+            for email, user_id in db.session.execute(select(User.email, User.id).where(User.email.in_(batch))):
+                local[email] = user_id
+        for number, archive_id, email in self.user_records:
+            self.users[archive_id] = local.get(email)
+            if email not in local:
+                self.reject(number, f"No user with email {email} (import the users first)")
+
+        if self.project is None:
+            return
+        number, row, owner_id = self.project
+        owner, error = self.user(owner_id, "owner_id")
+        if error:
+            return self.reject(number, error)
+        if self.failing:
+            return
+        project = Project(**row, owner_id=owner)
+        db.session.add(project)
+        db.session.flush()
+        self.project_id = project.id
+
+    def user(self, archive_id, field):
+        """ (local user id, error); (None, None) for a listed user that is missing here (already reported) """
+        if archive_id not in self.users:
+            return None, f"{field} {archive_id} is not one of the archive's users"
+        return self.users[archive_id], None
+
+    def add_assignment(self, number, record):
+        values, error = _fields(record, ("user_id",), ids=("user_id",))
+        user_id, error = (None, error) if error else self.user(values["user_id"], "user_id")
+        if error:
+            return self.reject(number, error)
+        if user_id is not None and user_id not in self.assigned:
+            self.assigned.add(user_id)
+            self.pending.append({"user_id": user_id})
+
+    def add_ticket(self, number, record):
+        values, error = _fields(record, ("id", "title", "created_by_id"),
+                                ("description", "status", "priority", "created_at", "updated_at", "assigned_user_id"),
+                                ids=("id", "created_by_id", "assigned_user_id"))
+        if error:
+            return self.reject(number, error)
+        if values["id"] in self.tickets:
+            return self.reject(number, f"Duplicate ticket {values['id']}")
+        self.tickets[values["id"]] = None
+
+        created_by, error = self.user(values["created_by_id"], "created_by_id")
+        assigned_to = None
+        if not error and values["assigned_user_id"] is not None:
+            assigned_to, error = self.user(values["assigned_user_id"], "assigned_user_id")
+        if error:
+            return self.reject(number, error)
+        try:
+            created_at = _datetime(values["created_at"]) or datetime.utcnow()
+            updated_at = _datetime(values["updated_at"]) or created_at
+        except ValueError:
+            return self.reject(number, "created_at/updated_at must be ISO 8601")
+
+        row = {
+            "title": values["title"],
+            "description": values["description"],
+            "status": values["status"] or "To Do",
+            "priority": values["priority"] or "Medium",
+            "created_at": created_at,
+            "updated_at": updated_at,
+            "assigned_user_id": assigned_to,
+            "created_by_id": created_by,
+        }
+        column = _too_long(Ticket, row)
+        if column:
+            return self.reject(number, f"{column} is too long")
+        self.pending.append((values["id"], row))
+
+    def add_history(self, number, record):
+        values, error = _fields(record, ("ticket_id", "changed_by_id", "change_type"),
+                                ("old_value", "new_value", "changed_at"), ids=("ticket_id", "changed_by_id"))
+        if error:
+            return self.reject(number, error)
+        if values["ticket_id"] not in self.tickets:
+            return self.reject(number, f"ticket_id {values['ticket_id']} is not one of the archive's tickets")
+        changed_by, error = self.user(values["changed_by_id"], "changed_by_id")
+        if error:
+            return self.reject(number, error)
+        try:
+            changed_at = _datetime(values["changed_at"])
+        except ValueError:
+            return self.reject(number, "changed_at must be ISO 8601")
+
+        row = {
+            "ticket_id": values["ticket_id"],  # remapped on insert: its ticket may still be pending
+            "changed_by_id": changed_by,
+            "change_type": values["change_type"],
+            "old_value": values["old_value"],
+            "new_value": values["new_value"],
+            "changed_at": changed_at,
+        }
+        column = _too_long(TicketHistory, row)
+        if column:
+            return self.reject(number, f"{column} is too long")
+        self.pending.append(row)
+
+    def flush(self):
+        """ Insert the pending rows of the current section (one executemany) """
+        pending, self.pending = self.pending, []
+        if not pending or self.failing:
+            return
+        kind = SECTIONS[self.section]
+
+        if kind == "assignment":
+            db.session.execute(project_assignments.insert(), [{**row, "project_id": self.project_id} for row in pending])
+        elif kind == "ticket":
+            ids = _insert_tickets([{**row, "project_id": self.project_id} for _, row in pending])
+            self.tickets.update(zip((archive_id for archive_id, _ in pending), ids))
+        elif kind == "history":
+            for row in pending:
+                row["ticket_id"] = self.tickets[row["ticket_id"]]
+            db.session.execute(insert(TicketHistory.__table__), pending)
+        self.counts[kind] += len(pending)
+
+    def finish(self):
+        self.flush()
+        if self.section <= SECTIONS.index("user"):
+            self.resolve_users()
+        if self.section < SECTIONS.index("project"):
+            self.reject(None, "The archive has no project record")
+
+
+def import_project(records):
+    """ Create a project from archive records ((row_number, record, error) tuples) in one transaction
+
+    Returns a summary including the assigned users. Raises ProjectImportError
+    (rolled back) if any record is invalid.
+    """
+    state = _ProjectImport()
+    for number, record, error in records:
+        state.add(number, record, error)
+    state.finish()
+
+    if state.failing:
+        db.session.rollback()
+        raise ProjectImportError(state.errors, state.error_count)
+
+    assigned = sorted(state.assigned)
+    rebuild_project_stats(state.project_id)
+    db.session.commit()
+    return {
+        "project_id": state.project_id,
+        "tickets": state.counts["ticket"],
+        "history": state.counts["history"],
+        "assigned_user_ids": assigned,
+    }
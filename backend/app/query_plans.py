@@ -0,0 +1,142 @@
+import re
+from datetime import date
+import click
+from flask import current_app
+from sqlalchemy import event
+from werkzeug.test import Client
+from .models import db, User, Project, Ticket, TicketHistory, project_assignments
+from .authz import access_token
+
+# ==============================================================
+# ✅ Query-plan regression check for hot read paths
+# ==============================================================
+#
+# Drives each read route through a test client, records every SQL statement
+# it issues, and runs EXPLAIN on them. A plan that scans a whole table is a
+# failure unless the route is a deliberate "list everything" endpoint.
+#
+# Runs against the configured database (SQLite or PostgreSQL). Fixture rows
+# are flushed inside a transaction that is rolled back afterwards.
+
+# (label, method, path, caller, json body)
+ROUTES = [
+    ("projects (admin)", "GET", "/api/projects", "admin", None),
+    ("projects (member)", "GET", "/api/projects", "member", None),
+    ("projects assigned", "GET", "/api/projects/assigned", "member", None),
+    ("project details", "GET", "/api/projects/{project_id}", "member", None),
+    ("project tickets", "GET", "/api/projects/{project_id}/tickets", "member", None),
+    ("project tickets page", "GET", "/api/projects/{project_id}/tickets?limit=50&status=To Do", "member", None),
+    ("project tickets delta", "GET", "/api/projects/{project_id}/tickets?since=0", "member", None),
+    ("project users", "GET", "/api/projects/{project_id}/users", "member", None),
+    ("user tickets", "GET", "/api/tickets/user?limit=50", "member", None),
+    ("ticket history", "GET", "/api/tickets/{ticket_id}/history", "member", None),
+    ("ticket history page", "GET", "/api/tickets/{ticket_id}/history?limit=20", "member", None),
+    ("search", "GET", "/api/search?q=plan", "member", None),
+    ("users (admin)", "GET", "/api/users", "admin", None),
+    ("project export", "GET", "/api/projects/{project_id}/export", "admin", None),
+    ("my profile", "GET", "/api/users/me", "member", None),
+    ("login", "POST", "/api/auth/login", None, {"email": "plan-member@example.invalid", "password": "x"}),
+]
+
+# Routes whose purpose is to return every row of a table
+FULL_SCANS_ALLOWED = {
+    "projects (admin)": {"project"},
+    "users (admin)": {"user"},
+}
+
+SQLITE_SCAN = re.compile(r"\bSCAN (\w+)")
+POSTGRES_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+
+def _fixtures():
+    admin = User(username="plan-admin", email="plan-admin@example.invalid", password="x", role="admin")
+    member = User(username="plan-member", email="plan-member@example.invalid", password="x", role="user")
+    db.session.add_all([admin, member])
+    db.session.flush()
+
+    project = Project(title="plan", start_date=date.today(), end_date=date.today(), owner_id=admin.id)
+    db.session.add(project)
+    db.session.flush()
+    db.session.execute(project_assignments.insert().values(user_id=member.id, project_id=project.id))
+
+    ticket = Ticket(title="plan", project_id=project.id, assigned_user_id=member.id, created_by_id=admin.id)
+    db.session.add(ticket)
+    db.session.flush()
+    db.session.add(TicketHistory(ticket_id=ticket.id, changed_by_id=admin.id, change_type="Status Change"))
+    db.session.flush()
+    return {"admin": admin.id, "member": member.id, "project_id": project.id, "ticket_id": ticket.id}
+
+
+def _explain(statement, parameters):
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "sqlite":
+        rows = db.session.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)
+        plan = [row[-1] for row in rows]
+        # "SCAN anon_1" walks a subquery's rows (e.g. a UNION ALL branch), not a table
+        return plan, {table for line in plan for table in SQLITE_SCAN.findall(line) if table in db.metadata.tables}
+
+    # Small tables make PostgreSQL prefer sequential scans; disable them so the
+    # plan shows whether a usable index exists at all
+    connection = db.session.connection()
+    connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    plan = [row[0] for row in connection.exec_driver_sql("EXPLAIN " + statement, parameters)]
+    return plan, {table for line in plan for table in POSTGRES_SCAN.findall(line)}
+
+
+def check_query_plans(verbose=False):
+    """ Return a list of (route label, statement, scanned tables, plan) failures """
+    app = current_app._get_current_object()
+    client = Client(app)
+    failures = []
+
+    try:
+        ids = _fixtures()
+        for label, method, path, caller, body in ROUTES:
+            headers = {}
+            if caller:
+                headers["Authorization"] = "Bearer " + access_token(db.session.get(User, ids[caller]))
+
+            statements = []
+
+            def record(conn, cursor, statement, parameters, context, executemany):
+                if statement.lstrip().upper().startswith("SELECT"):
+                    statements.append((statement, parameters))
+
+            event.listen(db.engine, "before_cursor_execute", record)
+            try:
+                response = client.open(path.format(**ids), method=method, headers=headers, json=body)
+                response.get_data()  # streamed bodies run their queries while being read
+            finally:
+                event.remove(db.engine, "before_cursor_execute", record)
+
+            if verbose:
+                click.echo(f"{label}: {method} {path} → {response.status_code}, {len(statements)} queries")
+
+            for statement, parameters in statements:
+                plan, scanned = _explain(statement, parameters)
+                scanned -= FULL_SCANS_ALLOWED.get(label, set())
+                if verbose:
+                    for line in plan:
+                        click.echo(f"    {line}")
+                if scanned:
+                    failures.append((label, statement, sorted(scanned), plan))
+    finally:
+        db.session.rollback()
+
+    return failures
+
+
+@click.command("check-query-plans")
+@click.option("--verbose", "-v", is_flag=True, help="Print every route's query plans.")
+def check_query_plans_command(verbose):
+    """ Fail if any hot read route's queries fall back to a full table scan """
+    failures = check_query_plans(verbose=verbose)
+    for label, statement, scanned, plan in failures:
+        click.echo(f"FAIL {label}: full scan of {', '.join(scanned)}", err=True)
+        click.echo(f"  {' '.join(statement.split())}", err=True)
+        for line in plan:
+            click.echo(f"    {line}", err=True)
+
+    if failures:
+        raise SystemExit(1)
+    click.echo(f"OK: no full table scans across {len(ROUTES)} routes")
@@ -1,7 +1,20 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 from flask_cors import cross_origin  
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from .models import db, Project, User, Ticket, TicketHistory, project_assignments
+from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
+from sqlalchemy.orm import load_only
+from .models import db, Project, ProjectStats, User, Ticket, TicketHistory, TicketTombstone, format_timestamp, project_assignments, serialize_projects
+from .pagination import PaginationError, decode_cursor, filter_tickets, paginate_tickets, parse_limit, wants_page
+from .history import delete_history, history_page
+from .search import SEARCH_RESULT_LIMIT, search_response, search_terms
+from .authz import membership_index, can_access_project
+from .etags import project_etag, not_modified, tag_response
+from .cache import response_cache
+from .bulk import EDITABLE_FIELDS, BulkValidationError, bulk_create_tickets, bulk_update_tickets
+from .stats import apply_stats_delta, rebuild_project_stats, ticket_deltas
+from .events import project_events, ticket_change
+from .metrics import request_metrics
+from .streaming import RecordError, chunked, json_array_parts, ndjson_parts, stream_response, zip_parts
+from .project_archive import ARCHIVE_MEMBER, ProjectImportError, archive_chunks, archive_format, archive_records, import_project
 from datetime import datetime
 
 routes_bp = Blueprint("routes", __name__)
@@ -10,6 +23,87 @@ routes_bp = Blueprint("routes", __name__)
 def is_admin(user):
     return hasattr(user, "role") and user.role == "admin"
 
+# ✅ Helper to serve a ticket list, filtered and optionally cursor-paginated
+def ticket_list_response(query):
+    try:
+        query = filter_tickets(query, request.args)
+
+        # No ?limit= / ?cursor= → plain list, as before
+        if not wants_page(request.args):
+            return jsonify([ticket.to_dict() for ticket in query.all()]), 200
+
+        tickets, next_cursor = paginate_tickets(query, request.args)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"tickets": [ticket.to_dict() for ticket in tickets], "next_cursor": next_cursor}), 200
+
+# ✅ Helper to serve ?since=<version>: tickets changed and deleted after that project version
+#
+# Clients apply "deleted" before "tickets" (a deleted id can be reused by a
+# newer ticket) and send back "version" as their next ?since=.
+def ticket_delta_response(project_id, version):
+    if set(request.args) != {"since"}:
+        return jsonify({"error": "since cannot be combined with filters or pagination"}), 400
+    try:
+        since = int(request.args["since"])
+    except ValueError:
+        return jsonify({"error": "Invalid since"}), 400
+    if not 0 <= since <= version:
+        return jsonify({"error": f"since must be between 0 and {version}"}), 400
+
+    tickets = Ticket.with_users().filter(Ticket.project_id == project_id, Ticket.version > since).order_by(Ticket.id)
+    deleted = (
+        TicketTombstone.query
+        .filter(TicketTombstone.project_id == project_id, TicketTombstone.version > since)
+        .order_by(TicketTombstone.version)
+    )
+    return jsonify({
+        "tickets": [ticket.to_dict() for ticket in tickets],
+        "deleted": [tombstone.to_dict() for tombstone in deleted],
+        "version": version,
+    }), 200
+
+# ✅ Helper to parse ?fields= / ?include= on project routes (defaults to the full project)
+def parse_project_view(args):
+    if "fields" not in args and "include" not in args:
+        return None, Project.RELATIONS
+
+    fields = [field for field in args.get("fields", "").split(",") if field] or list(Project.FIELDS)
+    if "id" not in fields:
+        fields.insert(0, "id")
+    include = tuple(relation for relation in args.get("include", "").split(",") if relation)
+
+    unknown = (set(fields) - set(Project.FIELDS)) | (set(include) - set(Project.RELATIONS))
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+    return fields, include
+
+# ✅ Helper to build a project query that only SELECTs the requested columns
+def project_query(fields):
+    if fields is None:
+        return Project.query
+    return Project.query.options(load_only(*[getattr(Project, field) for field in fields]))
+
+# ✅ Helper: serialized projects, a chunk at a time, for streaming the full listing
+#
+# Projects embed all their tickets, so chunks are kept well below IN_BATCH_SIZE.
+PROJECT_STREAM_CHUNK_SIZE = 100
+
+def project_chunks(fields, include):
+    projects = project_query(fields).order_by(Project.id).yield_per(PROJECT_STREAM_CHUNK_SIZE)
+    for chunk in chunked(projects, PROJECT_STREAM_CHUNK_SIZE):
+        yield serialize_projects(chunk, fields=fields, include=include)
+
+# ✅ Helper: cache tags a project listing depends on
+#
+# "projects" covers every project (admin listing), "project:<id>" one project,
+# "user:<id>" a user's set of assignments, and "users" any embedded profile.
+def listing_tags(user, projects, all_projects=True):
+    if all_projects and is_admin(user):
+        return ["projects", "users"]
+    return ["users", f"user:{user.id}"] + [f"project:{project.id}" for project in projects]
+
 # ==============================================================
 # ✅ PROJECT ROUTES
 # ==============================================================
@@ -20,18 +114,35 @@ def is_admin(user):
 @cross_origin()
 def get_projects():
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = membership_index.get(user_id)
 
     if not user:
         return jsonify({"error": "User not found"}), 404
 
-    projects = Project.query.all() if is_admin(user) else (
-        Project.query.join(project_assignments)
+    cache_key = response_cache.key(user_id, "projects")
+    body = response_cache.get(cache_key)
+    if body is not None:
+        return response_cache.respond(body), 200
+
+    try:
+        fields, include = parse_project_view(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if is_admin(user):
+        # ✅ Every project: streamed a chunk at a time, cached only if the body stays small
+        parts = json_array_parts(project_chunks(fields, include))
+        return stream_response(response_cache.collect(cache_key, parts, listing_tags(user, []))), 200
+
+    projects = (
+        project_query(fields).join(project_assignments)
         .filter(project_assignments.c.user_id == user_id)
         .all()
-    )  
+    )
 
-    return jsonify([project.to_dict() for project in projects]), 200
+    response = jsonify(serialize_projects(projects, fields=fields, include=include))
+    response_cache.set(cache_key, response.get_data(as_text=True), listing_tags(user, projects))
+    return response, 200
 
 
 # ✅ GET /projects/<id> - Get project details (Admins & Assigned Users)
@@ -40,20 +151,35 @@ def get_projects():
 @cross_origin()
 def get_project_details(project_id):
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = membership_index.get(user_id)
 
     if not user:
         return jsonify({"error": "User not found"}), 404
 
-    project = Project.query.get(project_id)
+    if not can_access_project(user, project_id):
+        return jsonify({"error": "You are not assigned to this project"}), 403
 
-    if not project:
+    version = Project.current_version(project_id)
+    if version is None:
         return jsonify({"error": "Project not found"}), 404
 
-    if not is_admin(user) and user not in project.assigned_users:
-        return jsonify({"error": "You are not assigned to this project"}), 403
+    # ✅ Unchanged since the client's copy → 304 without loading any rows
+    etag = project_etag(project_id, version)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    try:
+        fields, include = parse_project_view(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    project = project_query(fields).filter_by(id=project_id).first()
 
-    return jsonify(project.to_dict()), 200
+    if not project:
+        return jsonify({"error": "Project not found"}), 404
+
+    return tag_response((jsonify(serialize_projects([project], fields=fields, include=include)[0]), 200), etag)
 
 
 # ✅ GET /projects/<id>/tickets - Get all tickets for a project
@@ -61,24 +187,44 @@ def get_project_details(project_id):
 @jwt_required()
 @cross_origin()
 def get_project_tickets(project_id):
-    project = Project.query.get(project_id)
+    user = membership_index.get(get_jwt_identity())
 
-    if not project:
+    if not user or not can_access_project(user, project_id):
+        return jsonify({"error": "You are not assigned to this project"}), 403
+
+    version = Project.current_version(project_id)
+    if version is None:
         return jsonify({"error": "Project not found"}), 404
 
-    tickets = Ticket.query.filter_by(project_id=project_id).all()
-    return jsonify([ticket.to_dict() for ticket in tickets]), 200
+    etag = project_etag(project_id, version)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    if "since" in request.args:
+        return tag_response(ticket_delta_response(project_id, version), etag)
+
+    return tag_response(ticket_list_response(Ticket.with_users().filter_by(project_id=project_id)), etag)
 
 # ✅ GET /projects/<id>/usres - Get all users for a project
 @routes_bp.route("/projects/<int:project_id>/users", methods=["GET"])
 @cross_origin()  # ✅ Allows this route to be accessed from different origins
 @jwt_required()
 def get_project_users(project_id):
-    project = Project.query.get(project_id)
+    user = membership_index.get(get_jwt_identity())
 
-    if not project:
+    if not user or not can_access_project(user, project_id):
+        return jsonify({"error": "You are not assigned to this project"}), 403
+
+    version = Project.current_version(project_id)
+    if version is None:
         return jsonify({"error": "Project not found"}), 404
 
+    etag = project_etag(project_id, version)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
     users = (
         db.session.query(User)
         .join(project_assignments)
@@ -87,7 +233,79 @@ def get_project_users(project_id):
     )
 
     users_list = [{"id": user.id, "username": user.username, "email": user.email, "role": user.role, "avatar": user.avatar} for user in users]
-    return jsonify(users_list), 200
+    return tag_response((jsonify(users_list), 200), etag)
+
+
+# ✅ GET /projects/<id>/stats - Ticket counts by status/priority (one row read)
+@routes_bp.route("/projects/<int:project_id>/stats", methods=["GET"])
+@jwt_required()
+@cross_origin()
+def get_project_stats(project_id):
+    user = membership_index.get(get_jwt_identity())
+
+    if not user or not can_access_project(user, project_id):
+        return jsonify({"error": "You are not assigned to this project"}), 403
+
+    stats = db.session.get(ProjectStats, project_id)
+
+    if not stats:
+        if Project.current_version(project_id) is None:
+            return jsonify({"error": "Project not found"}), 404
+        # Project predates project_stats and was never rebuilt: build its row once
+        rebuild_project_stats(project_id)
+        db.session.commit()
+        stats = db.session.get(ProjectStats, project_id)
+
+    return jsonify(stats.to_dict()), 200
+
+
+# ✅ GET /projects/<id>/events - Server-Sent Events stream of ticket/assignment changes
+#
+# EventSource cannot send headers, so the token may also come as ?jwt=. Resume
+# with the Last-Event-ID header (sent automatically on reconnect) or ?last_event_id=.
+@routes_bp.route("/projects/<int:project_id>/events", methods=["GET"])
+@jwt_required(locations=["headers", "query_string"])
+@cross_origin()
+def get_project_events(project_id):
+    user = membership_index.get(get_jwt_identity())
+
+    if not user or not can_access_project(user, project_id):
+        return jsonify({"error": "You are not assigned to this project"}), 403
+
+    current = Project.current_version(project_id)
+    if current is None:
+        return jsonify({"error": "Project not found"}), 404
+
+    last_event_id = request.headers.get("Last-Event-ID", request.args.get("last_event_id"))
+    try:
+        after = current if last_event_id is None else int(last_event_id)
+    except ValueError:
+        return jsonify({"error": "Invalid Last-Event-ID"}), 400
+
+    backlog = []
+    if after != current:
+        # Replay what the client missed; if that history is gone, tell it to refetch
+        missed = project_events.broker.wait(project_id, after, 0) if after < current else None
+        if missed is None:
+            backlog, after = None, current
+        else:
+            backlog = missed
+            after = missed[-1]["id"] if missed else after
+
+    # ✅ A stream holds a worker thread until it closes: past the per-worker cap,
+    # send the client back to try again (EventSource reconnects after `retry`)
+    if not project_events.open_stream():
+        response = jsonify({"error": "Too many open event streams, retry shortly"})
+        response.headers["Retry-After"] = str(project_events.heartbeat)
+        return response, 503
+
+    # Not wrapped in stream_with_context: the request's DB session is released
+    # before the body streams, so an idle subscriber holds no connection
+    response = Response(project_events.stream(project_id, after, backlog), mimetype="text/event-stream")
+    response.call_on_close(project_events.close_stream)
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"  # ✅ Keep reverse proxies from buffering the stream
+    return response
 
 
 # ✅ POST /projects - Create a new project (Admin only)
@@ -96,7 +314,7 @@ def get_project_users(project_id):
 @cross_origin()
 def create_project():
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = membership_index.get(user_id)
 
     if not user or not is_admin(user):
         return jsonify({"error": "Admin access required"}), 403
@@ -117,13 +335,77 @@ def create_project():
     db.session.add(new_project)
     db.session.commit()
 
+    # No authz_version bump: gaining a project never revokes tokens (see app/authz.py)
     db.session.execute(
         project_assignments.insert().values(user_id=user_id, project_id=new_project.id)
     )
+    db.session.add(ProjectStats(project_id=new_project.id))
     db.session.commit()
+    membership_index.invalidate(user_id)
+    response_cache.invalidate("projects", f"user:{user_id}")
 
     return jsonify({"message": "Project created and assigned successfully"}), 201
 
+
+# ✅ GET /projects/<id>/export - The project, its assignments, tickets and history as an archive, streamed (Admin only)
+#
+# NDJSON by default, ?format=zip for the same file deflated. The format is
+# described in app/project_archive.py; POST /projects/import loads it.
+@routes_bp.route("/projects/<int:project_id>/export", methods=["GET"])
+@jwt_required()
+@cross_origin()
+def export_project(project_id):
+    user = membership_index.get(get_jwt_identity())
+
+    if not user or not is_admin(user):
+        return jsonify({"error": "Admin access required"}), 403
+
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in ("ndjson", "zip"):
+        return jsonify({"error": "format must be one of: ndjson, zip"}), 400
+
+    if Project.current_version(project_id) is None:
+        return jsonify({"error": "Project not found"}), 404
+
+    parts = ndjson_parts(archive_chunks(project_id))
+    if fmt == "zip":
+        return stream_response(zip_parts(parts, ARCHIVE_MEMBER), mimetype="application/zip",
+                               filename=f"project-{project_id}.zip"), 200
+    return stream_response(parts, mimetype="application/x-ndjson", filename=f"project-{project_id}.ndjson"), 200
+
+
+# ✅ POST /projects/import - Create a project from an export archive (Admin only)
+#
+# The body is the archive itself (application/x-ndjson or application/zip)
+# or a multipart form with a `file` field. Users are matched by email and
+# must already exist; everything else gets new ids. All or nothing.
+@routes_bp.route("/projects/import", methods=["POST"])
+@jwt_required()
+@cross_origin()
+def import_project_archive():
+    user = membership_index.get(get_jwt_identity())
+
+    if not user or not is_admin(user):
+        return jsonify({"error": "Admin access required"}), 403
+
+    upload = request.files.get("file")
+    stream = upload.stream if upload else request.stream
+    try:
+        fmt = archive_format(request.args.get("format"), upload.mimetype if upload else request.mimetype,
+                             upload.filename if upload else None)
+        result = import_project(archive_records(stream, fmt))
+    except RecordError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+    except ProjectImportError as e:
+        return jsonify({"error": str(e), "errors": e.errors}), 400
+
+    for assigned_user_id in result["assigned_user_ids"]:
+        membership_index.invalidate(assigned_user_id)
+    response_cache.invalidate("projects", *(f"user:{user_id}" for user_id in result["assigned_user_ids"]))
+
+    return jsonify(result), 201
+
 from flask_cors import cross_origin  
 
 # ✅ POST /projects/id/assign - Assign user to project (Admin only)
@@ -132,7 +414,7 @@ from flask_cors import cross_origin
 @jwt_required()
 def assign_user_to_project(project_id):
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = membership_index.get(user_id)
 
     if not user or not is_admin(user):
         return jsonify({"error": "Admin access required"}), 403
@@ -159,7 +441,11 @@ def assign_user_to_project(project_id):
     db.session.execute(
         project_assignments.insert().values(user_id=assigned_user_id, project_id=project_id)
     )
+    version = Project.bump_version(project_id)
+    project_events.queue(project_id, version, [{"type": "assignment", "op": "created", "user_id": assigned_user_id}])
     db.session.commit()
+    membership_index.invalidate(assigned_user_id)
+    response_cache.invalidate("projects", f"project:{project_id}", f"user:{assigned_user_id}")
 
     return jsonify({"message": "User assigned to project successfully"}), 200
 
@@ -170,7 +456,7 @@ def assign_user_to_project(project_id):
 @jwt_required()
 def update_project(project_id):
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = membership_index.get(user_id)
 
     # ✅ Ensure only admins can edit projects
     if not user or not is_admin(user):
@@ -199,8 +485,10 @@ def update_project(project_id):
     project.title = data.get("title", project.title)
     project.description = data.get("description", project.description)
     project.status = data.get("status", project.status)
+    Project.bump_version(project_id)
 
     db.session.commit()
+    response_cache.invalidate("projects", f"project:{project_id}")
     return jsonify({"message": "Project updated successfully"}), 200
 
 
@@ -210,18 +498,30 @@ def update_project(project_id):
 @jwt_required()
 def get_admin_assigned_projects():
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = membership_index.get(user_id)
 
     if not user:
         return jsonify({"error": "Admin access required"}), 403
 
+    cache_key = response_cache.key(user_id, "projects/assigned")
+    body = response_cache.get(cache_key)
+    if body is not None:
+        return response_cache.respond(body), 200
+
+    try:
+        fields, include = parse_project_view(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     assigned_projects = (
-        Project.query.join(project_assignments)
+        project_query(fields).join(project_assignments)
         .filter(project_assignments.c.user_id == user_id)
         .all()
     )
 
-    return jsonify([project.to_dict() for project in assigned_projects]), 200
+    response = jsonify(serialize_projects(assigned_projects, fields=fields, include=include))
+    response_cache.set(cache_key, response.get_data(as_text=True), listing_tags(user, assigned_projects, all_projects=False))
+    return response, 200
 
 # ==============================================================
 # ✅ TICKET ROUTES
@@ -233,8 +533,7 @@ def get_admin_assigned_projects():
 @cross_origin()
 def get_user_tickets():
     user_id = get_jwt_identity()
-    tickets = Ticket.query.filter_by(assigned_user_id=user_id).all()
-    return jsonify([ticket.to_dict() for ticket in tickets]), 200
+    return ticket_list_response(Ticket.with_users().filter_by(assigned_user_id=user_id))
 
 
 # ✅ POST /tickets - Create a new ticket
@@ -248,6 +547,15 @@ def create_ticket():
     if not all(field in data for field in required_fields):
         return jsonify({"error": "Missing required fields"}), 400
 
+    user = membership_index.get(user_id)
+    if not user or not can_access_project(user, data["project_id"]):
+        return jsonify({"error": "You are not assigned to this project"}), 403
+
+    version = Project.bump_version(data["project_id"])
+    if version is None:  # ✅ No such project (admins pass the access check for any id)
+        db.session.rollback()
+        return jsonify({"error": "Project not found"}), 404
+
     new_ticket = Ticket(
         title=data["title"],
         description=data["description"],
@@ -256,10 +564,15 @@ def create_ticket():
         created_by_id=user_id,  # ✅ Assign the logged-in user as the creator
         status=data.get("status", "To Do"),
         priority=data.get("priority", "Medium"),
+        version=version,
     )
 
     db.session.add(new_ticket)
+    db.session.flush()
+    apply_stats_delta(new_ticket.project_id, ticket_deltas(new=(new_ticket.status, new_ticket.priority)))
+    project_events.queue(new_ticket.project_id, version, [ticket_change("created", new_ticket.id, new_ticket.to_dict())])
     db.session.commit()
+    response_cache.invalidate("projects", f"project:{new_ticket.project_id}")
 
     return jsonify({"message": "Ticket created successfully", "ticket": new_ticket.to_dict()}), 201
 
@@ -270,22 +583,26 @@ def create_ticket():
 @cross_origin()
 def update_ticket(ticket_id):
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = membership_index.get(user_id)
 
     if not user:
         return jsonify({"error": "Unauthorized"}), 401
 
     if user.role == "guest" and "status" not in request.json:
-        return jsonify({"error": "Guests cannot modify tickets except status updates"}),
+        return jsonify({"error": "Guests cannot modify tickets except status updates"}), 403
 
     ticket = Ticket.query.get(ticket_id)
 
     if not ticket:
         return jsonify({"error": "Ticket not found"}), 404
 
+    if not can_access_project(user, ticket.project_id):
+        return jsonify({"error": "You are not assigned to this project"}), 403
+
     data = request.json
     old_status = ticket.status
     old_priority = ticket.priority
+    before = {field: getattr(ticket, field) for field in EDITABLE_FIELDS}
 
     # ✅ Update Ticket Fields
     if "title" in data:
@@ -299,8 +616,6 @@ def update_ticket(ticket_id):
     if "assigned_user_id" in data:
         ticket.assigned_user_id = data["assigned_user_id"]
 
-    db.session.commit()
-
     if ticket.status != old_status:
         history = TicketHistory(
             ticket_id=ticket.id,
@@ -321,19 +636,61 @@ def update_ticket(ticket_id):
         )
         db.session.add(history)
 
+    with db.session.no_autoflush:
+        version = Project.bump_version(ticket.project_id)
+    ticket.version = version
+    db.session.flush()
+    apply_stats_delta(ticket.project_id, ticket_deltas(old=(old_status, old_priority), new=(ticket.status, ticket.priority)))
+    changed = {field: getattr(ticket, field) for field in EDITABLE_FIELDS if getattr(ticket, field) != before[field]}
+    changed["updated_at"] = format_timestamp(ticket.updated_at)
+    project_events.queue(ticket.project_id, version, [ticket_change("updated", ticket.id, changed)])
     db.session.commit()
+    response_cache.invalidate("projects", f"project:{ticket.project_id}")
 
     return jsonify({"message": "Ticket updated successfully", "ticket": ticket.to_dict()}), 200
 
 
 
+# ✅ POST /tickets/bulk - Create many tickets in one transaction
+# ✅ PATCH /tickets/bulk - Update many tickets (+ history) in one transaction
+@routes_bp.route("/tickets/bulk", methods=["POST", "PATCH"])
+@jwt_required()
+@cross_origin()
+def bulk_tickets():
+    user = membership_index.get(get_jwt_identity())
+
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    data = request.json or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object with a 'tickets' list"}), 400
+
+    try:
+        if request.method == "POST":
+            results, project_ids = bulk_create_tickets(data.get("tickets"), user)
+        else:
+            results, project_ids = bulk_update_tickets(data.get("tickets"), user)
+    except BulkValidationError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e), "results": e.results}), 400
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+
+    db.session.commit()
+    response_cache.invalidate("projects", *[f"project:{project_id}" for project_id in project_ids])
+
+    return jsonify({"results": results}), 201 if request.method == "POST" else 200
+
+
 # ✅ DELETE /tickets/<id> - Delete a ticket
 @routes_bp.route("/tickets/<int:ticket_id>", methods=["DELETE"])
 @jwt_required()
 @cross_origin()
 def delete_ticket(ticket_id):
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = membership_index.get(user_id)
 
     if not user or user.role == "guest":
         return jsonify({"error": "Guests are not allowed to delete tickets"}), 403
@@ -342,11 +699,19 @@ def delete_ticket(ticket_id):
 
     if not ticket:
         return jsonify({"error": "Ticket not found"}), 404
+
+    if not can_access_project(user, ticket.project_id):
+        return jsonify({"error": "You are not assigned to this project"}), 403
     
-    TicketHistory.query.filter_by(ticket_id=ticket_id).delete()
+    delete_history(ticket_id)
 
     db.session.delete(ticket)
+    version = Project.bump_version(ticket.project_id)
+    db.session.add(TicketTombstone(ticket_id=ticket_id, project_id=ticket.project_id, version=version))
+    apply_stats_delta(ticket.project_id, ticket_deltas(old=(ticket.status, ticket.priority)))
+    project_events.queue(ticket.project_id, version, [ticket_change("deleted", ticket_id)])
     db.session.commit()
+    response_cache.invalidate("projects", f"project:{ticket.project_id}")
 
     return jsonify({"message": "Ticket deleted successfully"}), 200
 
@@ -356,11 +721,88 @@ def delete_ticket(ticket_id):
 @jwt_required()
 @cross_origin()
 def get_ticket_history(ticket_id):
+    user = membership_index.get(get_jwt_identity())
+
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+
     ticket = Ticket.query.get(ticket_id)
 
     if not ticket:
         return jsonify({"error": "Ticket not found"}), 404
 
-    history = TicketHistory.query.filter_by(ticket_id=ticket_id).order_by(TicketHistory.changed_at.desc()).all()
-    
-    return jsonify([entry.to_dict() for entry in history]), 200
+    if not can_access_project(user, ticket.project_id):
+        return jsonify({"error": "You are not assigned to this project"}), 403
+
+    # No ?limit= / ?cursor= → every entry as a plain list, as before
+    if not wants_page(request.args):
+        entries, _ = history_page(ticket_id)
+        return jsonify(entries), 200
+
+    try:
+        limit = parse_limit(request.args)
+        before = decode_cursor(request.args["cursor"]) if request.args.get("cursor") else None
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    entries, next_cursor = history_page(ticket_id, limit, before)
+    return jsonify({"history": entries, "next_cursor": next_cursor}), 200
+
+
+# ==============================================================
+# ✅ SEARCH
+# ==============================================================
+
+# ✅ GET /search?q= - Ranked tickets and projects matching every word of q (only what the user can see)
+@routes_bp.route("/search", methods=["GET"])
+@jwt_required()
+@cross_origin()
+def search_tickets_and_projects():
+    user = membership_index.get(get_jwt_identity())
+
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+
+    terms = search_terms(request.args.get("q"))
+    if not terms:
+        return jsonify({"error": "q must contain at least one word"}), 400
+
+    try:
+        limit = parse_limit(request.args) if "limit" in request.args else SEARCH_RESULT_LIMIT
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify(search_response(user, terms, limit)), 200
+
+
+# ==============================================================
+# ✅ CACHE STATS
+# ==============================================================
+
+# ✅ GET /_cache/stats - Response cache hit/miss counters for this worker (Admin only)
+@routes_bp.route("/_cache/stats", methods=["GET"])
+@jwt_required()
+@cross_origin()
+def get_cache_stats():
+    user = membership_index.get(get_jwt_identity())
+
+    if not user or not is_admin(user):
+        return jsonify({"error": "Admin access required"}), 403
+
+    return jsonify(response_cache.stats()), 200
+
+
+# ✅ GET /_metrics - Per-route latency/SQL histograms and DB pool stats for this worker (Prometheus text format)
+#
+# Readable by admins, or by a scraper sending "Authorization: Bearer <METRICS_TOKEN>".
+@routes_bp.route("/_metrics", methods=["GET"])
+def get_metrics():
+    # The scrape token is not a JWT, so check it before asking for one
+    if not request_metrics.token_matches(request.headers.get("Authorization", "")):
+        verify_jwt_in_request()
+        user = membership_index.get(get_jwt_identity())
+
+        if not user or not is_admin(user):
+            return jsonify({"error": "Admin access required"}), 403
+
+    return Response(request_metrics.render(), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,171 @@
+import re
+import click
+from sqlalchemy import Float, Integer, event, text
+from .models import db, Project, Ticket, serialize_projects
+
+# ==============================================================
+# ✅ Full-text search over tickets and projects
+# ==============================================================
+#
+# Both tables are searched on title and description, with title matches
+# ranked higher.
+#
+# SQLite: an external-content FTS5 table per searched table (ticket_fts,
+# project_fts) keyed by the row id. Triggers on the base table keep it in
+# step with every write path (routes, bulk endpoints, seeding, imports), so
+# an insert, a title/description edit or a delete costs one index update in
+# the same transaction.
+#
+# PostgreSQL: a GIN expression index on the weighted tsvector of each table.
+# PostgreSQL maintains it itself; the query repeats the indexed expression so
+# the planner can use it.
+#
+# The DDL lives in the migrations; the listeners at the bottom repeat it for
+# databases built with db.create_all() (seeding with --drop, benchmarks).
+
+SEARCHABLE = {"ticket": Ticket, "project": Project}
+
+# Column weights: a title hit counts for more than a description hit
+SQLITE_WEIGHTS = "10.0, 1.0"
+POSTGRES_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+# Rows of (id, rank) for one table; lower rank is a better match on both dialects
+RANKED_SQL = {
+    "sqlite": "SELECT rowid AS id, bm25({table}_fts, " + SQLITE_WEIGHTS + ") AS rank "
+              "FROM {table}_fts WHERE {table}_fts MATCH :match",
+    "postgresql": "SELECT id, -ts_rank_cd(" + POSTGRES_DOCUMENT + ", to_tsquery('english', :match)) AS rank "
+                  "FROM {table} WHERE (" + POSTGRES_DOCUMENT + ") @@ to_tsquery('english', :match)",
+}
+
+SEARCH_RESULT_LIMIT = 20
+MAX_SEARCH_TERMS = 8
+
+# Letters and digits only: nothing the user types reaches the MATCH / tsquery syntax
+TERM = re.compile(r"[^\W_]+")
+
+
+def search_terms(q):
+    """ The words of a query string, lower-cased (at most MAX_SEARCH_TERMS) """
+    return [term.lower() for term in TERM.findall(q or "")][:MAX_SEARCH_TERMS]
+
+
+def _match(dialect, terms):
+    # Every term must match; each one also matches as a prefix ("deplo" finds "deployment")
+    if dialect == "postgresql":
+        return " & ".join(f"{term}:*" for term in terms)
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _ranked(table, dialect, terms):
+    statement = text(RANKED_SQL[dialect].format(table=table)).bindparams(match=_match(dialect, terms))
+    return statement.columns(id=Integer, rank=Float).subquery(f"{table}_ranked")
+
+
+def search(membership, terms, limit=SEARCH_RESULT_LIMIT):
+    """ Best-matching tickets and projects the user can see, as (tickets, projects)
+
+    Visibility follows get_projects: admins see everything, everyone else only
+    their assigned projects and those projects' tickets.
+    """
+    dialect = db.session.get_bind().dialect.name
+    visible = None if membership.role == "admin" else membership.project_ids
+    if visible is not None and not visible:
+        return [], []
+
+    ranked = _ranked("ticket", dialect, terms)
+    tickets = Ticket.with_users().join(ranked, ranked.c.id == Ticket.id)
+    if visible is not None:
+        tickets = tickets.filter(Ticket.project_id.in_(visible))
+    tickets = tickets.order_by(ranked.c.rank, Ticket.id.desc()).limit(limit).all()
+
+    ranked = _ranked("project", dialect, terms)
+    projects = Project.query.join(ranked, ranked.c.id == Project.id)
+    if visible is not None:
+        projects = projects.filter(Project.id.in_(visible))
+    projects = projects.order_by(ranked.c.rank, Project.id.desc()).limit(limit).all()
+
+    return tickets, projects
+
+
+def search_response(membership, terms, limit=SEARCH_RESULT_LIMIT):
+    """ JSON-able search results: ranked tickets and projects (without their relations) """
+    tickets, projects = search(membership, terms, limit)
+    return {
+        "tickets": [ticket.to_dict() for ticket in tickets],
+        "projects": serialize_projects(projects, include=()),
+    }
+
+
+# --------------------------------------------------------------
+# Index DDL (mirrors migration 9c5e1d7a3f20)
+# --------------------------------------------------------------
+
+def _sqlite_ddl(table):
+    fts = f"{table}_fts"
+    delete_old = f"INSERT INTO {fts}({fts}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);"
+    insert_new = f"INSERT INTO {fts}(rowid, title, description) VALUES (new.id, new.title, new.description);"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(title, description, content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF title, description ON {table} BEGIN {delete_old} {insert_new} END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def _postgres_ddl(table):
+    return [f"CREATE INDEX IF NOT EXISTS ix_{table}_search ON {table} USING gin (({POSTGRES_DOCUMENT}))"]
+
+
+def create_search_index(connection):
+    """ Create (and fill) the search index for the tables that exist on `connection` """
+    dialect = connection.dialect.name
+    for table in SEARCHABLE:
+        if dialect == "sqlite":
+            statements = _sqlite_ddl(table)
+        elif dialect == "postgresql":
+            statements = _postgres_ddl(table)
+        else:
+            continue
+        for statement in statements:
+            connection.exec_driver_sql(statement)
+
+
+def drop_search_index(connection):
+    dialect = connection.dialect.name
+    for table in SEARCHABLE:
+        if dialect == "sqlite":
+            connection.exec_driver_sql(f"DROP TABLE IF EXISTS {table}_fts")  # its triggers go with the base table
+        elif dialect == "postgresql":
+            connection.exec_driver_sql(f"DROP INDEX IF EXISTS ix_{table}_search")
+
+
+def rebuild_search_index():
+    """ Re-derive the search index from the base tables (repairs drift) """
+    connection = db.session.connection()
+    for table in SEARCHABLE:
+        if connection.dialect.name == "sqlite":
+            connection.exec_driver_sql(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')")
+        elif connection.dialect.name == "postgresql":
+            connection.exec_driver_sql(f"REINDEX INDEX ix_{table}_search")
+
+
+def include_name(name, type_, parent_names):
+    """ Autogenerate filter: the FTS5 tables and their shadow tables are not models """
+    return not (type_ == "table" and any(name.startswith(f"{table}_fts") for table in SEARCHABLE))
+
+
+event.listen(db.metadata, "after_create", lambda target, connection, **kw: create_search_index(connection))
+event.listen(db.metadata, "before_drop", lambda target, connection, **kw: drop_search_index(connection))
+
+
+@click.command("rebuild-search-index")
+def rebuild_search_index_command():
+    """ Rebuild the ticket/project full-text search index """
+    rebuild_search_index()
+    db.session.commit()
+    click.echo(f"Rebuilt the search index for {', '.join(SEARCHABLE)}")
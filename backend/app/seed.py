@@ -0,0 +1,153 @@
+import random
+import time
+from datetime import date, datetime, timedelta
+import click
+from sqlalchemy import insert
+from .models import db, User, Project, Ticket, TicketHistory, project_assignments
+from .passwords import password_hasher
+from .stats import rebuild_project_stats
+
+# ==============================================================
+# ✅ Synthetic data for local development and benchmarks
+# ==============================================================
+#
+# Rows are written with executemany INSERTs in chunks, so seeding tens of
+# thousands of tickets takes seconds. Every seeded user's password is
+# SEED_PASSWORD (hashed once and shared).
+
+SEED_PASSWORD = "password"
+CHUNK_SIZE = 5000
+# INSERT ... RETURNING results are stitched together per statement batch, which
+# grows quadratically with the rows per call; keep those calls small
+RETURNING_CHUNK_SIZE = 500
+
+FIRST_NAMES = ["ada", "alan", "grace", "linus", "margaret", "ken", "barbara", "dennis", "frances", "edsger",
+               "radia", "guido", "anita", "niklaus", "karen", "john", "hedy", "tim", "sophie", "donald"]
+LAST_NAMES = ["lovelace", "turing", "hopper", "torvalds", "hamilton", "thompson", "liskov", "ritchie", "allen",
+              "dijkstra", "perlman", "rossum", "borg", "wirth", "jones", "backus", "lamarr", "lee", "wilson", "knuth"]
+VERBS = ["Fix", "Add", "Refactor", "Document", "Remove", "Migrate", "Speed up", "Review", "Test", "Design"]
+NOUNS = ["login flow", "billing page", "search index", "export job", "dashboard", "API client", "settings form",
+         "notification email", "audit log", "onboarding wizard", "report builder", "file upload"]
+STATUSES = [("To Do", 0.4), ("In Progress", 0.3), ("Done", 0.3)]
+PRIORITIES = [("Low", 0.3), ("Medium", 0.5), ("High", 0.2)]
+PROJECT_STATUSES = ["Pending", "Active", "Completed"]
+
+
+def _pick(rng, weighted):
+    values, weights = zip(*weighted)
+    return rng.choices(values, weights)[0]
+
+
+def _insert_returning_ids(model, rows):
+    # Same approach as bulk ticket creation: batched INSERT ... RETURNING
+    ordered = db.session.get_bind().dialect.name != "sqlite"
+    ids = []
+    for start in range(0, len(rows), RETURNING_CHUNK_SIZE):
+        chunk = rows[start:start + RETURNING_CHUNK_SIZE]
+        ids.extend(db.session.scalars(insert(model).returning(model.id, sort_by_parameter_order=ordered), chunk).all())
+    return ids
+
+
+def _insert(table, rows):
+    for start in range(0, len(rows), CHUNK_SIZE):
+        db.session.execute(insert(table), rows[start:start + CHUNK_SIZE])
+
+
+def seed_database(users, projects, tickets, history, seed=None, drop=False):
+    """ Insert synthetic users/projects/tickets/history; returns the counts written """
+    rng = random.Random(seed)
+    if drop:
+        db.drop_all()
+        db.create_all()
+
+    # Unique suffix so repeated runs can append to the same database
+    tag = f"{int(time.time() * 1000) % 10**8:08d}"
+    now = datetime.utcnow().replace(microsecond=0)
+    password = password_hasher.hash(SEED_PASSWORD)
+
+    user_ids = _insert_returning_ids(User, [
+        {
+            "username": f"{rng.choice(FIRST_NAMES)}.{rng.choice(LAST_NAMES)}.{i}.{tag}",
+            "email": f"user{i}.{tag}@example.com",
+            "password": password,
+            "role": "admin" if i == 0 else rng.choices(["user", "guest"], [0.9, 0.1])[0],
+            "avatar": None,
+        }
+        for i in range(users)
+    ])
+    if not user_ids:
+        raise ValueError("At least one user is required")
+
+    project_rows = []
+    for i in range(projects):
+        start = date.today() - timedelta(days=rng.randint(0, 365))
+        project_rows.append({
+            "title": f"{rng.choice(NOUNS).title()} {i}",
+            "description": f"Seeded project {i}",
+            "start_date": start,
+            "end_date": start + timedelta(days=rng.randint(14, 180)),
+            "status": rng.choice(PROJECT_STATUSES),
+            "owner_id": user_ids[0],
+            "created_at": now - timedelta(days=rng.randint(0, 365)),
+        })
+    project_ids = _insert_returning_ids(Project, project_rows)
+
+    # Each project gets a team of up to 8 members; the admin owns every project
+    members = {}
+    assignments = []
+    for project_id in project_ids:
+        team = {user_ids[0]} | set(rng.sample(user_ids, min(len(user_ids), rng.randint(2, 8))))
+        members[project_id] = sorted(team)
+        assignments.extend({"user_id": user_id, "project_id": project_id} for user_id in team)
+    _insert(project_assignments, assignments)
+
+    ticket_rows = []
+    for i in range(tickets if project_ids else 0):
+        project_id = rng.choice(project_ids)
+        created_at = now - timedelta(minutes=rng.randint(60, 60 * 24 * 365))
+        ticket_rows.append({
+            "title": f"{rng.choice(VERBS)} {rng.choice(NOUNS)}",
+            "description": f"Seeded ticket {i}",
+            "status": _pick(rng, STATUSES),
+            "priority": _pick(rng, PRIORITIES),
+            "created_at": created_at,
+            "updated_at": min(now, created_at + timedelta(minutes=rng.randint(0, 60 * 24 * 30))),
+            "project_id": project_id,
+            "assigned_user_id": rng.choice(members[project_id]) if rng.random() < 0.8 else None,
+            "created_by_id": rng.choice(members[project_id]),
+        })
+    ticket_ids = _insert_returning_ids(Ticket, ticket_rows)
+
+    history_rows = []
+    for _ in range(history if ticket_ids else 0):
+        index = rng.randrange(len(ticket_ids))
+        ticket = ticket_rows[index]
+        change_type, values = rng.choice([("Status Change", STATUSES), ("Priority Change", PRIORITIES)])
+        history_rows.append({
+            "ticket_id": ticket_ids[index],
+            "changed_by_id": rng.choice(members[ticket["project_id"]]),
+            "change_type": change_type,
+            "old_value": _pick(rng, values),
+            "new_value": _pick(rng, values),
+            "changed_at": min(now, ticket["created_at"] + timedelta(minutes=rng.randint(1, 60 * 24 * 30))),
+        })
+    _insert(TicketHistory, history_rows)
+
+    rebuild_project_stats()
+    db.session.commit()
+    return {"users": len(user_ids), "projects": len(project_ids), "tickets": len(ticket_ids), "history": len(history_rows)}
+
+
+@click.command("seed")
+@click.option("--users", default=50, show_default=True)
+@click.option("--projects", default=20, show_default=True)
+@click.option("--tickets", default=1000, show_default=True)
+@click.option("--history", default=2000, show_default=True)
+@click.option("--seed", "random_seed", type=int, default=None, help="Random seed for reproducible data.")
+@click.option("--drop", is_flag=True, help="Drop and recreate all tables first.")
+def seed_command(users, projects, tickets, history, random_seed, drop):
+    """ Bulk-insert synthetic users, projects, tickets and ticket history """
+    started = time.perf_counter()
+    counts = seed_database(users, projects, tickets, history, seed=random_seed, drop=drop)
+    summary = ", ".join(f"{count} {name}" for name, count in counts.items())
+    click.echo(f"Seeded {summary} in {time.perf_counter() - started:.1f}s (password: {SEED_PASSWORD})")
@@ -0,0 +1,84 @@
+from collections import Counter
+from datetime import datetime
+import click
+from sqlalchemy import func, update
+from .models import db, Project, ProjectStats, Ticket
+
+# ==============================================================
+# ✅ Incremental maintenance of project_stats
+# ==============================================================
+#
+# Ticket routes describe each change as (old, new) pairs of (status, priority)
+# — old is None for a create, new is None for a delete — and apply the
+# resulting counter deltas in the same transaction as the ticket write.
+
+
+COUNT_COLUMNS = ("total_count", *ProjectStats.STATUS_COLUMNS.values(), *ProjectStats.PRIORITY_COLUMNS.values())
+
+
+def ticket_deltas(old=None, new=None):
+    """ Column → delta for one ticket going from `old` to `new` (status, priority) """
+    deltas = Counter()
+    for state, sign in ((old, -1), (new, 1)):
+        if state is None:
+            continue
+        status, priority = state
+        deltas["total_count"] += sign
+        if status in ProjectStats.STATUS_COLUMNS:
+            deltas[ProjectStats.STATUS_COLUMNS[status]] += sign
+        if priority in ProjectStats.PRIORITY_COLUMNS:
+            deltas[ProjectStats.PRIORITY_COLUMNS[priority]] += sign
+    return deltas
+
+
+def apply_stats_delta(project_id, deltas, at=None):
+    """ Add `deltas` to a project's stats row inside the caller's transaction """
+    values = {column: getattr(ProjectStats, column) + delta for column, delta in deltas.items() if delta}
+    values["last_activity_at"] = at or datetime.utcnow()
+
+    result = db.session.execute(
+        update(ProjectStats).where(ProjectStats.project_id == project_id).values(**values)
+    )
+    if result.rowcount == 0:
+        # No row yet (e.g. project predates the table): derive it from the tickets,
+        # which already include this transaction's flushed changes
+        rebuild_project_stats(project_id)
+
+
+def rebuild_project_stats(project_id=None):
+    """ Recompute stats rows from the ticket table for one project, or all of them """
+    db.session.flush()
+    project_ids = [project_id] if project_id is not None else [pid for (pid,) in db.session.query(Project.id)]
+
+    counts = db.session.query(
+        Ticket.project_id, Ticket.status, Ticket.priority, func.count(Ticket.id), func.max(Ticket.updated_at)
+    ).group_by(Ticket.project_id, Ticket.status, Ticket.priority)
+    if project_id is not None:
+        counts = counts.filter(Ticket.project_id == project_id)
+
+    rows = {pid: {**dict.fromkeys(COUNT_COLUMNS, 0), "last_activity_at": None} for pid in project_ids}
+    for pid, status, priority, count, last_updated in counts:
+        row = rows.get(pid)
+        if row is None:
+            continue
+        for column, delta in ticket_deltas(new=(status, priority)).items():
+            row[column] += delta * count
+        if last_updated and (row["last_activity_at"] is None or last_updated > row["last_activity_at"]):
+            row["last_activity_at"] = last_updated
+
+    for pid, row in rows.items():
+        stats = db.session.get(ProjectStats, pid) or ProjectStats(project_id=pid)
+        for column, value in row.items():
+            setattr(stats, column, value)
+        db.session.add(stats)
+    db.session.flush()
+    return len(rows)
+
+
+@click.command("rebuild-stats")
+@click.option("--project-id", type=int, default=None, help="Only rebuild this project.")
+def rebuild_stats_command(project_id):
+    """ Recompute project_stats from tickets (repairs drift) """
+    rebuilt = rebuild_project_stats(project_id)
+    db.session.commit()
+    click.echo(f"Rebuilt stats for {rebuilt} project(s)")
@@ -0,0 +1,184 @@
+import codecs
+import csv
+import io
+import zipfile
+from flask import current_app, stream_with_context
+
+# ==============================================================
+# ✅ Streaming JSON arrays (and NDJSON/CSV/zip exports) for unbounded listings
+# ==============================================================
+#
+# Admin listings grow with the whole table. Instead of building every row's
+# dict and then one large string, rows are read in chunks (yield_per) and
+# each chunk is encoded and sent before the next is loaded, so a worker holds
+# one chunk at a time and the first byte leaves before the query has
+# finished. The body is the same JSON array jsonify() would send.
+#
+# The request context (and its DB session) stays open until the stream ends.
+# Server-Timing/metrics only cover the time until the response starts.
+
+# Rows per chunk for flat listings (project listings, which embed tickets, use smaller chunks)
+STREAM_CHUNK_SIZE = 1000
+
+
+def chunked(rows, size):
+    """ Group an iterable into lists of up to `size` items """
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def json_array_parts(chunks):
+    """ Encode an iterable of lists of JSON-able items as the parts of one JSON array """
+    yield "["
+    separator = ""
+    for chunk in chunks:
+        if chunk:
+            # Encode the chunk as a list and drop its brackets: one encoder call per chunk
+            yield separator + current_app.json.dumps(chunk, separators=(",", ":"))[1:-1]
+            separator = ","
+    yield "]\n"
+
+
+def ndjson_parts(chunks):
+    """ Encode an iterable of lists of JSON-able items as newline-delimited JSON, a chunk per part """
+    dumps = current_app.json.dumps
+    for chunk in chunks:
+        if chunk:
+            yield "".join(dumps(item, separators=(",", ":")) + "\n" for item in chunk)
+
+
+def csv_parts(chunks, columns):
+    """ Encode an iterable of lists of dicts as CSV (header row first), a chunk per part """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore", lineterminator="\n")
+    writer.writeheader()
+    for chunk in chunks:
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_response(parts, mimetype="application/json", filename=None):
+    """ A chunked response over `parts`, keeping the request context alive
+
+    With a filename the body is offered as a download (Content-Disposition).
+    """
+    response = current_app.response_class(stream_with_context(parts), mimetype=mimetype)
+    if filename:
+        response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+class _ZipSink:
+    """ Write-only target for a streamed ZipFile: collects bytes until drained """
+
+    def __init__(self):
+        self.buffer = io.BytesIO()
+
+    def write(self, data):
+        return self.buffer.write(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+
+def zip_parts(parts, member):
+    """ Wrap str/bytes `parts` into a zip archive holding one deflated file, streamed as it compresses
+
+    The output is not seekable, so sizes go into data descriptors after the
+    data (zip64, the size is not known up front); any unzip tool reads them.
+    """
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as archive:
+        with archive.open(member, "w", force_zip64=True) as entry:
+            for part in parts:
+                entry.write(part.encode() if isinstance(part, str) else part)
+                data = sink.drain()
+                if data:
+                    yield data
+    yield sink.drain()
+
+
+# ==============================================================
+# ✅ Streaming record uploads (NDJSON / CSV)
+# ==============================================================
+#
+# Uploads are read a line at a time from the request (or the spooled
+# multipart file), so the size of an import is bounded by the caller's
+# chunking, not by the body.
+
+RECORD_FORMATS = {
+    "ndjson": ("application/x-ndjson", "application/jsonl", "application/json"),
+    "csv": ("text/csv", "application/csv"),
+}
+
+UPLOAD_BUFFER_SIZE = 64 * 1024
+
+
+class RecordError(ValueError):
+    """ Raised for an unreadable upload (unknown format, bad encoding); reported as HTTP 400 """
+
+
+def record_format(requested, mimetype, filename=None):
+    """ "ndjson" or "csv" from ?format=, the upload's Content-Type or its file extension """
+    if requested:
+        if requested not in RECORD_FORMATS:
+            raise RecordError(f"format must be one of: {', '.join(RECORD_FORMATS)}")
+        return requested
+    for name, mimetypes in RECORD_FORMATS.items():
+        if mimetype in mimetypes or (filename or "").lower().endswith(f".{name}"):
+            return name
+    if (filename or "").lower().endswith(".jsonl"):
+        return "ndjson"
+    raise RecordError("Send CSV (text/csv) or NDJSON (application/x-ndjson), or pass ?format=")
+
+
+def read_records(stream, fmt):
+    """ Yield (row_number, record, error) for each record of a binary NDJSON or CSV stream
+
+    `record` is a dict (None when the row could not be parsed, with `error`
+    saying why). Blank lines are skipped. Undecodable bytes raise RecordError.
+    """
+    if isinstance(stream, io.RawIOBase):
+        # e.g. the raw request body: line iteration would read it a byte at a time
+        stream = io.BufferedReader(stream, UPLOAD_BUFFER_SIZE)
+    lines = codecs.iterdecode(stream, "utf-8-sig")
+    try:
+        if fmt == "csv":
+            for number, row in enumerate(csv.DictReader(lines), start=1):
+                yield number, {key: value for key, value in row.items() if key is not None}, None
+            return
+
+        number = 0
+        for line in lines:
+            if not line.strip():
+                continue
+            number += 1
+            try:
+                record = current_app.json.loads(line)
+            except ValueError:
+                yield number, None, "Invalid JSON"
+                continue
+            if not isinstance(record, dict):
+                yield number, None, "Expected a JSON object"
+                continue
+            yield number, record, None
+    except UnicodeDecodeError:
+        raise RecordError("Upload is not valid UTF-8")
+    except csv.Error as e:
+        raise RecordError(f"Invalid CSV: {e}")
@@ -0,0 +1,153 @@
+import re
+from sqlalchemy import insert, select
+from .models import db, User, in_batches
+from .passwords import password_hasher
+from .streaming import STREAM_CHUNK_SIZE, chunked
+
+# ==============================================================
+# ✅ Bulk user import / export (admin)
+# ==============================================================
+#
+# Imports read the upload a chunk of IMPORT_CHUNK_SIZE records at a time.
+# Per chunk: validate, check emails and usernames against the database with
+# one IN query each, hash the plain-text passwords across the hashing pool
+# and insert the rows with a single executemany. Earlier chunks are already
+# inserted (same transaction), so later chunks see them in the uniqueness
+# check. The whole import is one transaction: any invalid record rolls it
+# back and the response lists the problems.
+#
+# Rows may carry `password_hash` (werkzeug format, as in an export with
+# ?include=password_hash) instead of `password`; they skip hashing, which is
+# what makes moving a large user base between environments take seconds.
+
+IMPORT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+ROLES = ("user", "admin")
+EXPORT_COLUMNS = ("id", "username", "email", "role", "avatar")
+PASSWORD_HASH = re.compile(r"(scrypt|pbkdf2):[\w:]+\$[^$]+\$[0-9a-f]+")
+EMAIL = re.compile(r"[^@\s]+@[^@\s]+")
+
+
+class UserImportError(Exception):
+    """ Raised when any record of an import is invalid; nothing is written """
+
+    def __init__(self, errors, count):
+        super().__init__(f"{count} invalid record(s)")
+        self.errors = errors  # the first MAX_REPORTED_ERRORS
+        self.count = count
+
+
+def export_chunks(include_password_hash=False):
+    """ Every user as dicts, a STREAM_CHUNK_SIZE chunk at a time (ordered by id) """
+    columns = [User.id, User.username, User.email, User.role, User.avatar]
+    if include_password_hash:
+        columns.append(User.password.label("password_hash"))
+    rows = db.session.execute(
+        select(*columns).order_by(User.id).execution_options(yield_per=STREAM_CHUNK_SIZE)
+    )
+    for partition in rows.partitions():
+        yield [row._asdict() for row in partition]
+
+
+def _text(record, field):
+    value = record.get(field)
+    return value.strip() if isinstance(value, str) else value
+
+
+def _validate(record):
+    """ (row, plain-text password or None, error) for one uploaded record """
+    username, email = _text(record, "username"), _text(record, "email")
+    password, password_hash = record.get("password"), _text(record, "password_hash")
+    role = _text(record, "role") or "user"
+
+    if not isinstance(username, str) or not username or len(username) > 50:
+        return None, None, "username is required (at most 50 characters)"
+    if not isinstance(email, str) or not EMAIL.fullmatch(email) or len(email) > 120:
+        return None, None, "A valid email is required (at most 120 characters)"
+    if role not in ROLES:
+        return None, None, f"role must be one of: {', '.join(ROLES)}"
+    if password_hash:
+        if not isinstance(password_hash, str) or not PASSWORD_HASH.fullmatch(password_hash):
+            return None, None, "password_hash is not a werkzeug password hash"
+        password = None
+    elif not isinstance(password, str) or not password:
+        return None, None, "password (or password_hash) is required"
+
+    avatar = _text(record, "avatar") or ""
+    row = {"username": username, "email": email, "role": role, "avatar": avatar, "password": password_hash}
+    return row, password, None
+
+
+def _taken(column, values):
+    """ Subset of `values` already present in `column` """
+    found = set()
+    for batch in in_batches(sorted(values)):
+        found.update(db.session.scalars(select(column).where(column.in_(batch))))
+    return found
+
+
+def import_users(records, skip_existing=False):
+    """ Insert users from (row_number, record, error) tuples (see streaming.read_records)
+
+    Existing emails/usernames are errors, or skipped with `skip_existing`.
+    Returns {"created": n, "skipped": n} after committing; raises
+    UserImportError (rolled back) if any record is invalid.
+    """
+    created = skipped = error_count = 0
+    errors = []
+
+    def reject(number, error):
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"row": number, "error": error})
+
+    for chunk in chunked(records, IMPORT_CHUNK_SIZE):
+        rows = []
+        emails, usernames = set(), set()
+        for number, record, error in chunk:
+            row, password = None, None
+            if error is None:
+                row, password, error = _validate(record)
+            if error is None and row["email"] in emails:
+                error = "Duplicate email in upload"
+            if error is None and row["username"] in usernames:
+                error = "Duplicate username in upload"
+            if error is not None:
+                reject(number, error)
+                continue
+            emails.add(row["email"])
+            usernames.add(row["username"])
+            rows.append((number, row, password))
+
+        taken_emails, taken_usernames = _taken(User.email, emails), _taken(User.username, usernames)
+        accepted = []
+        for number, row, password in rows:
+            conflict = ("Email is already in use" if row["email"] in taken_emails
+                        else "Username is already in use" if row["username"] in taken_usernames else None)
+            if conflict and skip_existing:
+                skipped += 1
+            elif conflict:
+                reject(number, conflict)
+            else:
+                accepted.append((row, password))
+
+        # Once the import is known to fail, keep validating but skip the expensive part
+        if error_count or not accepted:
+            continue
+
+        plain = [password for _, password in accepted if password is not None]
+        hashes = iter(password_hasher.hash_many(plain)) if plain else iter(())
+        for row, password in accepted:
+            if password is not None:
+                row["password"] = next(hashes)
+        db.session.execute(insert(User), [row for row, _ in accepted])
+        created += len(accepted)
+
+    if error_count:
+        db.session.rollback()
+        raise UserImportError(errors, error_count)
+
+    db.session.commit()
+    return {"created": created, "skipped": skipped}
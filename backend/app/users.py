@@ -1,8 +1,13 @@
-from flask import Blueprint, request, jsonify
+import re
+from flask import Blueprint, request, jsonify, redirect, send_file, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from werkzeug.security import generate_password_hash
-import cloudinary.uploader
-from .models import db, User
+from .models import db, User, Project, AvatarBlob, AvatarJob
+from .authz import membership_index
+from .cache import response_cache
+from .avatars import ALLOWED_EXTENSIONS, avatar_queue
+from .passwords import password_hasher
+from .streaming import RecordError, csv_parts, json_array_parts, ndjson_parts, read_records, record_format, stream_response
+from .user_import import EXPORT_COLUMNS, UserImportError, export_chunks, import_users
 
 # Create a blueprint for user-related routes
 users_bp = Blueprint('users', __name__, url_prefix='/api/users')
@@ -47,9 +52,11 @@ def update_my_profile():
     if 'email' in data:
         user.email = data['email']
     if 'password' in data:
-        user.password = generate_password_hash(data['password'])
+        user.password = password_hasher.hash(data['password'])
     
+    Project.bump_versions_for_user(user.id)
     db.session.commit()
+    response_cache.invalidate('users')
     return jsonify({'message': 'Profile updated successfully'}), 200
 
 # ✅ POST /api/users/me/avatar - Upload or update user avatar
@@ -58,6 +65,37 @@ def update_my_profile():
 def upload_avatar():
     return handle_avatar_upload(get_jwt_identity())
 
+# ✅ GET /api/users/avatar-jobs/<id> - Status of a queued avatar upload
+@users_bp.route('/avatar-jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_avatar_job(job_id):
+    current_user = membership_index.get(get_jwt_identity())
+    job = db.session.get(AvatarJob, job_id)
+    if not current_user or not job:
+        return jsonify({'error': 'Job not found'}), 404
+
+    if not is_admin(current_user) and current_user.id not in (job.user_id, job.requested_by_id):
+        return jsonify({'error': 'Job not found'}), 404
+
+    return jsonify(job.to_dict()), 200
+
+# ✅ GET /api/users/avatars/<hash>.jpg - Avatar thumbnail from the local cache (public, like the image host)
+@users_bp.route('/avatars/<content_hash>.jpg', methods=['GET'])
+def get_avatar_thumbnail(content_hash):
+    if not re.fullmatch(r'[0-9a-f]{64}', content_hash):
+        return jsonify({'error': 'Avatar not found'}), 404
+
+    path = avatar_queue.thumbnails.get(content_hash)
+    if path:
+        # Content-addressed: the bytes behind this URL never change
+        return send_file(path, mimetype='image/jpeg', max_age=31536000)
+
+    # Evicted (or never generated): fall back to the stored image
+    blob = db.session.get(AvatarBlob, content_hash)
+    if not blob:
+        return jsonify({'error': 'Avatar not found'}), 404
+    return redirect(blob.url)
+
 ##############################################
 # ✅ Admin-Only Endpoints (includes avatar)
 ##############################################
@@ -66,25 +104,73 @@ def upload_avatar():
 @users_bp.route('', methods=['GET'])
 @jwt_required()
 def list_all_users():
-    current_user = User.query.get(get_jwt_identity())
+    current_user = membership_index.get(get_jwt_identity())
     if not current_user or not is_admin(current_user):
         return jsonify({'error': 'Admin access required'}), 403
 
-    return jsonify([
-        {
-            'id': user.id,
-            'username': user.username,
-            'email': user.email,
-            'role': getattr(user, 'role', 'user'),
-            'avatar': user.avatar
-        } for user in User.query.all()
-    ]), 200
+    # ✅ Streamed: grows with the whole user table (see app/streaming.py)
+    return stream_response(json_array_parts(export_chunks())), 200
+
+# ✅ GET /api/users/export - Every user as NDJSON (default) or CSV, streamed (admin only)
+#
+# ?include=password_hash adds the stored hashes, so the file can be imported elsewhere.
+@users_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_users():
+    current_user = membership_index.get(get_jwt_identity())
+    if not current_user or not is_admin(current_user):
+        return jsonify({'error': 'Admin access required'}), 403
+
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in ('ndjson', 'csv'):
+        return jsonify({'error': 'format must be one of: ndjson, csv'}), 400
+
+    with_hashes = 'password_hash' in request.args.get('include', '').split(',')
+    chunks = export_chunks(include_password_hash=with_hashes)
+    if fmt == 'csv':
+        columns = EXPORT_COLUMNS + (('password_hash',) if with_hashes else ())
+        return stream_response(csv_parts(chunks, columns), mimetype='text/csv', filename='users.csv'), 200
+    return stream_response(ndjson_parts(chunks), mimetype='application/x-ndjson', filename='users.ndjson'), 200
+
+# ✅ POST /api/users/import - Create users from an NDJSON or CSV upload (admin only)
+#
+# The body is the file itself (Content-Type text/csv or application/x-ndjson)
+# or a multipart form with a `file` field. Each record has username, email,
+# password or password_hash, and optionally role and avatar. All or nothing,
+# unless ?on_conflict=skip, which skips records whose email/username exists.
+@users_bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_users_route():
+    current_user = membership_index.get(get_jwt_identity())
+    if not current_user or not is_admin(current_user):
+        return jsonify({'error': 'Admin access required'}), 403
+
+    on_conflict = request.args.get('on_conflict', 'error')
+    if on_conflict not in ('error', 'skip'):
+        return jsonify({'error': 'on_conflict must be one of: error, skip'}), 400
+
+    upload = request.files.get('file')
+    stream = upload.stream if upload else request.stream
+    try:
+        fmt = record_format(request.args.get('format'), upload.mimetype if upload else request.mimetype,
+                            upload.filename if upload else None)
+        result = import_users(read_records(stream, fmt), skip_existing=on_conflict == 'skip')
+    except RecordError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except UserImportError as e:
+        return jsonify({'error': str(e), 'errors': e.errors}), 400
+
+    response_cache.invalidate('users')
+    return jsonify(result), 201
 
 # ✅ GET /api/users/<id> - Get specific user's details (admin only)
 @users_bp.route('/<int:user_id>', methods=['GET'])
 @jwt_required()
 def get_user(user_id):
-    current_user = User.query.get(get_jwt_identity())
+    current_user = membership_index.get(get_jwt_identity())
+    if not current_user:
+        return jsonify({'error': 'User not found'}), 404
 
     user = User.query.get(user_id)
     if not user:
@@ -102,7 +188,7 @@ def get_user(user_id):
 @users_bp.route('/<int:user_id>', methods=['PUT'])
 @jwt_required()
 def update_user(user_id):
-    current_user = User.query.get(get_jwt_identity())
+    current_user = membership_index.get(get_jwt_identity())
     if not current_user or not is_admin(current_user):
         return jsonify({'error': 'Admin access required'}), 403
 
@@ -116,18 +202,23 @@ def update_user(user_id):
     if 'email' in data:
         user.email = data['email']
     if 'password' in data:
-        user.password = generate_password_hash(data['password'])
-    if 'role' in data and data['role'] in ['user', 'admin']:
+        user.password = password_hasher.hash(data['password'])
+    if 'role' in data and data['role'] in ['user', 'admin'] and data['role'] != user.role:
+        if user.role == 'admin':
+            User.bump_authz_version(user.id)  # ✅ Tokens claiming admin stop working; a promotion keeps them valid
         user.role = data['role']
     
+    Project.bump_versions_for_user(user.id)
     db.session.commit()
+    membership_index.invalidate(user_id)
+    response_cache.invalidate('users')
     return jsonify({'message': 'User updated successfully'}), 200
 
 # ✅ POST /api/users/<id>/avatar - Upload avatar for a specific user (admin only)
 @users_bp.route('/<int:user_id>/avatar', methods=['POST'])
 @jwt_required()
 def upload_user_avatar(user_id):
-    current_user = User.query.get(get_jwt_identity())
+    current_user = membership_index.get(get_jwt_identity())
     if not current_user or not is_admin(current_user):
         return jsonify({"error": "Admin access required"}), 403
 
@@ -137,7 +228,7 @@ def upload_user_avatar(user_id):
 @users_bp.route('/<int:user_id>', methods=['DELETE'])
 @jwt_required()
 def delete_user(user_id):
-    current_user = User.query.get(get_jwt_identity())
+    current_user = membership_index.get(get_jwt_identity())
     if not current_user or not is_admin(current_user):
         return jsonify({'error': 'Admin access required'}), 403
 
@@ -148,8 +239,11 @@ def delete_user(user_id):
     if current_user.id == user.id:
         return jsonify({'error': 'Admins cannot delete their own account'}), 400
 
+    Project.bump_versions_for_user(user.id)
     db.session.delete(user)
     db.session.commit()
+    membership_index.invalidate(user_id)
+    response_cache.invalidate('users', f'user:{user_id}')
     return jsonify({'message': 'User deleted successfully'}), 200
 
 ##############################################
@@ -157,7 +251,7 @@ def delete_user(user_id):
 ##############################################
 
 def handle_avatar_upload(user_id):
-    """ Upload avatar for a user, validating and storing it in Cloudinary """
+    """ Validate an avatar upload and queue it for background processing (202 + job id) """
     user = User.query.get(user_id)
     if not user:
         return jsonify({"error": "User not found"}), 404
@@ -168,28 +262,15 @@ def handle_avatar_upload(user_id):
     file = request.files['avatar']
 
     # Validate file type
-    allowed_extensions = {"jpg", "jpeg", "png", "gif"}
     file_extension = file.filename.rsplit(".", 1)[-1].lower()
-    if file_extension not in allowed_extensions:
+    if file_extension not in ALLOWED_EXTENSIONS:
         return jsonify({"error": "Invalid file type. Allowed: jpg, jpeg, png, gif"}), 400
 
     try:
-        # Upload to Cloudinary
-        upload_result = cloudinary.uploader.upload(
-            file,
-            folder="user_avatars",
-            transformation=[
-                {"width": 300, "height": 300, "crop": "thumb", "gravity": "face"},
-                {"quality": "auto"}
-            ],
-            format="jpg"
-        )
-
-        # Save new avatar URL
-        user.avatar = upload_result["secure_url"]
-        db.session.commit()
-
-        return jsonify({"message": "Avatar updated successfully", "avatar_url": user.avatar}), 200
-
-    except Exception as e:
+        job = avatar_queue.enqueue(user.id, int(get_jwt_identity()), file)
+    except OSError as e:
+        db.session.rollback()
         return jsonify({"error": f"Failed to upload avatar: {str(e)}"}), 500
+
+    status_url = url_for('users.get_avatar_job', job_id=job.id)
+    return jsonify({"message": "Avatar upload queued", "job_id": job.id, "status_url": status_url}), 202, {"Location": status_url}
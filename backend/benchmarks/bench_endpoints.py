@@ -0,0 +1,449 @@
+""" Endpoint benchmark: latency, SQL queries and peak memory per route and data scale
+
+Seeds a throwaway SQLite database with `flask seed`'s generator at each
+scale, then drives every route in routes.py, users.py and auth.py through a
+werkzeug test client and records p50/p95 latency, SQL statements per request
+and peak Python memory (tracemalloc, measured in a separate pass so it does
+not skew the timings). The response cache is disabled so reads measure the
+query path rather than cache hits.
+
+    python benchmarks/bench_endpoints.py                               # all scales, print a table
+    python benchmarks/bench_endpoints.py --scale small --save benchmarks/baseline.json
+    python benchmarks/bench_endpoints.py --compare benchmarks/baseline.json   # exit 1 on regressions
+
+Query counts are deterministic and compared strictly. Latency depends on the
+host, so --compare first estimates how fast this run is relative to the
+baseline (the median ratio of p50 latencies across all routes) and only flags
+a route whose p50 grew by more than LATENCY_RATIO beyond that; a uniformly
+slower or faster machine does not fail the check. Record the baseline on the
+host that runs the comparison (e.g. CI) and regenerate it with --save when that
+host changes. The exit status is 0 when nothing regressed, 1 otherwise.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+WORKDIR = tempfile.mkdtemp(prefix="pmd-bench-")
+
+# Config is read from the environment at import time
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(WORKDIR, 'bench.db')}",
+    "RESPONSE_CACHE_MAX_ENTRIES": "0",
+    "PASSWORD_HASH_WORKERS": "0",
+    "PASSWORD_HASH_QUEUE_LIMIT": "64",
+    "AVATAR_STORAGE": "local",
+    "AVATAR_LOCAL_DIR": os.path.join(WORKDIR, "avatars"),
+    "AVATAR_SPOOL_DIR": os.path.join(WORKDIR, "spool"),
+    "AVATAR_CACHE_DIR": os.path.join(WORKDIR, "avatar_cache"),
+    "AVATAR_WORKERS": "1",
+})
+sys.path.insert(0, BACKEND)
+
+from PIL import Image  # noqa: E402
+from sqlalchemy import event, func, select  # noqa: E402
+from werkzeug.test import Client  # noqa: E402
+from app import create_app, db  # noqa: E402
+from app.authz import access_token  # noqa: E402
+from app.avatars import avatar_queue  # noqa: E402
+from app.models import AvatarBlob, AvatarJob, Ticket, TicketHistory, User, project_assignments  # noqa: E402
+from app.project_archive import archive_chunks  # noqa: E402
+from app.seed import SEED_PASSWORD, seed_database  # noqa: E402
+from app.streaming import ndjson_parts  # noqa: E402
+
+# (users, projects, tickets, history) handed to seed_database
+SCALES = {
+    "small": (50, 20, 1000, 2000),
+    "medium": (200, 100, 10000, 20000),
+    "large": (1000, 400, 100000, 200000),
+}
+
+# Routes not driven here, with the reason
+SKIPPED = {
+    ("routes.get_project_events", "GET"): "SSE stream stays open until EVENT_MAX_STREAM",
+}
+
+# Regression thresholds for --compare: a route's p50, scaled by the run's
+# overall speed, may grow by this factor (and always by the floor) before it counts
+LATENCY_RATIO = 1.5
+LATENCY_FLOOR_MS = 2.0
+
+
+def _png():
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 64), (40, 120, 200)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+PNG = _png()
+
+
+def _new_user(role="user"):
+    stamp = time.perf_counter_ns()
+    user = User(username=f"bench.{stamp}", email=f"bench.{stamp}@example.invalid", password="x", role=role)
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+
+def _new_ticket(ids):
+    ticket = Ticket(title="bench", description="bench", project_id=ids["project_id"],
+                    created_by_id=ids["admin"], version=0)
+    db.session.add(ticket)
+    db.session.commit()
+    return ticket.id
+
+
+def _new_avatar_job(ids):
+    job = AvatarJob(id=uuid.uuid4().hex, user_id=ids["member"], requested_by_id=ids["member"], status="done", attempts=1)
+    db.session.add(job)
+    db.session.commit()
+    return job.id
+
+
+def _bulk_ids(ids, count=20):
+    return [{"id": ticket_id, "status": "In Progress", "priority": "High"} for ticket_id in ids["bulk_ticket_ids"][:count]]
+
+
+def _user_import(ids, count=100):
+    """ NDJSON of fresh users carrying a password hash (as a ?include=password_hash export does) """
+    stamp = _stamp()
+    return "".join(
+        json.dumps({"username": f"import.{stamp}.{i}", "email": f"import.{stamp}.{i}@example.invalid",
+                    "password_hash": ids["password_hash"]}) + "\n"
+        for i in range(count)
+    ).encode()
+
+
+def _upload():
+    return {"avatar": (io.BytesIO(PNG), "avatar.png")}
+
+
+def _stamp():
+    return str(time.perf_counter_ns())
+
+
+# Rows created per request (outside the timed section) for routes that
+# consume them; referenced from paths as {new_user} etc.
+FACTORIES = {
+    "new_user": lambda ids: _new_user(),
+    "new_ticket": _new_ticket,
+    "new_avatar_job": _new_avatar_job,
+}
+
+# (label, method, path, caller, body, expected status)
+#   a callable body is re-evaluated for every request so each one creates or
+#   targets fresh rows
+CASES = [
+    ("register", "POST", "/api/auth/register", None,
+     lambda ids: {"username": f"reg{_stamp()}", "email": f"reg{_stamp()}@example.invalid", "password": "pw"}, 201),
+    ("login", "POST", "/api/auth/login", None,
+     lambda ids: {"email": ids["member_email"], "password": SEED_PASSWORD}, 200),
+
+    ("projects (admin)", "GET", "/api/projects", "admin", None, 200),
+    ("projects (member)", "GET", "/api/projects", "member", None, 200),
+    ("projects fields", "GET", "/api/projects?fields=id,title,status", "admin", None, 200),
+    ("projects assigned", "GET", "/api/projects/assigned", "member", None, 200),
+    ("project details", "GET", "/api/projects/{project_id}", "member", None, 200),
+    ("project tickets", "GET", "/api/projects/{project_id}/tickets", "member", None, 200),
+    ("project tickets page", "GET", "/api/projects/{project_id}/tickets?limit=50&status=To Do", "member", None, 200),
+    ("project tickets delta", "GET", "/api/projects/{project_id}/tickets?since=0", "member", None, 200),
+    ("project users", "GET", "/api/projects/{project_id}/users", "member", None, 200),
+    ("project stats", "GET", "/api/projects/{project_id}/stats", "member", None, 200),
+    ("create project", "POST", "/api/projects", "admin",
+     {"title": "bench", "start_date": "2025-01-01", "end_date": "2025-06-30"}, 201),
+    ("assign user", "POST", "/api/projects/{project_id}/assign", "admin",
+     lambda ids: {"user_id": _new_user()}, 200),
+    ("update project", "PUT", "/api/projects/{project_id}", "admin", {"description": "benchmarked"}, 200),
+    ("export project", "GET", "/api/projects/{project_id}/export", "admin", None, 200),
+    ("import project", "POST", "/api/projects/import", "admin", lambda ids: ids["project_archive"], 201),
+
+    ("user tickets", "GET", "/api/tickets/user?limit=50", "member", None, 200),
+    ("create ticket", "POST", "/api/tickets", "member",
+     lambda ids: {"title": "bench", "description": "bench", "project_id": ids["project_id"]}, 201),
+    ("update ticket", "PUT", "/api/tickets/{ticket_id}", "member",
+     lambda ids: {"status": "Done" if time.perf_counter_ns() % 2 else "In Progress", "priority": "High"}, 200),
+    ("bulk create tickets", "POST", "/api/tickets/bulk", "member",
+     lambda ids: {"tickets": [{"title": f"bulk {i}", "description": "bench", "project_id": ids["project_id"]}
+                              for i in range(20)]}, 201),
+    ("bulk update tickets", "PATCH", "/api/tickets/bulk", "member", lambda ids: {"tickets": _bulk_ids(ids)}, 200),
+    ("delete ticket", "DELETE", "/api/tickets/{new_ticket}", "member", None, 200),
+    ("ticket history", "GET", "/api/tickets/{ticket_id}/history", "member", None, 200),
+    ("ticket history page", "GET", "/api/tickets/{ticket_id}/history?limit=50", "member", None, 200),
+    ("search", "GET", "/api/search?q=billing+pag", "member", None, 200),
+    ("search (admin)", "GET", "/api/search?q=billing+pag", "admin", None, 200),
+    ("cache stats", "GET", "/api/_cache/stats", "admin", None, 200),
+    ("metrics", "GET", "/api/_metrics", "admin", None, 200),
+
+    ("my profile", "GET", "/api/users/me", "member", None, 200),
+    ("update my profile", "PUT", "/api/users/me", "member", lambda ids: {"username": f"member.{_stamp()}"}, 200),
+    ("upload my avatar", "POST", "/api/users/me/avatar", "member", lambda ids: _upload(), 202),
+    ("avatar job", "GET", "/api/users/avatar-jobs/{new_avatar_job}", "member", None, 200),
+    ("avatar thumbnail", "GET", "/api/users/avatars/{content_hash}.jpg", None, None, 200),
+    ("users (admin)", "GET", "/api/users", "admin", None, 200),
+    ("user", "GET", "/api/users/{member}", "admin", None, 200),
+    ("update user", "PUT", "/api/users/{member}", "admin", {"role": "user"}, 200),
+    ("upload user avatar", "POST", "/api/users/{member}/avatar", "admin", lambda ids: _upload(), 202),
+    ("delete user", "DELETE", "/api/users/{new_user}", "admin", None, 200),
+    ("export users", "GET", "/api/users/export", "admin", None, 200),
+    ("import users", "POST", "/api/users/import", "admin", _user_import, 201),
+]
+
+
+def fixtures(scale):
+    """ Seed the database and pick the rows the cases operate on """
+    seed_database(*SCALES[scale], seed=1, drop=True)
+
+    admin = db.session.scalar(select(User.id).where(User.role == "admin").order_by(User.id))
+    # The busiest project, and a regular member of it
+    project_id = db.session.scalar(
+        select(Ticket.project_id).group_by(Ticket.project_id).order_by(func.count().desc(), Ticket.project_id)
+    )
+    member = db.session.scalar(
+        select(User.id).join(project_assignments, project_assignments.c.user_id == User.id)
+        .where(project_assignments.c.project_id == project_id, User.role == "user").order_by(User.id)
+    )
+    ticket_ids = db.session.scalars(
+        select(Ticket.id).where(Ticket.project_id == project_id).order_by(Ticket.id).limit(21)
+    ).all()
+    ticket_id = db.session.scalar(
+        select(TicketHistory.ticket_id).join(Ticket).where(Ticket.project_id == project_id)
+        .group_by(TicketHistory.ticket_id).order_by(func.count().desc(), TicketHistory.ticket_id)
+    ) or ticket_ids[0]
+
+    # Import source: the archive of the smallest project, so repeated imports stay cheap
+    smallest = db.session.scalar(
+        select(Ticket.project_id).group_by(Ticket.project_id).order_by(func.count(), Ticket.project_id)
+    )
+    project_archive = "".join(ndjson_parts(archive_chunks(smallest))).encode()
+
+    # One avatar already processed, with its thumbnail in the local cache
+    spool = os.path.join(WORKDIR, "seed-avatar.png")
+    with open(spool, "wb") as f:
+        f.write(PNG)
+    content_hash = "0" * 64
+    avatar_queue.thumbnails.put(content_hash, spool)
+    db.session.merge(AvatarBlob(content_hash=content_hash, url="https://example.invalid/avatar.png"))
+    db.session.commit()
+
+    return {
+        "admin": admin,
+        "member": member,
+        "member_email": db.session.get(User, member).email,
+        "password_hash": db.session.get(User, member).password,
+        "project_id": project_id,
+        "ticket_id": ticket_id,
+        "bulk_ticket_ids": [i for i in ticket_ids if i != ticket_id],
+        "content_hash": content_hash,
+        "project_archive": project_archive,
+    }
+
+
+class QueryCounter:
+    """ Counts statements issued by the request thread (not the avatar workers) """
+
+    def __init__(self):
+        self.count = 0
+        self.thread = threading.get_ident()
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() == self.thread:
+            self.count += 1
+
+
+def _request(app, client, case, ids, headers):
+    label, method, path, caller, body, expected = case
+    # Per-request rows are created outside the measured section
+    with app.app_context():
+        fresh = {key: factory(ids) for key, factory in FACTORIES.items() if f"{{{key}}}" in path}
+        path = path.format(**ids, **fresh)
+        body = body(ids) if callable(body) else body
+
+    if isinstance(body, bytes):
+        kwargs = {"data": body, "content_type": "application/x-ndjson"}
+    elif method == "POST" and "avatar" in (body or {}):
+        kwargs = {"data": body}
+    else:
+        kwargs = {"json": body}
+    started = time.perf_counter()
+    response = client.open(path, method=method, headers=headers.get(caller, {}), **kwargs)
+    # Read the body without keeping it (streamed bodies are produced while being read)
+    first = b"".join(part for _, part in zip(range(1), response.iter_encoded()))
+    for _ in response.iter_encoded():
+        pass
+    elapsed = time.perf_counter() - started
+    response.close()
+    if response.status_code != expected:
+        raise RuntimeError(f"{label}: {method} {path} returned {response.status_code}, expected {expected}: "
+                           f"{first[:200].decode(errors='replace')}")
+    return elapsed
+
+
+def run_scale(app, scale, iterations, warmup):
+    with app.app_context():
+        started = time.perf_counter()
+        ids = fixtures(scale)
+        print(f"# {scale}: seeded {SCALES[scale]} in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+        headers = {
+            role: {"Authorization": "Bearer " + access_token(db.session.get(User, ids[role]))}
+            for role in ("admin", "member")
+        }
+        engine = db.engine
+
+    client = Client(app)
+    counter = QueryCounter()
+    results = {}
+    for case in CASES:
+        for _ in range(warmup):
+            _request(app, client, case, ids, headers)
+
+        timings, queries = [], []
+        event.listen(engine, "before_cursor_execute", counter)
+        try:
+            for _ in range(iterations):
+                counter.count = 0
+                timings.append(_request(app, client, case, ids, headers))
+                queries.append(counter.count)
+        finally:
+            event.remove(engine, "before_cursor_execute", counter)
+
+        tracemalloc.start()
+        try:
+            tracemalloc.reset_peak()
+            _request(app, client, case, ids, headers)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        quantiles = statistics.quantiles(timings, n=20, method="inclusive") if len(timings) > 1 else timings * 19
+        results[case[0]] = {
+            "method": case[1],
+            "p50_ms": round(quantiles[9] * 1000, 3),
+            "p95_ms": round(quantiles[18] * 1000, 3),
+            "queries": max(queries),
+            "peak_kib": round(peak / 1024, 1),
+        }
+    return results
+
+
+def uncovered_routes(app):
+    """ Routes of the benchmarked blueprints that no case (or SKIPPED entry) exercises """
+    adapter = app.url_map.bind("localhost")
+    sample = {key: 1 for key in ("project_id", "ticket_id", "member", *FACTORIES)}
+    sample["content_hash"] = "0" * 64
+    covered = set(SKIPPED)
+    for label, method, path, caller, body, expected in CASES:
+        endpoint, _ = adapter.match(path.split("?")[0].format(**sample), method=method)
+        covered.add((endpoint, method))
+
+    missing = []
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint.split(".")[0] not in ("routes", "users", "auth"):
+            continue
+        for method in sorted(rule.methods - {"HEAD", "OPTIONS"}):
+            if (rule.endpoint, method) not in covered:
+                missing.append(f"{method} {rule.rule}")
+    return missing
+
+
+def host_speed(baseline, current):
+    """ Median ratio of current to baseline p50 over every route both ran (1.0 = same speed) """
+    ratios = [
+        now["p50_ms"] / before["p50_ms"]
+        for scale, routes in current.items()
+        for label, now in routes.items()
+        if (before := baseline.get(scale, {}).get(label)) and before["p50_ms"] > 0
+    ]
+    return statistics.median(ratios) if ratios else 1.0
+
+
+def compare(baseline, current):
+    """ Return human-readable regressions of `current` against `baseline` """
+    speed = host_speed(baseline, current)
+    regressions = []
+    for scale, routes in current.items():
+        for label, now in routes.items():
+            before = baseline.get(scale, {}).get(label)
+            if before is None:
+                print(f"warning: {scale}/{label} is not in the baseline", file=sys.stderr)
+                continue
+            if now["queries"] > before["queries"]:
+                regressions.append(f"{scale}/{label}: {before['queries']} → {now['queries']} queries")
+            expected = before["p50_ms"] * speed
+            if now["p50_ms"] > max(expected * LATENCY_RATIO, expected + LATENCY_FLOOR_MS):
+                regressions.append(f"{scale}/{label}: p50 {now['p50_ms']:.1f} ms, expected ≈{expected:.1f} ms "
+                                   f"(baseline {before['p50_ms']:.1f} ms × host speed {speed:.2f})")
+    return regressions
+
+
+def print_table(scale, results, baseline=None):
+    print(f"\n[{scale}]")
+    print(f"{'route':<24} {'method':<7} {'p50 ms':>8} {'p95 ms':>8} {'queries':>8} {'peak KiB':>9}  baseline p50/queries")
+    for label, row in results.items():
+        before = (baseline or {}).get(scale, {}).get(label)
+        reference = f"{before['p50_ms']:.1f} / {before['queries']}" if before else ""
+        print(f"{label:<24} {row['method']:<7} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+              f"{row['queries']:>8} {row['peak_kib']:>9.1f}  {reference}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", action="append", choices=list(SCALES), help="default: all")
+    parser.add_argument("--iterations", type=int, default=20, help="timed requests per route")
+    parser.add_argument("--warmup", type=int, default=2, help="untimed requests per route first")
+    parser.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH",
+                        help="diff against a baseline saved on this host; exit 1 on regressions")
+    args = parser.parse_args()
+
+    app = create_app()
+    for route in uncovered_routes(app):
+        print(f"warning: {route} is not benchmarked", file=sys.stderr)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+
+    results = {}
+    for scale in args.scale or list(SCALES):
+        results[scale] = run_scale(app, scale, args.iterations, args.warmup)
+        print_table(scale, results[scale], baseline)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "recorded_at": datetime.utcnow().replace(microsecond=0).isoformat() + "Z",
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "machine": platform.machine(),
+                "iterations": args.iterations,
+                "scales": {scale: dict(zip(("users", "projects", "tickets", "history"), SCALES[scale]))
+                           for scale in results},
+                "results": results,
+            }, f, indent=2)
+            f.write("\n")
+
+    if baseline is not None:
+        print(f"\nhost speed vs baseline: {host_speed(baseline, results):.2f}× baseline latency")
+        regressions = compare(baseline, results)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            raise SystemExit(1)
+        print("OK: no regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+""" Password hashing micro-benchmark: logins per second per core
+
+Times check_password_hash for each method inline (one core), then through
+PasswordHasher's process pool with 1..N workers, and reports logins/sec and
+logins/sec/core. Use it to pick PASSWORD_HASH_METHOD and PASSWORD_HASH_WORKERS
+for the target machine.
+
+    python benchmarks/bench_password_hashing.py
+    python benchmarks/bench_password_hashing.py --method pbkdf2:sha256:600000 --seconds 5
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from werkzeug.security import check_password_hash, generate_password_hash  # noqa: E402
+from app.passwords import DEFAULT_METHOD, PasswordHasher  # noqa: E402
+
+METHODS = [DEFAULT_METHOD, "scrypt:16384:8:1", "pbkdf2:sha256:600000", "pbkdf2:sha256:260000"]
+
+
+class _App:
+    """ Just enough of a Flask app for PasswordHasher.init_app """
+
+    def __init__(self, **config):
+        self.config = config
+        self.extensions = {}
+
+    def register_error_handler(self, *args):
+        pass
+
+
+def inline_rate(stored, seconds):
+    count, deadline = 0, time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        check_password_hash(stored, "correct horse battery staple")
+        count += 1
+    return count / seconds
+
+
+def pool_rate(method, stored, workers, seconds):
+    hasher = PasswordHasher()
+    hasher.init_app(_App(PASSWORD_HASH_METHOD=method, PASSWORD_HASH_WORKERS=workers,
+                         PASSWORD_HASH_QUEUE_LIMIT=workers * 2, PASSWORD_HASH_TIMEOUT=60))
+    hasher.verify(stored, "warm-up")  # spawn the pool outside the timed section
+
+    def client(deadline):
+        count = 0
+        while time.perf_counter() < deadline:
+            hasher.verify(stored, "correct horse battery staple")
+            count += 1
+        return count
+
+    # As many request threads as pool slots, like a gthread worker under a login burst
+    deadline = time.perf_counter() + seconds
+    with ThreadPoolExecutor(workers) as threads:
+        total = sum(threads.map(client, [deadline] * workers))
+    hasher._executor.shutdown()
+    return total / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--method", action="append", help="werkzeug method string (repeatable)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="largest pool size to try")
+    parser.add_argument("--seconds", type=float, default=3.0, help="duration of each measurement")
+    args = parser.parse_args()
+
+    print(f"{'method':<24} {'mode':<10} {'logins/s':>10} {'per core':>10}")
+    for method in args.method or METHODS:
+        stored = generate_password_hash("correct horse battery staple", method)
+        rate = inline_rate(stored, args.seconds)
+        print(f"{method:<24} {'inline':<10} {rate:>10.1f} {rate:>10.1f}")
+
+        workers = 1
+        while workers <= args.workers:
+            rate = pool_rate(method, stored, workers, args.seconds)
+            print(f"{method:<24} {f'pool x{workers}':<10} {rate:>10.1f} {rate / workers:>10.1f}")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
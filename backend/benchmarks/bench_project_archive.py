@@ -0,0 +1,91 @@
+""" Project archive benchmark: GET /api/projects/<id>/export and POST /api/projects/import at volume
+
+Seeds one project with --tickets tickets and --history history entries,
+exports it (NDJSON and zip) to disk and imports the NDJSON file back as a
+new project. Each step is run again under tracemalloc for its peak memory,
+which should stay flat as the project grows (rows are read, sent and
+inserted a chunk at a time).
+
+    python benchmarks/bench_project_archive.py
+    python benchmarks/bench_project_archive.py --tickets 200000 --history 400000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+WORKDIR = tempfile.mkdtemp(prefix="pmd-bench-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(WORKDIR, 'bench.db')}",
+    "RESPONSE_CACHE_MAX_ENTRIES": "0",
+    "PASSWORD_HASH_WORKERS": "0",
+})
+sys.path.insert(0, BACKEND)
+
+from werkzeug.test import Client  # noqa: E402
+from app import create_app, db  # noqa: E402
+from app.authz import access_token  # noqa: E402
+from app.models import Project, User  # noqa: E402
+from app.seed import seed_database  # noqa: E402
+
+
+def measured(function):
+    """ (seconds, result) of one call, then the peak traced memory of a second call """
+    started = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickets", type=int, default=50000)
+    parser.add_argument("--history", type=int, default=100000)
+    args = parser.parse_args()
+
+    app = create_app()
+    client = Client(app)
+    with app.app_context():
+        seed_database(users=50, projects=1, tickets=args.tickets, history=args.history, seed=1, drop=True)
+        project_id = db.session.scalar(db.select(Project.id))
+        admin = db.session.scalar(db.select(User).where(User.role == "admin").limit(1))
+        headers = {"Authorization": "Bearer " + access_token(admin)}
+
+        for fmt in ("ndjson", "zip"):
+            path = os.path.join(WORKDIR, f"project.{fmt}")
+
+            def export():
+                response = client.get(f"/api/projects/{project_id}/export?format={fmt}", headers=headers)
+                with open(path, "wb") as f:
+                    for part in response.iter_encoded():
+                        f.write(part)
+                return response.status_code
+
+            elapsed, peak, status = measured(export)
+            size_mb = os.path.getsize(path) / 1e6
+            print(f"export ({fmt}): {status}, {size_mb:.1f} MB in {elapsed:.2f}s, peak {peak / 1e6:.1f} MB")
+
+        path = os.path.join(WORKDIR, "project.ndjson")
+
+        def load():
+            with open(path, "rb") as f:
+                response = client.post("/api/projects/import", input_stream=f, content_length=os.path.getsize(path),
+                                       content_type="application/x-ndjson", headers=headers)
+            if response.status_code != 201:
+                raise RuntimeError(f"import returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+            return response.get_json()
+
+        elapsed, peak, result = measured(load)
+        print(f"import: {result['tickets']} tickets, {result['history']} history entries in {elapsed:.2f}s, "
+              f"peak {peak / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
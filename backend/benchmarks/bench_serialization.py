@@ -0,0 +1,107 @@
+""" Serialization benchmark: ticket listing of one large project
+
+Seeds a single project with --tickets tickets, then times the two halves of
+GET /api/projects/<id>/tickets separately (to_dict over the loaded rows, and
+JSON encoding of the result) for the previous strftime-based to_dict and
+the stdlib provider versus the current to_dict and the "fast" provider, and
+finally reads the serialize timing from the route's Server-Timing header
+under each provider.
+
+    python benchmarks/bench_serialization.py
+    python benchmarks/bench_serialization.py --tickets 50000 --repeat 10
+"""
+import argparse
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='pmd-bench-'), 'bench.db')}",
+    "RESPONSE_CACHE_MAX_ENTRIES": "0",
+    "PASSWORD_HASH_WORKERS": "0",
+})
+sys.path.insert(0, BACKEND)
+
+from werkzeug.test import Client  # noqa: E402
+from app import create_app, db  # noqa: E402
+from app.authz import access_token  # noqa: E402
+from app.json_provider import PROVIDERS  # noqa: E402
+from app.metrics import request_metrics  # noqa: E402
+from app.models import Ticket, User  # noqa: E402
+from app.seed import seed_database  # noqa: E402
+
+SERVER_TIMING = re.compile(r"serialize;dur=([\d.]+)")
+
+
+def legacy_to_dict(ticket):
+    """ Ticket.to_dict as it was: attribute access and strftime per field """
+    return {
+        "id": ticket.id,
+        "title": ticket.title,
+        "description": ticket.description,
+        "status": ticket.status,
+        "priority": ticket.priority,
+        "created_at": ticket.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+        "updated_at": ticket.updated_at.strftime("%Y-%m-%d %H:%M:%S"),
+        "project_id": ticket.project_id,
+        "assigned_user_id": ticket.assigned_user_id,
+        "assigned_user": ticket.assigned_user.username if ticket.assigned_user else None,
+        "creator": ticket.creator.username if ticket.creator else None,
+    }
+
+
+def best(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000, statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickets", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        seed_database(users=20, projects=1, tickets=args.tickets, history=0, seed=1, drop=True)
+        project_id = db.session.scalar(db.select(Ticket.project_id).limit(1))
+        member = db.session.scalar(db.text("SELECT user_id FROM project_assignments ORDER BY user_id LIMIT 1"))
+        headers = {"Authorization": "Bearer " + access_token(db.session.get(User, member))}
+
+        tickets = Ticket.with_users(Ticket.query.filter_by(project_id=project_id)).order_by(Ticket.id).all()
+        rows = [ticket.to_dict() for ticket in tickets]
+        assert rows == [legacy_to_dict(ticket) for ticket in tickets]
+
+        print(f"{len(tickets)} tickets in one project (best / median of {args.repeat}, ms)")
+        print(f"{'step':<38} {'best':>8} {'median':>8}")
+        steps = [("to_dict (strftime, before)", lambda: [legacy_to_dict(ticket) for ticket in tickets]),
+                 ("to_dict (row fast path)", lambda: [ticket.to_dict() for ticket in tickets])]
+        for name, provider_class in PROVIDERS.items():
+            provider = provider_class(app)
+            steps.append((f"encode ({name}: {provider_class.__name__})", lambda provider=provider: provider.response(rows)))
+        for name, function in steps:
+            low, median = best(function, args.repeat)
+            print(f"{name:<38} {low:>8.1f} {median:>8.1f}")
+
+    print(f"\nGET /api/projects/{project_id}/tickets, Server-Timing serialize (ms)")
+    client = Client(app)
+    for name, provider_class in PROVIDERS.items():
+        app.json = provider_class(app)
+        request_metrics.instrument_json(app.json)
+        timings = []
+        for _ in range(args.repeat):
+            response = client.get(f"/api/projects/{project_id}/tickets", headers=headers)
+            timings.append(float(SERVER_TIMING.search(response.headers["Server-Timing"]).group(1)))
+        print(f"{name:<38} {min(timings):>8.1f} {statistics.median(timings):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
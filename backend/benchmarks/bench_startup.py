@@ -0,0 +1,165 @@
+""" Startup benchmark: import time and create_app() cost of a worker boot, plus preload safety
+
+Boots the app in fresh interpreters under `python -X importtime` (what a
+gunicorn master does with --preload, or every worker without it), and
+reports the median total import time, the create_app() wall time and the
+heaviest imports. Each boot is also checked for things that must not happen
+before gunicorn forks: database connections opened, threads started, or
+modules that are meant to load lazily (e.g. the Cloudinary SDK) imported.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --save benchmarks/startup_baseline.json
+    python benchmarks/bench_startup.py --compare benchmarks/startup_baseline.json   # exit 1 on regressions
+
+Times depend on the machine, so compare against a baseline recorded on the
+same hardware. The preload checks fail regardless of any baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Imported on first use only; seeing one after create_app() is a regression
+LAZY_MODULES = ("cloudinary",)
+
+# A boot regresses when it is this much slower than the baseline (ratio and absolute floor)
+TIME_RATIO = 1.25
+TIME_FLOOR_MS = 20
+
+BOOT = """
+import json, sys, threading, time
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+
+connections = []
+event.listen(Pool, "connect", lambda *args: connections.append(1))
+
+from app import create_app
+imported = time.perf_counter()
+create_app()
+created = time.perf_counter()
+
+print(json.dumps({
+    "create_app_ms": (created - imported) * 1000,
+    "connections": len(connections),
+    "threads": threading.active_count(),
+    "lazy_loaded": [name for name in %r if name in sys.modules],
+}))
+""" % (LAZY_MODULES,)
+
+
+def parse_importtime(stderr):
+    """ [(self_us, cumulative_us, depth, module)] from -X importtime output """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return rows
+
+
+def boot(env):
+    """ One fresh-interpreter boot; returns its measurements """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", BOOT],
+        cwd=BACKEND, env=env, capture_output=True, text=True, check=True,
+    )
+    rows = parse_importtime(result.stderr)
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    probe["import_ms"] = sum(cumulative for _, cumulative, depth, _ in rows if depth == 0) / 1000
+    probe["imports"] = rows
+    return probe
+
+
+def heaviest(rows, limit=12, max_depth=2):
+    """ The costliest imports near the top of the tree (cumulative ms) """
+    candidates = [(cumulative / 1000, depth, name) for _, cumulative, depth, name in rows if depth <= max_depth]
+    return sorted(candidates, reverse=True)[:limit]
+
+
+def compare(baseline, current):
+    """ Human-readable regressions of `current` against `baseline` """
+    regressions = []
+    for metric in ("import_ms", "create_app_ms"):
+        before, now = baseline[metric], current[metric]
+        if now > max(before * TIME_RATIO, before + TIME_FLOOR_MS):
+            regressions.append(f"{metric}: {before:.1f} → {now:.1f} ms")
+    return regressions
+
+
+def preload_problems(boots):
+    """ Fork-safety problems seen in any boot """
+    problems = set()
+    for probe in boots:
+        if probe["connections"]:
+            problems.add(f"create_app() opened {probe['connections']} database connection(s)")
+        if probe["threads"] > 1:
+            problems.add(f"{probe['threads'] - 1} thread(s) running after create_app()")
+        for name in probe["lazy_loaded"]:
+            problems.add(f"{name} imported during startup")
+    return sorted(problems)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7, help="Timed boots (after one warm-up boot).")
+    parser.add_argument("--save", metavar="PATH", help="Write the results as a new baseline.")
+    parser.add_argument("--compare", metavar="PATH", help="Exit 1 if slower than this baseline.")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="pmd-startup-")
+    env = {
+        **os.environ,
+        "FLASK_ENV": "production",
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'startup.db')}",
+        "PYTHONWARNINGS": "ignore",
+    }
+
+    boot(env)  # warm-up: writes .pyc files
+    boots = [boot(env) for _ in range(args.runs)]
+    results = {
+        "import_ms": round(statistics.median(probe["import_ms"] for probe in boots), 1),
+        "create_app_ms": round(statistics.median(probe["create_app_ms"] for probe in boots), 1),
+    }
+
+    print(f"startup over {args.runs} boots (median): imports {results['import_ms']:.1f} ms, "
+          f"create_app() {results['create_app_ms']:.1f} ms")
+    print(f"\n{'cumulative ms':>13}  module")
+    for cumulative, depth, name in heaviest(boots[len(boots) // 2]["imports"]):
+        print(f"{cumulative:>13.1f}  {'  ' * depth}{name}")
+
+    failures = [f"PRELOAD {problem}" for problem in preload_problems(boots)]
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "recorded_at": datetime.utcnow().replace(microsecond=0).isoformat() + "Z",
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "runs": args.runs,
+                "results": results,
+            }, f, indent=2)
+            f.write("\n")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        failures += [f"REGRESSION {regression}" for regression in compare(baseline, results)]
+
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
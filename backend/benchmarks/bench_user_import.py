@@ -0,0 +1,101 @@
+""" User import/export benchmark: POST /api/users/import and GET /api/users/export at volume
+
+Writes an NDJSON file of --users new users to disk and streams it to the
+import route, then exports every user back. The import runs twice on fresh
+databases: once timed, once under tracemalloc for its peak memory, which
+should stay flat as --users grows (records are read and inserted a chunk at a
+time). Rows carry a password_hash, like a ?include=password_hash export;
+--plain adds that many rows with plain-text passwords, which are hashed
+across the PASSWORD_HASH_WORKERS pool.
+
+    python benchmarks/bench_user_import.py
+    python benchmarks/bench_user_import.py --users 200000 --plain 200
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+WORKDIR = tempfile.mkdtemp(prefix="pmd-bench-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(WORKDIR, 'bench.db')}",
+    "RESPONSE_CACHE_MAX_ENTRIES": "0",
+})
+sys.path.insert(0, BACKEND)
+
+from werkzeug.security import generate_password_hash  # noqa: E402
+from werkzeug.test import Client  # noqa: E402
+from app import create_app, db  # noqa: E402
+from app.authz import access_token  # noqa: E402
+from app.models import User  # noqa: E402
+
+
+def write_upload(path, users, plain):
+    password_hash = generate_password_hash("imported")
+    with open(path, "w") as f:
+        for i in range(users + plain):
+            record = {"username": f"import.{i}", "email": f"import.{i}@example.invalid"}
+            if i < users:
+                record["password_hash"] = password_hash
+            else:
+                record["password"] = f"imported-{i}"
+            f.write(json.dumps(record) + "\n")
+
+
+def fresh_admin():
+    db.drop_all()
+    db.create_all()
+    admin = User(username="admin", email="admin@example.invalid", password="x", role="admin")
+    db.session.add(admin)
+    db.session.commit()
+    return {"Authorization": "Bearer " + access_token(admin)}
+
+
+def import_file(client, headers, path):
+    with open(path, "rb") as f:
+        started = time.perf_counter()
+        response = client.post("/api/users/import", input_stream=f, content_length=os.path.getsize(path),
+                               content_type="application/x-ndjson", headers=headers)
+        elapsed = time.perf_counter() - started
+    if response.status_code != 201:
+        raise RuntimeError(f"import returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    return elapsed, response.get_json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50000, help="Rows with a password_hash.")
+    parser.add_argument("--plain", type=int, default=0, help="Extra rows with a plain-text password.")
+    args = parser.parse_args()
+
+    path = os.path.join(WORKDIR, "users.ndjson")
+    write_upload(path, args.users, args.plain)
+    size_mb = os.path.getsize(path) / 1e6
+
+    app = create_app()
+    client = Client(app)
+    with app.app_context():
+        headers = fresh_admin()
+        elapsed, result = import_file(client, headers, path)
+        print(f"import: {result['created']} users ({size_mb:.1f} MB) in {elapsed:.2f}s "
+              f"({result['created'] / elapsed:,.0f} users/s)")
+
+        started = time.perf_counter()
+        response = client.get("/api/users/export", headers=headers)
+        exported = sum(part.count(b"\n") for part in response.iter_encoded())
+        print(f"export: {exported} users in {time.perf_counter() - started:.2f}s")
+
+        headers = fresh_admin()
+        tracemalloc.start()
+        import_file(client, headers, path)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"import peak memory (tracemalloc): {peak / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
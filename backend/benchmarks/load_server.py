@@ -0,0 +1,158 @@
+""" Load test: gunicorn defaults vs. the shipped gunicorn.conf.py
+
+Seeds a database, starts gunicorn once per profile, drives a mix of read
+endpoints from concurrent keep-alive clients and prints requests/sec with
+p50/p95 latency for each profile.
+
+    python benchmarks/load_server.py                      # SQLite file stand-in
+    DATABASE_URL=postgresql://localhost/pmd_load python benchmarks/load_server.py --concurrency 32
+"""
+import argparse
+import http.client
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# (name, extra gunicorn arguments, environment overrides)
+PROFILES = {
+    "defaults": ([], {}),
+    "tuned": (["-c", "gunicorn.conf.py"], {}),
+}
+
+
+def seed(database_url, users, projects, tickets):
+    """ Create the schema and some rows; returns a token for an admin and the project ids """
+    os.environ["DATABASE_URL"] = database_url
+    sys.path.insert(0, BACKEND)
+    from app import create_app, db
+    from app.authz import access_token
+    from app.models import User, Project, Ticket, ProjectStats, project_assignments
+    from app.stats import rebuild_project_stats
+
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.add_all([
+            User(username=f"load{i}", email=f"load{i}@example.invalid", password="x", role="admin" if i == 0 else "user")
+            for i in range(users)
+        ])
+        db.session.add_all([
+            Project(title=f"Project {i}", description="load test", start_date=date.today(), end_date=date.today(), owner_id=1)
+            for i in range(projects)
+        ])
+        db.session.flush()
+        db.session.execute(project_assignments.insert(), [
+            {"user_id": user_id, "project_id": project_id}
+            for project_id in range(1, projects + 1) for user_id in range(1, min(users, 5) + 1)
+        ])
+        db.session.add_all([ProjectStats(project_id=project_id) for project_id in range(1, projects + 1)])
+        db.session.execute(Ticket.__table__.insert(), [
+            {
+                "title": f"Ticket {i}", "description": "load test", "project_id": i % projects + 1,
+                "assigned_user_id": i % users + 1, "created_by_id": 1,
+                "status": ("To Do", "In Progress", "Done")[i % 3], "priority": ("Low", "Medium", "High")[i % 3],
+            }
+            for i in range(tickets)
+        ])
+        rebuild_project_stats()
+        db.session.commit()
+        return access_token(db.session.get(User, 2)), list(range(1, projects + 1))
+
+
+def wait_for(port, deadline=30):
+    stop = time.monotonic() + deadline
+    while time.monotonic() < stop:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/api/users/me")
+            connection.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("gunicorn did not start")
+
+
+def drive(port, token, project_ids, concurrency, seconds):
+    paths = ["/api/projects", "/api/users/me"]
+    for project_id in project_ids[:5]:
+        paths += [f"/api/projects/{project_id}/tickets", f"/api/projects/{project_id}/stats"]
+
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def client(offset):
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        local, failed, index = [], 0, offset
+        while time.monotonic() < deadline:
+            path = paths[index % len(paths)]
+            index += 1
+            started = time.perf_counter()
+            try:
+                connection.request("GET", path, headers={"Authorization": f"Bearer {token}"})
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                continue
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--tickets", type=int, default=2000)
+    parser.add_argument("--profile", action="append", choices=sorted(PROFILES), help="default: all")
+    args = parser.parse_args()
+
+    database_url = os.getenv("DATABASE_URL") or f"sqlite:///{tempfile.mkdtemp()}/load.db"
+    token, project_ids = seed(database_url, args.users, args.projects, args.tickets)
+
+    print(f"{'profile':<10} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+    for name in args.profile or list(PROFILES):
+        extra, overrides = PROFILES[name]
+        env = dict(os.environ, DATABASE_URL=database_url, PORT=str(args.port), GUNICORN_ACCESS_LOG="", **overrides)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", *extra, "-b", f"127.0.0.1:{args.port}", "run:app"],
+            cwd=BACKEND, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_for(args.port)
+            latencies, errors = drive(args.port, token, project_ids, args.concurrency, args.seconds)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=60)
+
+        quantiles = statistics.quantiles(latencies, n=20) if len(latencies) > 1 else [0] * 19
+        print(f"{name:<10} {len(latencies) / args.seconds:>8.1f} {quantiles[9] * 1000:>8.1f} "
+              f"{quantiles[18] * 1000:>8.1f} {errors:>7}")
+
+
+if __name__ == "__main__":
+    main()
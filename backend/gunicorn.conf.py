@@ -0,0 +1,65 @@
+# ==============================================================
+# ✅ gunicorn settings (gunicorn -c backend/gunicorn.conf.py backend.run:app)
+# ==============================================================
+#
+# Every value can be overridden from the environment, so one file serves
+# local load tests and production. Worker and thread counts come from
+# app/db_profile.py, which sizes each worker's DB pool from the same numbers.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from app.db_profile import threads_per_worker, worker_count  # noqa: E402
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# ✅ Threaded workers: requests mostly wait on the database, and SSE streams
+# (/projects/<id>/events) hold a thread rather than a whole process. A worker
+# serves at most EVENT_MAX_STREAMS streams (default threads - 1) and answers
+# 503 beyond that; for many concurrent subscribers use an async worker class
+# (GUNICORN_WORKER_CLASS=gevent, with gevent installed) and raise EVENT_MAX_STREAMS.
+workers = worker_count()
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = threads_per_worker()
+
+# ✅ The in-process event broker and cache backend only see changes made in their own worker
+if workers > 1 and os.getenv("EVENT_BROKER") == "memory":
+    raise RuntimeError("EVENT_BROKER=memory only works with one worker (WEB_CONCURRENCY=1); use \"database\"")
+if workers > 1 and os.getenv("RESPONSE_CACHE_BACKEND") == "memory" and os.getenv("RESPONSE_CACHE_MAX_ENTRIES") != "0":
+    raise RuntimeError("RESPONSE_CACHE_BACKEND=memory only works with one worker (WEB_CONCURRENCY=1); use \"database\"")
+
+# ✅ Graceful timeouts: a stuck worker is replaced after `timeout`; on deploy
+# or HUP in-flight requests get `graceful_timeout` to finish
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+
+# ✅ Recycle workers now and then to bound memory growth; jitter avoids all restarting at once
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 200))
+
+# ✅ Import the app once in the master and fork it (faster boot, shared memory pages)
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-") or None
+# ✅ gunicorn's default format with the path only (%(U)s) instead of the request
+# line: EventSource passes its token as ?jwt=, which must not reach the logs
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(m)s %(U)s %(H)s" %(s)s %(b)s "%(f)s" "%(a)s"'
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    """ Drop DB connections inherited from the master; each worker opens its own
+
+    With preload_app the master may have connected (e.g. a query during
+    create_app). dispose(close=False) forgets those sockets without closing
+    them, so the parent's connections are not torn down from the child.
+    Thread/process pools (avatar uploads, password hashing) are created on
+    first use and reset themselves after a fork (os.register_at_fork).
+    """
+    app = worker.app.wsgi()
+    db = app.extensions["sqlalchemy"]
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -0,0 +1,36 @@
+"""Add avatar_blob and content hashes on avatar_job
+
+Revision ID: 0b8d6f2e4c13
+Revises: e91f3c5a8b07
+Create Date: 2026-10-18 17:55:31.270448
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b8d6f2e4c13'
+down_revision = 'e91f3c5a8b07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('avatar_blob',
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('url', sa.String(length=300), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('content_hash')
+    )
+    with op.batch_alter_table('avatar_job', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('thumbnail_url', sa.String(length=300), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('avatar_job', schema=None) as batch_op:
+        batch_op.drop_column('thumbnail_url')
+        batch_op.drop_column('content_hash')
+
+    op.drop_table('avatar_blob')
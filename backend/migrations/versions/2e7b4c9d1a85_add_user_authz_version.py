@@ -0,0 +1,26 @@
+"""Add user.authz_version (invalidates access tokens on role/assignment changes)
+
+Revision ID: 2e7b4c9d1a85
+Revises: 9c5e1d7a3f20
+Create Date: 2026-10-18 22:41:12.604377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2e7b4c9d1a85'
+down_revision = '9c5e1d7a3f20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('authz_version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('authz_version')
@@ -0,0 +1,37 @@
+"""Add project_event (SSE events shared across gunicorn workers)
+
+Revision ID: 4b8e2d6f0c31
+Revises: 2e7b4c9d1a85
+Create Date: 2026-10-19 10:12:37.501284
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b8e2d6f0c31'
+down_revision = '2e7b4c9d1a85'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('project_event',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['project.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('project_event', schema=None) as batch_op:
+        batch_op.create_index('ix_project_event_project_id_version', ['project_id', 'version'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('project_event', schema=None) as batch_op:
+        batch_op.drop_index('ix_project_event_project_id_version')
+
+    op.drop_table('project_event')
@@ -0,0 +1,53 @@
+"""Add project_stats table
+
+Revision ID: 5d2e8b1f9a44
+Revises: a81d5e0c6f27
+Create Date: 2026-10-18 13:27:09.381552
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2e8b1f9a44'
+down_revision = 'a81d5e0c6f27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('project_stats',
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('total_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('todo_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('in_progress_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('done_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('low_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('medium_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('high_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('last_activity_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['project.id'], ),
+    sa.PrimaryKeyConstraint('project_id')
+    )
+
+    # Backfill from existing tickets (same result as `flask rebuild-stats`)
+    op.execute("""
+        INSERT INTO project_stats (project_id, total_count, todo_count, in_progress_count, done_count,
+                                   low_count, medium_count, high_count, last_activity_at)
+        SELECT project.id,
+               COUNT(ticket.id),
+               SUM(CASE WHEN ticket.status = 'To Do' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN ticket.status = 'In Progress' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN ticket.status = 'Done' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN ticket.priority = 'Low' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN ticket.priority = 'Medium' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN ticket.priority = 'High' THEN 1 ELSE 0 END),
+               MAX(ticket.updated_at)
+        FROM project LEFT OUTER JOIN ticket ON ticket.project_id = project.id
+        GROUP BY project.id
+    """)
+
+
+def downgrade():
+    op.drop_table('project_stats')
@@ -0,0 +1,43 @@
+"""Make ticket_history ids AUTOINCREMENT on SQLite (archived ids are never reissued)
+
+Revision ID: 5f0a3c8e7d12
+Revises: 8d1f4a7c2e96
+Create Date: 2026-10-19 14:26:37.918204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f0a3c8e7d12'
+down_revision = '8d1f4a7c2e96'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # PostgreSQL sequences never hand out an id twice; only SQLite needs the rebuild
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    with op.batch_alter_table('ticket_history', schema=None, recreate='always',
+                              table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+        pass
+
+    # Start past every id already used, including those only left in the archive
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'ticket_history'")
+    op.execute(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'ticket_history', max("
+        "(SELECT coalesce(max(id), 0) FROM ticket_history), "
+        "(SELECT coalesce(max(id), 0) FROM ticket_history_archive))"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    with op.batch_alter_table('ticket_history', schema=None, recreate='always',
+                              table_kwargs={'sqlite_autoincrement': False}) as batch_op:
+        pass
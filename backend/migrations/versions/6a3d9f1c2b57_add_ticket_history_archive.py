@@ -0,0 +1,50 @@
+"""Add ticket_history_archive (cold tier of ticket history) and keyset indexes
+
+Revision ID: 6a3d9f1c2b57
+Revises: 0b8d6f2e4c13
+Create Date: 2026-10-18 21:14:08.502913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6a3d9f1c2b57'
+down_revision = '0b8d6f2e4c13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('ticket_history_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('ticket_id', sa.Integer(), nullable=False),
+    sa.Column('changed_by_id', sa.Integer(), nullable=False),
+    sa.Column('change_type', sa.String(length=255), nullable=False),
+    sa.Column('old_value', sa.String(length=255), nullable=True),
+    sa.Column('new_value', sa.String(length=255), nullable=True),
+    sa.Column('changed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['changed_by_id'], ['user.id'], ),
+    sa.ForeignKeyConstraint(['ticket_id'], ['ticket.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('ticket_history_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_ticket_history_archive_ticket_id_changed_at_id', ['ticket_id', 'changed_at', 'id'], unique=False)
+
+    with op.batch_alter_table('ticket_history', schema=None) as batch_op:
+        batch_op.drop_index('ix_ticket_history_ticket_id_changed_at')
+        batch_op.create_index('ix_ticket_history_ticket_id_changed_at_id', ['ticket_id', 'changed_at', 'id'], unique=False)
+        batch_op.create_index('ix_ticket_history_changed_at_id', ['changed_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('ticket_history', schema=None) as batch_op:
+        batch_op.drop_index('ix_ticket_history_changed_at_id')
+        batch_op.drop_index('ix_ticket_history_ticket_id_changed_at_id')
+        batch_op.create_index('ix_ticket_history_ticket_id_changed_at', ['ticket_id', 'changed_at'], unique=False)
+
+    with op.batch_alter_table('ticket_history_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_ticket_history_archive_ticket_id_changed_at_id')
+
+    op.drop_table('ticket_history_archive')
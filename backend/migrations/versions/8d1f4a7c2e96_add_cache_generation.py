@@ -0,0 +1,28 @@
+"""Add cache_generation (response cache invalidation across gunicorn workers)
+
+Revision ID: 8d1f4a7c2e96
+Revises: 4b8e2d6f0c31
+Create Date: 2026-10-19 11:03:52.174630
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d1f4a7c2e96'
+down_revision = '4b8e2d6f0c31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cache_generation',
+    sa.Column('tag', sa.String(length=100), nullable=False),
+    sa.Column('generation', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('tag')
+    )
+
+
+def downgrade():
+    op.drop_table('cache_generation')
@@ -0,0 +1,52 @@
+"""Add full-text search index on ticket and project (FTS5 on SQLite, GIN tsvector on PostgreSQL)
+
+Revision ID: 9c5e1d7a3f20
+Revises: 6a3d9f1c2b57
+Create Date: 2026-10-18 22:03:41.118274
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c5e1d7a3f20'
+down_revision = '6a3d9f1c2b57'
+branch_labels = None
+depends_on = None
+
+TABLES = ('ticket', 'project')
+
+POSTGRES_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    for table in TABLES:
+        if dialect == 'sqlite':
+            # External-content FTS5 table kept in step by triggers, then filled from existing rows
+            fts = f'{table}_fts'
+            delete_old = f"INSERT INTO {fts}({fts}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);"
+            insert_new = f"INSERT INTO {fts}(rowid, title, description) VALUES (new.id, new.title, new.description);"
+            op.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5(title, description, content='{table}', content_rowid='id', "
+                       f"tokenize='unicode61 remove_diacritics 2')")
+            op.execute(f"CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} BEGIN {insert_new} END")
+            op.execute(f"CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN {delete_old} END")
+            op.execute(f"CREATE TRIGGER {fts}_update AFTER UPDATE OF title, description ON {table} BEGIN {delete_old} {insert_new} END")
+            op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+        elif dialect == 'postgresql':
+            op.execute(f"CREATE INDEX ix_{table}_search ON {table} USING gin (({POSTGRES_DOCUMENT}))")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    for table in TABLES:
+        if dialect == 'sqlite':
+            for trigger in ('insert', 'delete', 'update'):
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{trigger}")
+            op.execute(f"DROP TABLE IF EXISTS {table}_fts")
+        elif dialect == 'postgresql':
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_search")
@@ -0,0 +1,43 @@
+"""Add indexes for hot lookups
+
+Revision ID: a81d5e0c6f27
+Revises: 3f9c2a7d41b8
+Create Date: 2026-10-18 11:03:52.640915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a81d5e0c6f27'
+down_revision = '3f9c2a7d41b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # user.email is already covered by the index behind its unique constraint
+    with op.batch_alter_table('project_assignments', schema=None) as batch_op:
+        batch_op.create_index('ix_project_assignments_project_id_user_id', ['project_id', 'user_id'], unique=False)
+
+    with op.batch_alter_table('ticket', schema=None) as batch_op:
+        batch_op.create_index('ix_ticket_project_id_updated_at_id', ['project_id', 'updated_at', 'id'], unique=False)
+        batch_op.create_index('ix_ticket_assigned_user_id_updated_at_id', ['assigned_user_id', 'updated_at', 'id'], unique=False)
+        batch_op.create_index('ix_ticket_created_by_id', ['created_by_id'], unique=False)
+
+    with op.batch_alter_table('ticket_history', schema=None) as batch_op:
+        batch_op.create_index('ix_ticket_history_ticket_id_changed_at', ['ticket_id', 'changed_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('ticket_history', schema=None) as batch_op:
+        batch_op.drop_index('ix_ticket_history_ticket_id_changed_at')
+
+    with op.batch_alter_table('ticket', schema=None) as batch_op:
+        batch_op.drop_index('ix_ticket_created_by_id')
+        batch_op.drop_index('ix_ticket_assigned_user_id_updated_at_id')
+        batch_op.drop_index('ix_ticket_project_id_updated_at_id')
+
+    with op.batch_alter_table('project_assignments', schema=None) as batch_op:
+        batch_op.drop_index('ix_project_assignments_project_id_user_id')
@@ -0,0 +1,48 @@
+"""Add ticket.version and ticket_tombstone for delta sync
+
+Revision ID: c4e7a19b2d60
+Revises: 5d2e8b1f9a44
+Create Date: 2026-10-18 15:02:44.118305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e7a19b2d60'
+down_revision = '5d2e8b1f9a44'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('ticket', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+        batch_op.create_index('ix_ticket_project_id_version', ['project_id', 'version'], unique=False)
+
+    # Existing tickets count as changed at their project's current version, so any
+    # client syncing from an older version receives them
+    op.execute("UPDATE ticket SET version = (SELECT project.version FROM project WHERE project.id = ticket.project_id)")
+
+    op.create_table('ticket_tombstone',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('ticket_id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['project.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('ticket_tombstone', schema=None) as batch_op:
+        batch_op.create_index('ix_ticket_tombstone_project_id_version', ['project_id', 'version'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('ticket_tombstone', schema=None) as batch_op:
+        batch_op.drop_index('ix_ticket_tombstone_project_id_version')
+
+    op.drop_table('ticket_tombstone')
+    with op.batch_alter_table('ticket', schema=None) as batch_op:
+        batch_op.drop_index('ix_ticket_project_id_version')
+        batch_op.drop_column('version')
@@ -0,0 +1,42 @@
+"""Add avatar_job table for background avatar uploads
+
+Revision ID: e91f3c5a8b07
+Revises: c4e7a19b2d60
+Create Date: 2026-10-18 16:40:12.503917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e91f3c5a8b07'
+down_revision = 'c4e7a19b2d60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('avatar_job',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('requested_by_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('spool_path', sa.String(length=500), nullable=True),
+    sa.Column('avatar_url', sa.String(length=300), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('avatar_job', schema=None) as batch_op:
+        batch_op.create_index('ix_avatar_job_status', ['status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('avatar_job', schema=None) as batch_op:
+        batch_op.drop_index('ix_avatar_job_status')
+
+    op.drop_table('avatar_job')
@@ -0,0 +1,86 @@
+import itertools
+import os
+import sys
+import tempfile
+import pytest
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+WORKDIR = tempfile.mkdtemp(prefix="pmd-tests-")
+_names = itertools.count(1)
+
+# Config is read from the environment at import time
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(WORKDIR, 'test.db')}",
+    "RESPONSE_CACHE_MAX_ENTRIES": "0",
+    "PASSWORD_HASH_WORKERS": "0",
+    "AVATAR_STORAGE": "local",
+    "AVATAR_LOCAL_DIR": os.path.join(WORKDIR, "avatars"),
+})
+sys.path.insert(0, BACKEND)
+
+from werkzeug.test import Client  # noqa: E402
+from app import create_app, db  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    return Client(app)
+
+
+@pytest.fixture(autouse=True)
+def _clean_session(app):
+    """ Start every test from a fresh session, whatever the previous one left behind """
+    yield
+    db.session.rollback()
+    db.session.expire_all()
+
+
+@pytest.fixture
+def make_user(app):
+    """ Create (and commit) a user; returns the User """
+    from app.models import User
+
+    def make(role="user", **fields):
+        name = f"test.{next(_names)}"
+        user = User(username=name, email=f"{name}@example.invalid", password="x", role=role, **fields)
+        db.session.add(user)
+        db.session.commit()
+        return user
+
+    return make
+
+
+@pytest.fixture
+def make_project(app, make_user):
+    """ Create (and commit) a project owned by a fresh admin, with `members` assigned """
+    from datetime import date
+    from app.models import Project, ProjectStats, project_assignments
+
+    def make(*members, title="test project", **fields):
+        project = Project(title=title, start_date=date(2025, 1, 1), end_date=date(2025, 6, 30),
+                          owner_id=make_user("admin").id, **fields)
+        db.session.add(project)
+        db.session.flush()
+        db.session.add(ProjectStats(project_id=project.id))
+        for member in members:
+            db.session.execute(project_assignments.insert().values(user_id=member.id, project_id=project.id))
+        db.session.commit()
+        return project
+
+    return make
+
+
+@pytest.fixture
+def auth(app):
+    """ auth(user) → Authorization header carrying a fresh access token """
+    from app.authz import access_token
+
+    return lambda user: {"Authorization": "Bearer " + access_token(user)}
@@ -0,0 +1,44 @@
+""" Token claims: gaining access keeps a token working, losing it revokes the token """
+
+
+def test_assignment_after_login_keeps_token_and_grants_access(client, make_user, make_project, auth):
+    admin, member = make_user("admin"), make_user()
+    project = make_project()
+    headers = auth(member)  # claims list no projects yet
+
+    assert client.get(f"/api/projects/{project.id}", headers=headers).status_code == 403
+    assigned = client.post(f"/api/projects/{project.id}/assign", json={"user_id": member.id}, headers=auth(admin))
+    assert assigned.status_code == 200
+
+    response = client.get(f"/api/projects/{project.id}", headers=headers)
+    assert response.status_code == 200, response.get_json()
+    assert client.get("/api/users/me", headers=headers).status_code == 200
+
+
+def test_unassigned_project_stays_forbidden(client, make_user, make_project, auth):
+    member = make_user()
+    make_project(member)
+    other = make_project()
+    assert client.get(f"/api/projects/{other.id}", headers=auth(member)).status_code == 403
+
+
+def test_demoted_admin_token_is_revoked(client, make_user, auth):
+    admin, demoted = make_user("admin"), make_user("admin")
+    stale = auth(demoted)
+
+    response = client.put(f"/api/users/{demoted.id}", json={"role": "user"}, headers=auth(admin))
+    assert response.status_code == 200
+
+    response = client.get("/api/users", headers=stale)
+    assert response.status_code == 401
+    assert response.get_json()["msg"] == "Token has been revoked"
+    assert client.get("/api/users/me", headers=auth(demoted)).status_code == 200
+
+
+def test_promotion_keeps_token_valid(client, make_user, make_project, auth):
+    admin, promoted = make_user("admin"), make_user()
+    project = make_project()
+    headers = auth(promoted)
+
+    assert client.put(f"/api/users/{promoted.id}", json={"role": "admin"}, headers=auth(admin)).status_code == 200
+    assert client.get(f"/api/projects/{project.id}", headers=headers).status_code == 200
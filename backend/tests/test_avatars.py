@@ -0,0 +1,127 @@
+""" Avatar uploads: queued (202), processed in the background, then applied to the user """
+import io
+import itertools
+import os
+import time
+from urllib.parse import urlsplit
+import pytest
+from PIL import Image
+from app.avatars import avatar_queue
+
+_colors = itertools.count(1)
+
+
+def image():
+    """ A PNG with bytes no other test uploads """
+    n = next(_colors)
+    out = io.BytesIO()
+    Image.new("RGB", (8, 8), (n % 256, n // 256 % 256, 7)).save(out, "PNG")
+    return out.getvalue()
+
+
+def upload(client, headers, data, path="/api/users/me/avatar"):
+    return client.post(path, headers=headers, data={"avatar": (io.BytesIO(data), "avatar.png")})
+
+
+def wait_for(client, headers, response, timeout=10):
+    """ Poll the job's status URL until it is done or failed """
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(response.get_json()["status_url"], headers=headers).get_json()
+        if job["status"] in ("done", "failed") or time.monotonic() > deadline:
+            return job
+        time.sleep(0.05)
+
+
+@pytest.fixture
+def stored(monkeypatch):
+    """ Names passed to the storage backend """
+    calls = []
+    store = avatar_queue.storage.store
+
+    def counting(path, name):
+        calls.append(name)
+        return store(path, name)
+
+    monkeypatch.setattr(avatar_queue.storage, "store", counting)
+    return calls
+
+
+def test_upload_is_processed_in_the_background(client, make_user, auth, stored):
+    user = make_user()
+    headers = auth(user)
+
+    response = upload(client, headers, image())
+    assert response.status_code == 202
+    assert response.headers["Location"] == response.get_json()["status_url"]
+
+    job = wait_for(client, headers, response)
+    assert (job["status"], job["attempts"], job["error"]) == ("done", 1, None)
+    assert len(stored) == 1
+    assert client.get("/api/users/me", headers=headers).get_json()["avatar"] == job["avatar_url"]
+
+    thumbnail = client.get(urlsplit(job["avatar_url"]).path)
+    assert thumbnail.status_code == 200
+    assert thumbnail.mimetype == "image/jpeg"
+
+
+def test_failed_uploads_are_retried_then_reported(client, make_user, auth, app, monkeypatch):
+    monkeypatch.setitem(app.config, "AVATAR_RETRY_BACKOFF", 0)
+
+    def unavailable(path, name):
+        raise OSError("storage unavailable")
+
+    monkeypatch.setattr(avatar_queue.storage, "store", unavailable)
+    user = make_user()
+    headers = auth(user)
+
+    job = wait_for(client, headers, upload(client, headers, image()))
+    assert (job["status"], job["attempts"], job["error"]) == ("failed", 3, "storage unavailable")
+    assert job["avatar_url"] is None
+    assert not client.get("/api/users/me", headers=headers).get_json()["avatar"]
+
+
+def test_jobs_are_private(client, make_user, auth):
+    owner, other = make_user(), make_user()
+    response = upload(client, auth(owner), image())
+    wait_for(client, auth(owner), response)
+    assert client.get(response.get_json()["status_url"], headers=auth(other)).status_code == 404
+
+
+def test_invalid_uploads_are_rejected(client, make_user, auth):
+    headers = auth(make_user())
+    assert client.post("/api/users/me/avatar", headers=headers, data={}).status_code == 400
+    response = client.post("/api/users/me/avatar", headers=headers,
+                           data={"avatar": (io.BytesIO(b"x"), "avatar.exe")})
+    assert response.status_code == 400
+
+
+def test_repeat_upload_is_deduplicated(client, make_user, auth, stored):
+    first, second = make_user(), make_user()
+    data = image()
+
+    job = wait_for(client, auth(first), upload(client, auth(first), data))
+    assert job["status"] == "done" and len(stored) == 1
+
+    response = upload(client, auth(second), data)
+    assert response.status_code == 202
+    repeat = client.get(response.get_json()["status_url"], headers=auth(second)).get_json()
+    assert (repeat["status"], repeat["attempts"]) == ("done", 0)  # finished in the request, nothing stored
+    assert repeat["avatar_url"] == job["avatar_url"]
+    assert len(stored) == 1
+
+
+def test_evicted_thumbnail_is_rebuilt_on_repeat_upload(client, make_user, auth, stored):
+    user = make_user()
+    headers = auth(user)
+    data = image()
+    job = wait_for(client, headers, upload(client, headers, data))
+    path = urlsplit(job["avatar_url"]).path
+
+    content_hash = path.rsplit("/", 1)[-1].removesuffix(".jpg")
+    os.remove(avatar_queue.thumbnails.path(content_hash))
+    assert client.get(path).status_code == 302  # falls back to the stored image
+
+    upload(client, headers, data)
+    assert client.get(path).status_code == 200
+    assert len(stored) == 1
@@ -0,0 +1,66 @@
+""" POST/PATCH /api/tickets/bulk: per-item validation happens before anything is written """
+import pytest
+from app import db
+from app.models import Project, Ticket
+
+
+@pytest.fixture
+def board(make_user, make_project, auth):
+    member = make_user()
+    project = make_project(member)
+    return member, project, auth(member)
+
+
+@pytest.mark.parametrize("bad, error", [
+    ({"title": None}, "Title must be a non-empty string"),
+    ({"title": 42}, "Title must be a non-empty string"),
+    ({"title": "x" * 256}, "Title is longer than 255 characters"),
+    ({"description": ["x"]}, "Description must be a string"),
+    ({"status": "Blocked"}, "Status must be one of To Do, In Progress, Done"),
+    ({"priority": None}, "Priority must be one of Low, Medium, High"),
+    ({"assigned_user_id": "7"}, "Assigned user not found"),
+])
+def test_create_rejects_bad_values_without_writing(client, board, bad, error):
+    member, project, headers = board
+    items = [
+        {"title": "fine", "description": "d", "project_id": project.id},
+        {"title": "bad", "description": "d", "project_id": project.id, **bad},
+    ]
+    response = client.post("/api/tickets/bulk", json={"tickets": items}, headers=headers)
+
+    assert response.status_code == 400
+    assert response.get_json()["results"] == [{"index": 0, "ok": True}, {"index": 1, "ok": False, "error": error}]
+    assert db.session.scalar(db.select(db.func.count()).where(Ticket.project_id == project.id)) == 0
+    assert db.session.scalar(db.select(Project.version).where(Project.id == project.id)) == 0
+
+
+def test_update_rejects_bad_values_without_writing(client, board):
+    member, project, headers = board
+    created = client.post("/api/tickets/bulk", headers=headers, json={"tickets": [
+        {"title": "one", "description": "d", "project_id": project.id},
+        {"title": "two", "description": "d", "project_id": project.id},
+    ]})
+    ids = [result["id"] for result in created.get_json()["results"]]
+    version = db.session.scalar(db.select(Project.version).where(Project.id == project.id))
+
+    response = client.patch("/api/tickets/bulk", headers=headers, json={"tickets": [
+        {"id": ids[0], "status": "Done"},
+        {"id": ids[1], "title": None},
+    ]})
+
+    assert response.status_code == 400
+    assert response.get_json()["results"][1] == {"index": 1, "ok": False, "error": "Title must be a non-empty string"}
+    assert db.session.scalar(db.select(Ticket.status).where(Ticket.id == ids[0])) == "To Do"
+    assert db.session.scalar(db.select(Project.version).where(Project.id == project.id)) == version
+
+
+def test_valid_items_are_written(client, board):
+    member, project, headers = board
+    response = client.post("/api/tickets/bulk", headers=headers, json={"tickets": [
+        {"title": "one", "description": None, "project_id": project.id, "status": "Done", "priority": "High",
+         "assigned_user_id": member.id},
+    ]})
+
+    assert response.status_code == 201
+    ticket = db.session.get(Ticket, response.get_json()["results"][0]["id"])
+    assert (ticket.status, ticket.priority, ticket.assigned_user_id) == ("Done", "High", member.id)
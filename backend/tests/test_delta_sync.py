@@ -0,0 +1,38 @@
+""" ?since=<version> on project tickets: changed tickets plus tombstones for deleted ones """
+
+
+def test_delta_reports_changes_and_tombstones(client, make_user, make_project, auth):
+    member = make_user()
+    project = make_project(member)
+    headers = auth(member)
+    url = f"/api/projects/{project.id}/tickets"
+
+    def create(title):
+        response = client.post("/api/tickets", json={"title": title, "description": "d", "project_id": project.id},
+                               headers=headers)
+        return response.get_json()["ticket"]["id"]
+
+    kept, deleted = create("kept"), create("deleted")
+    since = client.get(f"{url}?since=0", headers=headers).get_json()["version"]
+
+    assert client.delete(f"/api/tickets/{deleted}", headers=headers).status_code == 200
+    assert client.put(f"/api/tickets/{kept}", json={"title": "renamed"}, headers=headers).status_code == 200
+    added = create("added")
+
+    delta = client.get(f"{url}?since={since}", headers=headers).get_json()
+    assert [(ticket["id"], ticket["title"]) for ticket in delta["tickets"]] == [(kept, "renamed"), (added, "added")]
+    assert [tombstone["id"] for tombstone in delta["deleted"]] == [deleted]
+    assert delta["version"] == since + 3
+
+    empty = client.get(f"{url}?since={delta['version']}", headers=headers).get_json()
+    assert (empty["tickets"], empty["deleted"]) == ([], [])
+
+
+def test_invalid_since_is_rejected(client, make_user, make_project, auth):
+    member = make_user()
+    project = make_project(member)
+    headers = auth(member)
+    url = f"/api/projects/{project.id}/tickets"
+
+    for query in ("since=abc", "since=-1", "since=99", "since=0&status=Done"):
+        assert client.get(f"{url}?{query}", headers=headers).status_code == 400, query
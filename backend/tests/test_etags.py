@@ -0,0 +1,40 @@
+""" Conditional GETs: If-None-Match gets a 304 until the project changes """
+import pytest
+
+
+@pytest.mark.parametrize("path", ["/api/projects/{id}", "/api/projects/{id}/tickets"])
+def test_if_none_match_until_a_write(client, make_user, make_project, auth, path):
+    member = make_user()
+    project = make_project(member)
+    headers = auth(member)
+    url = path.format(id=project.id)
+
+    first = client.get(url, headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    cached = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.data == b""
+
+    created = client.post("/api/tickets", json={"title": "t", "description": "d", "project_id": project.id},
+                          headers=headers)
+    assert created.status_code == 201
+
+    fresh = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["ETag"] != etag
+    tickets = fresh.get_json()
+    tickets = tickets["tickets"] if isinstance(tickets, dict) else tickets
+    assert [ticket["title"] for ticket in tickets] == ["t"]
+
+
+def test_etag_depends_on_query_string(client, make_user, make_project, auth):
+    member = make_user()
+    project = make_project(member)
+    headers = auth(member)
+
+    etag = client.get(f"/api/projects/{project.id}", headers=headers).headers["ETag"]
+    response = client.get(f"/api/projects/{project.id}?fields=title", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert set(response.get_json()) == {"id", "title"}
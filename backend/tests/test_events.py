@@ -0,0 +1,75 @@
+""" SSE: reconnecting with Last-Event-ID replays the changes the client missed """
+import json
+import pytest
+from app.events import project_events
+
+
+def read_events(response, count):
+    """ The first `count` events of an SSE body, as (name, data) pairs """
+    events = []
+    try:
+        for chunk in response.response:
+            chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+            fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines() if not line.startswith(":"))
+            if "event" in fields:
+                events.append((fields["event"], json.loads(fields["data"])))
+            if len(events) == count:
+                break
+    finally:
+        response.close()  # frees the stream slot
+    return events
+
+
+@pytest.fixture
+def project(make_user, make_project, auth, client):
+    member = make_user()
+    project = make_project(member)
+    project.headers = auth(member)
+    for title in ("one", "two", "three"):
+        response = client.post("/api/tickets", json={"title": title, "description": "d", "project_id": project.id},
+                               headers=project.headers)
+        assert response.status_code == 201
+    return project
+
+
+def test_last_event_id_replays_missed_events(client, project):
+    url = f"/api/projects/{project.id}/events"
+    first = client.get(f"{url}?last_event_id=0", headers=project.headers)
+    replayed = read_events(first, 3)
+    assert [name for name, _ in replayed] == ["change"] * 3
+    ids = [data["id"] for _, data in replayed]
+    assert ids == sorted(ids)
+
+    resumed = client.get(url, headers={**project.headers, "Last-Event-ID": str(ids[0])})
+    assert resumed.status_code == 200
+    assert resumed.mimetype == "text/event-stream"
+    events = read_events(resumed, 2)
+    assert [data["id"] for _, data in events] == ids[1:]
+    assert [data["changes"][0]["op"] for _, data in events] == ["created", "created"]
+
+
+def test_resume_from_the_future_resets(client, project):
+    response = client.get(f"/api/projects/{project.id}/events", headers={**project.headers, "Last-Event-ID": "999"})
+    [(name, data)] = read_events(response, 1)
+    assert name == "reset"
+
+
+def test_invalid_last_event_id_is_rejected(client, project):
+    response = client.get(f"/api/projects/{project.id}/events", headers={**project.headers, "Last-Event-ID": "x"})
+    assert response.status_code == 400
+
+
+def test_streams_over_the_cap_get_503(client, project, monkeypatch):
+    monkeypatch.setattr(project_events, "max_streams", 1)
+    url = f"/api/projects/{project.id}/events"
+    held = client.get(url, headers=project.headers)
+    try:
+        refused = client.get(url, headers=project.headers)
+        assert refused.status_code == 503
+        assert "Retry-After" in refused.headers
+    finally:
+        held.close()
+
+    reopened = client.get(url, headers=project.headers)
+    assert reopened.status_code == 200  # closing the first stream gave its slot back
+    reopened.close()
@@ -0,0 +1,80 @@
+""" Ticket history across the hot table and the archive """
+from datetime import datetime, timedelta
+from app.history import archive_history
+from app.models import TicketHistory, TicketHistoryArchive
+
+STATUSES = ("In Progress", "Done", "To Do")
+
+
+def archive_all():
+    return archive_history(datetime.utcnow() + timedelta(minutes=1))
+
+
+def changes(client, headers, ticket_id, count):
+    for n in range(count):
+        response = client.put(f"/api/tickets/{ticket_id}", json={"status": STATUSES[n % 3]}, headers=headers)
+        assert response.status_code == 200
+
+
+def test_pages_span_both_tiers(client, make_user, make_project, auth):
+    member = make_user()
+    project = make_project(member)
+    headers = auth(member)
+    ticket_id = client.post("/api/tickets", headers=headers,
+                            json={"title": "t", "description": "d", "project_id": project.id}).get_json()["ticket"]["id"]
+    url = f"/api/tickets/{ticket_id}/history"
+
+    changes(client, headers, ticket_id, 3)
+    assert archive_all() >= 3
+    changes(client, headers, ticket_id, 2)
+    assert TicketHistoryArchive.query.filter_by(ticket_id=ticket_id).count() == 3
+
+    everything = client.get(url, headers=headers).get_json()
+    assert len(everything) == 5
+
+    paged, cursor = [], None
+    while True:
+        page = client.get(f"{url}?limit=2" + (f"&cursor={cursor}" if cursor else ""), headers=headers).get_json()
+        assert len(page["history"]) <= 2
+        paged += page["history"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert paged == everything
+
+
+def test_bad_cursor_is_rejected(client, make_user, make_project, auth):
+    member = make_user()
+    project = make_project(member)
+    headers = auth(member)
+    ticket_id = client.post("/api/tickets", headers=headers,
+                            json={"title": "t", "description": "d", "project_id": project.id}).get_json()["ticket"]["id"]
+
+    for query in ("cursor=not-a-cursor", "limit=0", "limit=abc"):
+        assert client.get(f"/api/tickets/{ticket_id}/history?{query}", headers=headers).status_code == 400, query
+
+
+def test_archiving_after_a_delete_never_reuses_ids(client, make_user, make_project, auth):
+    member = make_user()
+    project = make_project(member)
+    headers = auth(member)
+
+    def create():
+        response = client.post("/api/tickets", headers=headers,
+                               json={"title": "t", "description": "d", "project_id": project.id})
+        return response.get_json()["ticket"]["id"]
+
+    kept, deleted, later = create(), create(), create()
+    changes(client, headers, kept, 2)
+    changes(client, headers, deleted, 1)  # the newest hot row
+    archive_all()
+
+    assert client.delete(f"/api/tickets/{deleted}", headers=headers).status_code == 200
+    changes(client, headers, later, 1)
+    archived_ids = {row.id for row in TicketHistoryArchive.query}
+    assert TicketHistory.query.filter_by(ticket_id=later).one().id not in archived_ids
+
+    archive_all()  # would fail on a duplicate archive id
+    history = client.get(f"/api/tickets/{kept}/history", headers=headers).get_json()
+    assert [entry["new_value"] for entry in history] == ["Done", "In Progress"]
+    assert len(client.get(f"/api/tickets/{later}/history", headers=headers).get_json()) == 1
@@ -0,0 +1,37 @@
+""" The orjson provider writes the same bytes as Flask's stdlib provider """
+import pytest
+from flask.json.provider import DefaultJSONProvider
+
+pytest.importorskip("orjson")
+from app.json_provider import OrjsonProvider  # noqa: E402
+
+PAYLOAD = {
+    "title": "Café ☕ 𝄞 naïve",
+    "tags": ["日本語", "plain", ""],
+    "nested": {"ß": None, "count": 3, "done": True},
+}
+
+
+def test_dumps_matches_stdlib_for_non_ascii(app):
+    # Streamed bodies are built from compact dumps() output
+    compact = {"separators": (",", ":")}
+    assert OrjsonProvider(app).dumps(PAYLOAD, **compact) == DefaultJSONProvider(app).dumps(PAYLOAD, **compact)
+
+
+def test_response_matches_stdlib_for_non_ascii(app):
+    fast = OrjsonProvider(app).response(PAYLOAD).get_data()
+    assert fast == DefaultJSONProvider(app).response(PAYLOAD).get_data()
+    assert fast.isascii() and b'"Caf\\u00e9' in fast
+
+
+def test_utf8_when_ensure_ascii_is_off(app):
+    provider = OrjsonProvider(app)
+    provider.ensure_ascii = False
+    assert "Café" in provider.dumps(PAYLOAD)
+
+
+def test_project_title_is_escaped_in_api_responses(client, make_user, make_project, auth):
+    member = make_user()
+    project = make_project(member, title="Café ☕")
+    body = client.get(f"/api/projects/{project.id}", headers=auth(member)).get_data()
+    assert b'"Caf\\u00e9 \\u2615"' in body
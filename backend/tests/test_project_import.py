@@ -0,0 +1,74 @@
+""" Project archives: export → import round trip, and a bad line rolls the import back """
+import json
+import pytest
+from app import project_archive
+from app.models import Project, Ticket, TicketHistory
+
+
+@pytest.fixture
+def archive(client, make_user, make_project, auth):
+    """ (admin headers, NDJSON lines of an exported project with two tickets and their history) """
+    admin, member = make_user("admin"), make_user()
+    project = make_project(member, title="archived")
+    headers = auth(admin)
+    for title in ("one", "two"):
+        ticket = client.post("/api/tickets", headers=headers,
+                             json={"title": title, "description": "d", "project_id": project.id}).get_json()["ticket"]
+        assert client.put(f"/api/tickets/{ticket['id']}", json={"status": "Done"}, headers=headers).status_code == 200
+
+    response = client.get(f"/api/projects/{project.id}/export", headers=headers)
+    assert response.status_code == 200
+    return headers, response.get_data(as_text=True).splitlines()
+
+
+def post(client, headers, lines):
+    return client.post("/api/projects/import", data="\n".join(lines).encode(),
+                       headers={**headers, "Content-Type": "application/x-ndjson"})
+
+
+def counts():
+    return Project.query.count(), Ticket.query.count(), TicketHistory.query.count()
+
+
+def test_round_trip(client, archive):
+    headers, lines = archive
+    response = post(client, headers, lines)
+    assert response.status_code == 201
+    result = response.get_json()
+    assert (result["tickets"], result["history"]) == (2, 2)
+
+    imported = client.get(f"/api/projects/{result['project_id']}", headers=headers).get_json()
+    assert imported["title"] == "archived"
+    assert sorted(ticket["status"] for ticket in imported["tickets"]) == ["Done", "Done"]
+    stats = client.get(f"/api/projects/{result['project_id']}/stats", headers=headers).get_json()
+    assert stats["done"] == 2
+
+
+@pytest.mark.parametrize("bad", [
+    "{not json",
+    json.dumps({"type": "history", "ticket_id": 999999, "changed_by_id": 1, "change_type": "x"}),
+    json.dumps({"type": "ticket", "id": 999999, "title": "late", "created_by_id": 1}),
+])
+def test_bad_line_rolls_back_the_import(client, archive, monkeypatch, bad):
+    headers, lines = archive
+    monkeypatch.setattr(project_archive, "IMPORT_CHUNK_SIZE", 1)  # earlier sections are already inserted
+    before = counts()
+
+    response = post(client, headers, lines + [bad])
+    assert response.status_code == 400
+    assert [error["row"] for error in response.get_json()["errors"]] == [len(lines) + 1]
+    assert counts() == before
+
+
+def test_unknown_user_is_rejected(client, archive):
+    headers, lines = archive
+    records = [json.loads(line) for line in lines]
+    for record in records:
+        if record["type"] == "user":
+            record["email"] = record["email"].replace("@example.invalid", "@elsewhere.invalid")
+    lines = [json.dumps(record) for record in records]
+    before = counts()
+    response = post(client, headers, lines)
+    assert response.status_code == 400
+    assert "import the users first" in response.get_json()["errors"][0]["error"]
+    assert counts() == before
@@ -0,0 +1,39 @@
+""" /projects/<id>/stats follows ticket creates, updates and deletes """
+
+
+def test_stats_follow_ticket_writes(client, make_user, make_project, auth):
+    member = make_user()
+    project = make_project(member)
+    headers = auth(member)
+
+    def stats():
+        response = client.get(f"/api/projects/{project.id}/stats", headers=headers)
+        assert response.status_code == 200
+        return response.get_json()
+
+    assert stats()["total"] == 0
+
+    ids = []
+    for priority in ("High", "Low"):
+        response = client.post("/api/tickets", headers=headers, json={
+            "title": "t", "description": "d", "project_id": project.id, "priority": priority,
+        })
+        ids.append(response.get_json()["ticket"]["id"])
+    assert client.put(f"/api/tickets/{ids[0]}", json={"status": "Done"}, headers=headers).status_code == 200
+
+    result = stats()
+    assert (result["total"], result["open"], result["done"]) == (2, 1, 1)
+    assert result["by_status"] == {"To Do": 1, "In Progress": 0, "Done": 1}
+    assert result["by_priority"] == {"Low": 1, "Medium": 0, "High": 1}
+    assert result["last_activity_at"] is not None
+
+    assert client.delete(f"/api/tickets/{ids[0]}", headers=headers).status_code == 200
+    result = stats()
+    assert (result["total"], result["open"], result["done"]) == (1, 1, 0)
+    assert result["by_priority"]["High"] == 0
+
+
+def test_stats_of_an_unassigned_project_are_forbidden(client, make_user, make_project, auth):
+    member = make_user()
+    project = make_project()
+    assert client.get(f"/api/projects/{project.id}/stats", headers=auth(member)).status_code == 403
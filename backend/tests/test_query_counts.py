@@ -0,0 +1,91 @@
+""" SQL statements per request: upper bounds per route, so an N+1 query fails the build
+
+The database is seeded with several projects, tickets and history entries per
+project, so a route that queries once per row blows well past its bound.
+Each request starts with a cold authz cache, so bounds include the caller's
+authz_version lookup. Bounds are the counts measured when the suite was
+written; lower one when a route gets cheaper, never raise one without
+understanding why.
+"""
+import pytest
+from sqlalchemy import event, func, select
+from app import db
+from app.authz import access_token, membership_index
+from app.models import Ticket, TicketHistory, User, project_assignments
+from app.seed import seed_database
+
+# (label, method, path, caller, json body, max statements)
+ROUTES = [
+    ("projects (admin)", "GET", "/api/projects", "admin", None, 4),
+    ("projects (member)", "GET", "/api/projects", "member", None, 4),
+    ("projects fields", "GET", "/api/projects?fields=id,title,status", "admin", None, 2),
+    ("projects assigned", "GET", "/api/projects/assigned", "member", None, 4),
+    ("project details", "GET", "/api/projects/{project_id}", "member", None, 5),
+    ("project tickets", "GET", "/api/projects/{project_id}/tickets", "member", None, 3),
+    ("project tickets page", "GET", "/api/projects/{project_id}/tickets?limit=50&status=To Do", "member", None, 3),
+    ("project tickets delta", "GET", "/api/projects/{project_id}/tickets?since=0", "member", None, 4),
+    ("project users", "GET", "/api/projects/{project_id}/users", "member", None, 3),
+    ("project stats", "GET", "/api/projects/{project_id}/stats", "member", None, 2),
+    ("user tickets", "GET", "/api/tickets/user?limit=50", "member", None, 2),
+    ("ticket history", "GET", "/api/tickets/{ticket_id}/history", "member", None, 3),
+    ("ticket history page", "GET", "/api/tickets/{ticket_id}/history?limit=20", "member", None, 3),
+    ("search", "GET", "/api/search?q=billing", "member", None, 3),
+    ("users (admin)", "GET", "/api/users", "admin", None, 2),
+    ("my profile", "GET", "/api/users/me", "member", None, 2),
+    ("export project", "GET", "/api/projects/{project_id}/export", "admin", None, 8),
+    ("create ticket", "POST", "/api/tickets", "member",
+     {"title": "counted", "description": "counted", "project_id": "{project_id}"}, 8),
+    ("update ticket", "PUT", "/api/tickets/{ticket_id}", "member", {"status": "Done", "priority": "High"}, 9),
+    ("bulk create tickets", "POST", "/api/tickets/bulk", "member",
+     {"tickets": [{"title": f"bulk {i}", "description": "counted", "project_id": "{project_id}"} for i in range(20)]}, 6),
+]
+
+
+@pytest.fixture(scope="module")
+def ids(app):
+    seed_database(users=20, projects=8, tickets=400, history=800, seed=1, drop=True)
+
+    admin = db.session.scalar(select(User.id).where(User.role == "admin").order_by(User.id))
+    project_id = db.session.scalar(
+        select(Ticket.project_id).group_by(Ticket.project_id).order_by(func.count().desc(), Ticket.project_id)
+    )
+    member = db.session.scalar(
+        select(User.id).join(project_assignments, project_assignments.c.user_id == User.id)
+        .where(project_assignments.c.project_id == project_id, User.role == "user").order_by(User.id)
+    )
+    ticket_id = db.session.scalar(
+        select(TicketHistory.ticket_id).join(Ticket).where(Ticket.project_id == project_id)
+        .group_by(TicketHistory.ticket_id).order_by(func.count().desc(), TicketHistory.ticket_id)
+    )
+    return {"admin": admin, "member": member, "project_id": project_id, "ticket_id": ticket_id}
+
+
+def _fill(body, ids):
+    """ Substitute {placeholders} in a JSON body, keeping ids as integers """
+    if isinstance(body, dict):
+        return {key: _fill(value, ids) for key, value in body.items()}
+    if isinstance(body, list):
+        return [_fill(value, ids) for value in body]
+    if isinstance(body, str) and body.startswith("{") and body.endswith("}"):
+        return ids[body[1:-1]]
+    return body
+
+
+@pytest.mark.parametrize("label, method, path, caller, body, limit", ROUTES, ids=[route[0] for route in ROUTES])
+def test_query_count(app, client, ids, label, method, path, caller, body, limit):
+    headers = {"Authorization": "Bearer " + access_token(db.session.get(User, ids[caller]))}
+    membership_index.invalidate()
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(" ".join(statement.split()))
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        response = client.open(path.format(**ids), method=method, headers=headers, json=_fill(body, ids))
+        response.get_data()  # streamed bodies run their queries while being read
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+
+    assert response.status_code < 300, response.get_data(as_text=True)
+    assert len(statements) <= limit, f"{label}: {len(statements)} statements (max {limit}):\n" + "\n".join(statements)
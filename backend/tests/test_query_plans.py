@@ -0,0 +1,10 @@
+""" `flask check-query-plans` as a test: no hot read route may fall back to a full table scan """
+from app.query_plans import check_query_plans
+
+
+def test_no_full_table_scans(app):
+    failures = check_query_plans()
+    assert not failures, "\n".join(
+        f"{label}: full scan of {', '.join(scanned)}\n  {' '.join(statement.split())}\n    " + "\n    ".join(plan)
+        for label, statement, scanned, plan in failures
+    )
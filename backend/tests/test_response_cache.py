@@ -0,0 +1,61 @@
+""" Project listing cache: hits until a write invalidates it, in any worker """
+import pytest
+from app.cache import DatabaseBackend, response_cache
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """ The default database backend (conftest turns caching off) """
+    monkeypatch.setattr(response_cache, "backend", DatabaseBackend(64))
+    return response_cache
+
+
+def titles(response):
+    return [project["title"] for project in response.get_json()]
+
+
+def test_listing_is_cached_until_a_write(client, make_user, make_project, auth, cache):
+    admin, member = make_user("admin"), make_user()
+    project = make_project(member, title="before")
+    headers = auth(member)
+
+    assert titles(client.get("/api/projects", headers=headers)) == ["before"]
+    hits = cache.hits
+    assert titles(client.get("/api/projects", headers=headers)) == ["before"]
+    assert cache.hits == hits + 1
+
+    updated = client.put(f"/api/projects/{project.id}", json={"title": "after"}, headers=auth(admin))
+    assert updated.status_code == 200
+    assert titles(client.get("/api/projects", headers=headers)) == ["after"]
+
+
+def test_invalidation_reaches_other_workers(client, make_user, make_project, auth, cache, monkeypatch):
+    member = make_user()
+    project = make_project(member)
+    headers = auth(member)
+    worker = cache.backend
+
+    assert client.get("/api/projects", headers=headers).get_json()[0]["tickets"] == []
+
+    # The write lands in another worker, with its own entries but the same generations
+    monkeypatch.setattr(response_cache, "backend", DatabaseBackend(64))
+    created = client.post("/api/tickets", json={"title": "t", "description": "d", "project_id": project.id},
+                          headers=headers)
+    assert created.status_code == 201
+
+    monkeypatch.setattr(response_cache, "backend", worker)
+    tickets = client.get("/api/projects", headers=headers).get_json()[0]["tickets"]
+    assert [ticket["title"] for ticket in tickets] == ["t"]
+
+
+def test_fields_are_not_served_the_full_body(client, make_user, make_project, auth, cache):
+    member = make_user()
+    make_project(member, title="full")
+    headers = auth(member)
+
+    full = client.get("/api/projects", headers=headers).get_json()
+    assert "tickets" in full[0]
+
+    partial = client.get("/api/projects?fields=title", headers=headers).get_json()
+    assert partial == [{"id": full[0]["id"], "title": "full"}]
+    assert client.get("/api/projects", headers=headers).get_json() == full
@@ -0,0 +1,39 @@
+""" /search only returns projects (and their tickets) the user can see """
+
+
+def test_search_hides_other_projects(client, make_user, make_project, auth):
+    admin, member, outsider = make_user("admin"), make_user(), make_user()
+    mine = make_project(member, title="Quokka launch")
+    other = make_project(title="Quokka rollout")
+    for project in (mine, other):
+        response = client.post("/api/tickets", headers=auth(admin), json={
+            "title": f"Quokka ticket {project.id}", "description": "d", "project_id": project.id,
+        })
+        assert response.status_code == 201
+
+    def found(user, q="quokka"):
+        result = client.get(f"/api/search?q={q}", headers=auth(user)).get_json()
+        return {ticket["project_id"] for ticket in result["tickets"]}, {project["id"] for project in result["projects"]}
+
+    assert found(member) == ({mine.id}, {mine.id})
+    assert found(outsider) == (set(), set())
+    assert found(admin) == ({mine.id, other.id}, {mine.id, other.id})
+    assert found(member, "quok") == ({mine.id}, {mine.id})  # prefix match
+
+
+def test_deleted_tickets_leave_the_index(client, make_user, make_project, auth):
+    member = make_user()
+    project = make_project(member)
+    headers = auth(member)
+    created = client.post("/api/tickets", headers=headers, json={
+        "title": "Wombat migration", "description": "d", "project_id": project.id,
+    }).get_json()["ticket"]
+
+    assert [ticket["id"] for ticket in client.get("/api/search?q=wombat", headers=headers).get_json()["tickets"]] \
+        == [created["id"]]
+    assert client.delete(f"/api/tickets/{created['id']}", headers=headers).status_code == 200
+    assert client.get("/api/search?q=wombat", headers=headers).get_json()["tickets"] == []
+
+
+def test_query_without_words_is_rejected(client, make_user, auth):
+    assert client.get("/api/search?q=%22*", headers=auth(make_user())).status_code == 400
@@ -0,0 +1,47 @@
+""" benchmarks/bench_startup.py as a test: create_app() is fork-safe and no slower than the baseline
+
+Each boot runs in a fresh interpreter, as a gunicorn --preload master would.
+Nothing may open a database connection, start a thread or import a lazily
+loaded module before the fork. Times are compared with startup_baseline.json
+only when it was recorded on this Python and machine, as the benchmark's
+docstring asks.
+"""
+import json
+import os
+import platform
+import statistics
+import sys
+import pytest
+from conftest import BACKEND, WORKDIR
+
+sys.path.insert(0, os.path.join(BACKEND, "benchmarks"))
+import bench_startup  # noqa: E402
+
+BASELINE = os.path.join(BACKEND, "benchmarks", "startup_baseline.json")
+RUNS = 3
+
+
+@pytest.fixture(scope="module")
+def boots():
+    env = {
+        **os.environ,
+        "FLASK_ENV": "production",
+        "DATABASE_URL": f"sqlite:///{os.path.join(WORKDIR, 'startup.db')}",
+        "PYTHONWARNINGS": "ignore",
+    }
+    bench_startup.boot(env)  # warm-up: writes .pyc files
+    return [bench_startup.boot(env) for _ in range(RUNS)]
+
+
+def test_create_app_is_preload_safe(boots):
+    assert bench_startup.preload_problems(boots) == []
+
+
+def test_startup_is_no_slower_than_the_baseline(boots):
+    with open(BASELINE) as f:
+        baseline = json.load(f)
+    if (baseline["python"], baseline["machine"]) != (platform.python_version(), platform.machine()):
+        pytest.skip(f"baseline recorded on Python {baseline['python']} / {baseline['machine']}")
+
+    current = {metric: statistics.median(probe[metric] for probe in boots) for metric in ("import_ms", "create_app_ms")}
+    assert bench_startup.compare(baseline["results"], current) == []
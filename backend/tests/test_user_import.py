@@ -0,0 +1,51 @@
+""" User import is all or nothing: one bad line rolls back every chunk before it """
+import json
+import pytest
+from werkzeug.security import check_password_hash
+from app import user_import
+from app.models import User
+
+
+def ndjson(*records):
+    return "\n".join(record if isinstance(record, str) else json.dumps(record) for record in records)
+
+
+def post(client, headers, body, query=""):
+    return client.post(f"/api/users/import{query}", data=body.encode(),
+                       headers={**headers, "Content-Type": "application/x-ndjson"})
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(user_import, "IMPORT_CHUNK_SIZE", 2)  # the bad line lands after a written chunk
+
+
+@pytest.mark.parametrize("bad", [
+    "{not json",
+    {"username": "imp.bad", "email": "not-an-email", "password": "x"},
+    {"username": "imp.bad", "email": "imp.bad@example.invalid", "password": "x", "role": "owner"},
+    {"username": "imp.1", "email": "imp.dup@example.invalid", "password": "x"},
+])
+def test_bad_line_rolls_back_the_import(client, make_user, auth, small_chunks, bad):
+    good = [{"username": f"imp.{n}", "email": f"imp.{n}@example.invalid", "password": "x"} for n in (1, 2, 3)]
+    response = post(client, auth(make_user("admin")), ndjson(*good, bad))
+
+    assert response.status_code == 400
+    body = response.get_json()
+    assert [error["row"] for error in body["errors"]] == [4]
+    assert User.query.filter(User.username.like("imp.%")).count() == 0
+
+
+def test_valid_import_and_skip_existing(client, make_user, auth):
+    headers = auth(make_user("admin"))
+    existing = make_user()
+    records = [
+        {"username": "imp.ok", "email": "imp.ok@example.invalid", "password": "x"},
+        {"username": existing.username, "email": existing.email, "password": "x"},
+    ]
+
+    assert post(client, headers, ndjson(*records)).status_code == 400
+    response = post(client, headers, ndjson(*records), "?on_conflict=skip")
+    assert response.status_code == 201
+    assert response.get_json() == {"created": 1, "skipped": 1}
+    assert check_password_hash(User.query.filter_by(username="imp.ok").one().password, "x")
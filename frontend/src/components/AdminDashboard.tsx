@@ -39,6 +39,7 @@ const AdminDashboard: React.FC = () => {
 
         const projectsResponse = await api.get("/api/projects/assigned", {
           headers: { Authorization: `Bearer ${token}` },
+          params: { fields: "title,description,start_date,end_date,status", include: "assigned_users" },
         });
 
         setProjects(projectsResponse.data);
@@ -69,6 +69,19 @@ const UserList: React.FC = () => {
     setOpenDialog(true);
   };
 
+  // ✅ Avatar uploads are processed in the background: poll the job until it settles
+  const waitForAvatarJob = async (statusUrl: string) => {
+    const token = localStorage.getItem("token");
+    for (let attempt = 0; attempt < 30; attempt++) {
+      const { data } = await axios.get(`${process.env.REACT_APP_API_URL}${statusUrl}`, {
+        headers: { Authorization: `Bearer ${token}` },
+      });
+      if (data.status === "done") return;
+      if (data.status === "failed") throw new Error(data.error || "Failed to upload avatar.");
+      await new Promise((resolve) => setTimeout(resolve, 1000));
+    }
+  };
+
   const handleAvatarUpload = async (userId: number) => {
     if (!selectedAvatar) return;
   
@@ -78,15 +91,16 @@ const UserList: React.FC = () => {
       const token = localStorage.getItem("token");
       const endpoint = `/api/users/${userId}/avatar`;
   
-      await axios.post(`${process.env.REACT_APP_API_URL}${endpoint}`, formData, {
+      const response = await axios.post(`${process.env.REACT_APP_API_URL}${endpoint}`, formData, {
         headers: { Authorization: `Bearer ${token}` },
       });
+      await waitForAvatarJob(response.data.status_url);
   
       notify("Avatar uploaded successfully!", "success");
       fetchUsers();
       setSelectedAvatar(null);
     } catch (err: any) {
-      notify(err.response?.data?.error || "Failed to upload avatar.", "error");
+      notify(err.response?.data?.error || err.message || "Failed to upload avatar.", "error");
     }
   };
 
@@ -142,13 +156,14 @@ const UserList: React.FC = () => {
         formData.append("avatar", selectedAvatar);
         const token = localStorage.getItem("token");
   
-        await axios.post(
+        const avatarResponse = await axios.post(
           `${process.env.REACT_APP_API_URL}/api/users/${userId}/avatar`,
           formData,
           {
             headers: { Authorization: `Bearer ${token}` },
           }
         );
+        await waitForAvatarJob(avatarResponse.data.status_url);
   
         console.log("✅ Avatar uploaded successfully!");
       }